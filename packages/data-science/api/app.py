@@ -8,18 +8,33 @@ Usage:
     uvicorn app:app --reload --port 8001
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 import sys
 from pathlib import Path
 import os
+from time import perf_counter
 
 # Add parent directory to path to import from src
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.models.predict import RequestPredictor
+from src.features.vectorizers import n_features  # noqa: E402
+from src.models.predict import RequestPredictor  # noqa: E402
+from src.models.similarity import (  # noqa: E402
+    MANIFEST_FILE as SIMILARITY_MANIFEST,
+    SimilarityIndex
+)
+from src.monitoring.metrics import REGISTRY  # noqa: E402
+from src.serving.admission import AdmissionController, AdmissionMiddleware  # noqa: E402
+from src.serving.audit import AuditLog  # noqa: E402
+from src.serving.batcher import MicroBatcher  # noqa: E402
+from src.serving.middleware import MetricsMiddleware  # noqa: E402
+from src.serving.reload import ModelManager  # noqa: E402
+from src.serving.shadow import ShadowEvaluator  # noqa: E402
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -37,23 +52,109 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize predictor
-# TODO: Handle case where models don't exist yet
-try:
-    predictor = RequestPredictor(
-        models_dir='../models',
-        data_dir='../data/processed'
+# Bounded concurrency for /predict and /predict/batch: requests queue up to their
+# deadline (X-Request-Timeout, default the backend's 5 s) and are shed with 503 +
+# Retry-After when they can't make it (see src/serving/admission.py).
+# ADMISSION_MAX_CONCURRENCY=0 disables
+admission = None
+if int(os.getenv("ADMISSION_MAX_CONCURRENCY", 32)) > 0:
+    admission = AdmissionController(
+        max_concurrency=int(os.getenv("ADMISSION_MAX_CONCURRENCY", 32)),
+        max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", 256)),
+        default_deadline=float(os.getenv("ADMISSION_DEADLINE_SECONDS", 5.0))
     )
+    app.add_middleware(AdmissionMiddleware, controller=admission)
+
+# Request counts by status and end-to-end latency, exposed on /metrics
+# (added last so it is outermost and also counts shed requests)
+app.add_middleware(MetricsMiddleware)
+
+# Initialize predictor
+# Handlers read model_manager.current once per request, so a hot reload never
+# changes the model under a request that is already running
+model_manager = ModelManager(
+    models_dir=os.getenv('MODEL_PATH', '../models'),
+    data_dir=os.getenv('PROCESSED_DATA_PATH', '../data/processed')
+)
+if model_manager.load():
     print("✓ Model loaded successfully")
-except Exception as e:
-    print(f"⚠️  Warning: Could not load models: {e}")
+else:
     print("   API will return 503 errors until models are trained")
-    predictor = None
+
+# Poll the model directory for retrained models (MODEL_WATCH_INTERVAL=0 disables)
+watch_interval = float(os.getenv("MODEL_WATCH_INTERVAL", 10))
+if watch_interval > 0:
+    model_manager.start_watching(watch_interval)
+
+# Near-duplicate lookup for /similar, built with the vectorizer loaded above. It keeps
+# that vectorizer across model reloads; rebuild the index when the features change
+similarity_index = None
+similarity_path = Path(os.getenv('SIMILARITY_INDEX_PATH', '../models/similarity'))
+if model_manager.current is not None and (similarity_path / SIMILARITY_MANIFEST).exists():
+    try:
+        similarity_index = SimilarityIndex.load(similarity_path, model_manager.current.vectorizer)
+        print(f"✓ Similarity index loaded ({len(similarity_index)} tickets)")
+    except ValueError as e:
+        print(f"⚠️  Similarity index not loaded: {e}")
+
+# Record every served prediction for accuracy tracking (see src/serving/audit.py);
+# written behind the request path by a background thread. AUDIT_LOG_PATH= disables
+audit_log = None
+audit_log_path = os.getenv('AUDIT_LOG_PATH', '../logs/predictions.jsonl')
+if audit_log_path:
+    audit_log = AuditLog(
+        audit_log_path,
+        capacity=int(os.getenv('AUDIT_LOG_CAPACITY', 100000)),
+        flush_interval=float(os.getenv('AUDIT_FLUSH_INTERVAL', 1.0))
+    )
+
+
+# Candidate model scored on a sample of live traffic off the request path
+# (see src/serving/shadow.py); enabled by SHADOW_MODEL_PATH, compared on GET /shadow
+shadow = None
+shadow_models_dir = os.getenv('SHADOW_MODEL_PATH')
+if shadow_models_dir:
+    try:
+        shadow = ShadowEvaluator(
+            RequestPredictor(
+                models_dir=shadow_models_dir,
+                data_dir=os.getenv('SHADOW_DATA_PATH', model_manager.data_dir),
+                cache_size=0,
+                instrument=False
+            ),
+            sample_rate=float(os.getenv('SHADOW_SAMPLE_RATE', 0.1))
+        )
+        print(f"✓ Shadow model loaded ({shadow.predictor.model_version})")
+    except Exception as e:
+        print(f"⚠️  Shadow model not loaded: {e}")
+
+
+@app.on_event("shutdown")
+def flush_audit_log():
+    if audit_log is not None:
+        audit_log.close()
+    if shadow is not None:
+        shadow.close()
+
+
+# Micro-batch concurrent /predict calls into one scoring pass
+# Set PREDICT_BATCHING=false to score each request on its own
+batcher = None
+if os.getenv("PREDICT_BATCHING", "true").lower() == "true":
+    batcher = MicroBatcher(
+        max_batch_size=int(os.getenv("PREDICT_BATCH_MAX_SIZE", 32)),
+        max_wait_ms=float(os.getenv("PREDICT_BATCH_WAIT_MS", 2))
+    )
 
 
 # Request/Response models
 class PredictionRequest(BaseModel):
     """Input schema for prediction endpoint."""
+    request_id: Optional[str] = Field(
+        None,
+        max_length=100,
+        description="Ticket id, recorded in the prediction audit log for accuracy tracking"
+    )
     title: str = Field(..., min_length=1, max_length=500, description="Request title")
     description: str = Field(..., min_length=1, description="Request description")
     confidence_threshold: Optional[float] = Field(
@@ -62,6 +163,30 @@ class PredictionRequest(BaseModel):
         le=1.0,
         description="Minimum confidence to return prediction"
     )
+    top_k: Optional[int] = Field(
+        None,
+        ge=1,
+        le=10,
+        description="Also return the k most likely classes per head"
+    )
+    top_terms: Optional[int] = Field(
+        None,
+        ge=1,
+        le=50,
+        description="Also return the n-grams that contributed most to each predicted class"
+    )
+
+
+class ClassScore(BaseModel):
+    """One class of a head with its probability."""
+    label: str
+    confidence: float = Field(..., ge=0.0, le=1.0)
+
+
+class TermWeight(BaseModel):
+    """An n-gram and how much it raised the predicted class's score."""
+    term: str
+    weight: float
 
 
 class PredictionResponse(BaseModel):
@@ -74,50 +199,124 @@ class PredictionResponse(BaseModel):
     priority_confidence: float = Field(..., ge=0.0, le=1.0, description="Priority prediction confidence")
     model_version: str = Field(..., description="Model version identifier")
     timestamp: str = Field(..., description="Prediction timestamp (ISO 8601)")
+    # Only present when requested with top_k / top_terms
+    category_top_k: Optional[List[ClassScore]] = Field(None, description="Most likely categories")
+    priority_top_k: Optional[List[ClassScore]] = Field(None, description="Most likely priorities")
+    category_terms: Optional[List[TermWeight]] = Field(
+        None, description="Top n-grams for the category"
+    )
+    priority_terms: Optional[List[TermWeight]] = Field(
+        None, description="Top n-grams for the priority"
+    )
+
+
+class BatchPredictionRequest(BaseModel):
+    """Input schema for batch prediction endpoint."""
+    requests: List[PredictionRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Requests to score (each may set its own confidence_threshold)"
+    )
+
+
+class BatchPredictionResponse(BaseModel):
+    """Batch output: one prediction per input request, in input order."""
+    predictions: List[PredictionResponse]
+
+
+class SimilarRequest(BaseModel):
+    """Input schema for the near-duplicate lookup endpoint."""
+    title: str = Field(..., min_length=1, max_length=500, description="Request title")
+    description: str = Field(..., min_length=1, description="Request description")
+    k: int = Field(5, ge=1, le=50, description="Number of similar tickets to return")
+    exclude_id: Optional[str] = Field(
+        None, description="Ticket id to leave out (e.g. the ticket itself)"
+    )
+
+
+class SimilarTicket(BaseModel):
+    """An indexed ticket and its similarity to the query."""
+    request_id: str
+    score: float = Field(..., description="Cosine similarity [0-1]")
+
+
+class SimilarResponse(BaseModel):
+    """Most similar tickets first."""
+    similar: List[SimilarTicket]
+
+
+class IndexTicketRequest(BaseModel):
+    """Input schema for adding a ticket to the similarity index."""
+    request_id: str = Field(..., min_length=1, description="Ticket id")
+    title: str = Field(..., min_length=1, max_length=500, description="Request title")
+    description: str = Field(..., min_length=1, description="Request description")
+
+
+class ReloadRequest(BaseModel):
+    """Input schema for the model reload endpoint."""
+    models_dir: Optional[str] = Field(None, description="New model directory (default: current)")
+    data_dir: Optional[str] = Field(
+        None, description="New preprocessing artifact directory (default: current)"
+    )
 
 
 @app.get("/")
 def root():
     """Health check endpoint."""
+    predictor = model_manager.current
     return {
         "service": "Request Management DS Model API",
         "version": "1.0.0",
         "status": "running" if predictor else "models not loaded",
         "endpoints": {
             "predict": "/predict",
+            "predict_batch": "/predict/batch",
+            "similar": "/similar",
+            "drift": "/drift",
+            "shadow": "/shadow",
             "health": "/health",
+            "metrics": "/metrics",
             "docs": "/docs"
         }
     }
 
 
 @app.get("/health")
-def health_check():
+async def health_check():
     """
     Health check endpoint for monitoring.
     
-    Returns 200 if models are loaded, 503 otherwise.
+    Returns 200 if models are loaded, 503 otherwise. Status is `saturated` instead of
+    `healthy` while new predictions would be shed, so callers can back off. Runs on
+    the event loop, never behind prediction work in the threadpool.
     """
+    predictor = model_manager.current
     if predictor is None:
         raise HTTPException(
             status_code=503,
             detail="Models not loaded. Please train models first."
         )
+    saturated = admission is not None and admission.saturated()
     return {
-        "status": "healthy",
-        "model_version": predictor.model_version
+        "status": "saturated" if saturated else "healthy",
+        "model_version": predictor.model_version,
+        "admission": admission.stats() if admission else None
     }
 
 
-@app.post("/predict", response_model=PredictionResponse)
-def predict(request: PredictionRequest):
+@app.post("/predict", response_model=PredictionResponse, response_model_exclude_unset=True)
+async def predict(request: PredictionRequest, http_request: Request):
     """
     Predict category and priority for a request.
     
     **Input:**
+    - request_id: Ticket id (optional, recorded in the audit log)
     - title: Request title (required)
     - description: Request description (required)
     - confidence_threshold: Minimum confidence (default: 0.6)
+    - top_k: Optional, also return the k most likely classes per head
+    - top_terms: Optional, also return the n-grams that drove each prediction
     
     **Output:**
     - predicted_category: Category prediction or null
@@ -126,6 +325,8 @@ def predict(request: PredictionRequest):
     - priority_confidence: Confidence score [0-1]
     - model_version: Model version string
     - timestamp: Prediction timestamp
+    - category_top_k / priority_top_k: Only with top_k, [{label, confidence}]
+    - category_terms / priority_terms: Only with top_terms, [{term, weight}]
     
     **Example:**
     ```json
@@ -135,18 +336,28 @@ def predict(request: PredictionRequest):
     }
     ```
     """
+    predictor = model_manager.current
     if predictor is None:
         raise HTTPException(
             status_code=503,
             detail="Models not available. Please train models first."
         )
     
+    start = perf_counter()
+    item = request.model_dump()
     try:
-        result = predictor.predict(
-            title=request.title,
-            description=request.description,
-            confidence_threshold=request.confidence_threshold
-        )
+        if batcher is not None:
+            # Scored by this handler's predictor even if a reload lands meanwhile,
+            # so the shadow comparison below pairs with the model that answered
+            result = await batcher.submit(item, predictor.predict_batch)
+        else:
+            # A batch of one, so options (e.g. a null threshold) mean the same either way
+            (result,) = await run_in_threadpool(predictor.predict_batch, [item])
+        if audit_log is not None:
+            audit_log.record(item, result)
+        if shadow is not None:
+            shadow.submit(predictor, [item])
+        http_request.state.handler_seconds = perf_counter() - start
         return result
     except Exception as e:
         raise HTTPException(
@@ -155,11 +366,96 @@ def predict(request: PredictionRequest):
         )
 
 
+@app.post(
+    "/predict/batch", response_model=BatchPredictionResponse, response_model_exclude_unset=True
+)
+def predict_batch(request: BatchPredictionRequest, http_request: Request):
+    """
+    Predict category and priority for up to 1000 requests in one call.
+
+    The batch is vectorized and scored as a single matrix, so sending one page of
+    tickets here is much cheaper than one `/predict` call per ticket.
+
+    **Input:**
+    - requests: List of `/predict` request bodies
+
+    **Output:**
+    - predictions: List of `/predict` responses, in the same order as the input
+    """
+    predictor = model_manager.current
+    if predictor is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Models not available. Please train models first."
+        )
+
+    start = perf_counter()
+    try:
+        items = [item.model_dump() for item in request.requests]
+        results = predictor.predict_batch(items)
+        if audit_log is not None:
+            for item, result in zip(items, results):
+                audit_log.record(item, result)
+        if shadow is not None:
+            shadow.submit(predictor, items)
+        http_request.state.handler_seconds = perf_counter() - start
+        return {"predictions": results}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Batch prediction failed: {str(e)}"
+        )
+
+
+@app.post("/similar", response_model=SimilarResponse)
+def similar(request: SimilarRequest):
+    """
+    Find indexed tickets that are near-duplicates of a request.
+
+    Lookups read a bounded number of postings from an inverted index, so latency
+    does not grow with the number of indexed tickets (see src/models/similarity.py).
+
+    **Input:**
+    - title, description: The ticket to match
+    - k: Number of tickets to return (default: 5)
+    - exclude_id: Optional ticket id to leave out
+
+    **Output:**
+    - similar: [{request_id, score}], most similar first
+    """
+    if similarity_index is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Similarity index not available. Build it with python -m src.models.similarity."
+        )
+    exclude = [request.exclude_id] if request.exclude_id else None
+    return {
+        "similar": similarity_index.query(request.title, request.description, request.k, exclude)
+    }
+
+
+@app.post("/similar/tickets")
+def index_ticket(request: IndexTicketRequest):
+    """
+    Add a newly created (or edited) ticket to the similarity index.
+
+    The ticket is visible to `/similar` on every worker once this returns.
+    """
+    if similarity_index is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Similarity index not available. Build it with python -m src.models.similarity."
+        )
+    similarity_index.add([request.request_id], [request.title], [request.description])
+    return {"request_id": request.request_id, "indexed_tickets": len(similarity_index)}
+
+
 @app.get("/model-info")
 def model_info():
     """
     Get information about the loaded models.
     """
+    predictor = model_manager.current
     if predictor is None:
         raise HTTPException(
             status_code=503,
@@ -170,10 +466,93 @@ def model_info():
         "model_version": predictor.model_version,
         "category_classes": predictor.category_encoder.classes_.tolist(),
         "priority_classes": predictor.priority_encoder.classes_.tolist(),
-        "feature_count": predictor.vectorizer.get_feature_names_out().shape[0]
+        "feature_count": n_features(predictor.vectorizer),
+        "prediction_cache": predictor.cache.stats() if predictor.cache else None,
+        "batching": batcher.stats() if batcher else None,
+        "audit_log": audit_log.stats() if audit_log else None,
+        "reload": model_manager.status()
+    }
+
+
+@app.get("/drift")
+def drift():
+    """
+    Drift sketches of live traffic against the model's training profile.
+
+    Covers the last hour (12 windows of `DRIFT_WINDOW_SECONDS`, default 300) across all
+    workers: OOV token rate, non-zero features per row, confidence per head and the
+    predicted class mix, each with its PSI against the reference and a status
+    (`ok` < 0.1 <= `warn` < 0.2 <= `drift`). Models trained before drift profiles
+    existed report live histograms only.
+    """
+    predictor = model_manager.current
+    if predictor is None or predictor.drift is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Models not loaded"
+        )
+    return {"model_version": predictor.model_version, **predictor.drift.report()}
+
+
+@app.get("/shadow")
+def shadow_stats():
+    """
+    How the shadow model compares with the live one on sampled traffic.
+
+    Per head: top-label agreement, agreement of the served response (label or null
+    at the request's threshold), mean confidence delta (shadow - live) and the most
+    frequent disagreements; plus scoring time per request of both models on the same
+    batches. Counts are for the worker that answers, like `/metrics`.
+
+    Enabled by `SHADOW_MODEL_PATH`; `SHADOW_SAMPLE_RATE` (default 0.1) sets the share
+    of requests scored.
+    """
+    if shadow is None:
+        raise HTTPException(
+            status_code=503,
+            detail="No shadow model. Set SHADOW_MODEL_PATH to a candidate model directory."
+        )
+    return {
+        "live_model_version": (
+            model_manager.current.model_version if model_manager.current else None
+        ),
+        **shadow.stats()
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus metrics: per-stage prediction latency, batch sizes, request counts
+    by route and status, and below-threshold (null) prediction counts per head.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/admin/reload")
+def reload_models(request: ReloadRequest, x_admin_token: Optional[str] = Header(None)):
+    """
+    Load a retrained model in the background and swap it in without downtime.
+
+    Requests already in flight finish on the old model. If loading fails the
+    current model stays live and a 500 is returned.
+
+    Requires the `X-Admin-Token` header to match env `ADMIN_TOKEN`; the endpoint
+    is disabled when `ADMIN_TOKEN` is not set.
+    """
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token or x_admin_token != admin_token:
+        raise HTTPException(status_code=403, detail="Model reload not permitted")
+
+    try:
+        return model_manager.reload(models_dir=request.models_dir, data_dir=request.data_dir)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Model reload failed, current model kept: {str(e)}"
+        )
+
+
 if __name__ == "__main__":
     import uvicorn
     
@@ -0,0 +1,356 @@
+"""
+Closed-loop load test of the prediction API with the backend's call pattern.
+
+Replays what the backend's ds-model.service.ts does (see docs/INTEGRATION.md):
+``POST /predict`` with title, description and confidence_threshold 0.6, abandoned after
+5 s, and ``GET /health`` with a 2 s timeout. ``--concurrency`` virtual users each send
+one request, wait for the answer, optionally think, and send the next. With ``--rate``
+the users also follow a shared Poisson arrival schedule, so the offered load is fixed
+and the concurrency caps how many calls can be in flight.
+
+Tickets are sampled from a seeded synthetic corpus (src/data/synthetic.py; the
+description length distribution is set by ``--mean-extra-sentences``), the mock corpus
+in contracts/mock-data, or any CSV with title and description columns.
+
+The API runs in-process through httpx's ASGI transport (models from MODEL_PATH etc.,
+as for api/app.py), or is reached over HTTP with ``--url``. Latency is measured from
+the moment a call is sent or, with ``--rate``, from its scheduled arrival: a call that
+waited for a free user was late for the backend too, and leaving that wait out would
+hide queueing from the percentiles (coordinated omission). Calls are never cut off:
+the report counts how many would have exceeded the backend's timeout instead. It also
+covers throughput, p50/p95/p99 latency, status counts and error rate. ``--slo-p99-ms``
+and friends make the run exit non-zero when a limit is broken.
+
+Usage (from packages/data-science):
+    python -m src.benchmarks.load_test --concurrency 32 --requests 5000
+    python -m src.benchmarks.load_test --url http://localhost:8001 --rate 200 --duration 60 \\
+        --corpus mock --slo-p99-ms 250 --max-error-rate 0.001
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.data.synthetic import generate_corpus
+
+# Timeouts and threshold in ds-model.service.ts
+BACKEND_PREDICT_TIMEOUT = 5.0
+BACKEND_HEALTH_TIMEOUT = 2.0
+BACKEND_CONFIDENCE_THRESHOLD = 0.6
+
+
+def load_tickets(
+    corpus: str, n_rows: int = 10000, seed: int = 42, mean_extra_sentences: float = 1.0
+):
+    """
+    Title/description pairs to send.
+
+    Args:
+        corpus: 'synthetic', 'mock' (contracts/mock-data/requests.csv) or a CSV path
+        n_rows: Synthetic corpus size
+        seed: Synthetic corpus seed
+        mean_extra_sentences: Mean extra detail sentences per synthetic description
+    """
+    if corpus == 'synthetic':
+        df = generate_corpus(n_rows, seed=seed, mean_extra_sentences=mean_extra_sentences)
+    elif corpus == 'mock':
+        from src.data.load_data import load_mock_data
+        # Keep stdout for the JSON report
+        with contextlib.redirect_stdout(sys.stderr):
+            df = load_mock_data('csv', columns=['title', 'description'])
+    else:
+        import pandas as pd
+        df = pd.read_csv(corpus, usecols=['title', 'description'])
+    df = df.dropna(subset=['title', 'description'])
+    return df['title'].tolist(), df['description'].tolist()
+
+
+def _percentiles(seconds: List[float]) -> Dict[str, Optional[float]]:
+    if not seconds:
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'max_ms': None, 'mean_ms': None}
+    ms = np.array(seconds) * 1000.0
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'max_ms': float(ms.max()),
+        'mean_ms': float(ms.mean())
+    }
+
+
+async def run_load(
+    client,
+    titles: List[str],
+    descriptions: List[str],
+    concurrency: int = 32,
+    n_requests: int = 2000,
+    duration: Optional[float] = None,
+    rate: Optional[float] = None,
+    think_time: float = 0.0,
+    health_interval: float = 5.0,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """
+    Drive /predict (and periodically /health) until n_requests are sent or duration runs out.
+
+    Args:
+        client: httpx.AsyncClient pointed at the API
+        titles, descriptions: Ticket corpus; each call picks one at random
+        concurrency: Virtual users, each with at most one call in flight
+        n_requests: Stop after this many /predict calls
+        duration: Also stop after this many seconds
+        rate: Target arrival rate (requests/s, Poisson), with latency counted from each
+            call's scheduled arrival; None sends as fast as users allow
+        think_time: Mean pause (exponential) between a user's calls, in seconds
+        health_interval: Seconds between health checks; 0 disables them
+        seed: Ticket sampling and arrival schedule seed
+
+    Returns:
+        Raw report (see main for the summary built from it)
+    """
+    loop = asyncio.get_running_loop()
+    rng = np.random.default_rng(seed)
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    lags: List[float] = []
+    health_latencies: List[float] = []
+    health_failures = 0
+
+    start = loop.time()
+    deadline = start + duration if duration else float('inf')
+    state = {'sent': 0, 'next_arrival': start}
+    stop = asyncio.Event()
+
+    async def user() -> None:
+        while state['sent'] < n_requests and loop.time() < deadline:
+            state['sent'] += 1
+            slot = None
+            if rate:
+                slot = state['next_arrival']
+                state['next_arrival'] += rng.exponential(1.0 / rate)
+                if slot > deadline:
+                    return
+                await asyncio.sleep(max(0.0, slot - loop.time()))
+                # How late this user was for its slot: nonzero when all users were busy
+                lags.append(loop.time() - slot)
+            i = int(rng.integers(len(titles)))
+            body = {
+                'title': titles[i],
+                'description': descriptions[i],
+                'confidence_threshold': BACKEND_CONFIDENCE_THRESHOLD
+            }
+            sent = loop.time() if slot is None else slot
+            try:
+                response = await client.post('/predict', json=body)
+                status = str(response.status_code)
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append(loop.time() - sent)
+            statuses[status] = statuses.get(status, 0) + 1
+            if think_time:
+                await asyncio.sleep(rng.exponential(think_time))
+
+    async def health() -> None:
+        nonlocal health_failures
+        while not stop.is_set():
+            sent = time.perf_counter()
+            try:
+                response = await client.get('/health')
+                healthy = response.status_code == 200 and response.json().get('status') == 'healthy'
+            except Exception:
+                healthy = False
+            elapsed = time.perf_counter() - sent
+            health_latencies.append(elapsed)
+            if not healthy or elapsed > BACKEND_HEALTH_TIMEOUT:
+                health_failures += 1
+            try:
+                await asyncio.wait_for(stop.wait(), health_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    checker = loop.create_task(health()) if health_interval > 0 else None
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = loop.time() - start
+    stop.set()
+    if checker is not None:
+        await checker
+
+    completed = len(latencies)
+    errors = sum(count for status, count in statuses.items() if status != '200')
+    over_timeout = sum(1 for seconds in latencies if seconds > BACKEND_PREDICT_TIMEOUT)
+    return {
+        'requests': completed,
+        'duration_seconds': elapsed,
+        'throughput_rps': completed / elapsed if elapsed else 0.0,
+        'latency': _percentiles(latencies),
+        'status_counts': dict(sorted(statuses.items())),
+        'error_rate': errors / completed if completed else 0.0,
+        'over_backend_timeout': over_timeout,
+        'over_backend_timeout_rate': over_timeout / completed if completed else 0.0,
+        'max_schedule_lag_ms': 1000.0 * max(lags) if lags else None,
+        'health': {
+            'checks': len(health_latencies),
+            'failures': health_failures,
+            **_percentiles(health_latencies)
+        }
+    }
+
+
+def check_slos(report: Dict[str, Any], limits: Dict[str, Optional[float]]) -> List[Dict[str, Any]]:
+    """Compare the report with each limit that is set; one row per limit."""
+    actual = {
+        'p50_ms': report['latency']['p50_ms'],
+        'p95_ms': report['latency']['p95_ms'],
+        'p99_ms': report['latency']['p99_ms'],
+        'error_rate': report['error_rate'],
+        'over_backend_timeout_rate': report['over_backend_timeout_rate']
+    }
+    rows = []
+    for metric, limit in limits.items():
+        if limit is None:
+            continue
+        value = actual[metric]
+        rows.append({
+            'metric': metric,
+            'limit': limit,
+            'actual': value,
+            'passed': value is not None and value <= limit
+        })
+    return rows
+
+
+def _in_process_client():
+    """AsyncClient calling api/app.py directly (no sockets)."""
+    import httpx
+
+    sys.path.insert(0, str(Path(__file__).parents[2] / 'api'))
+    # Model loading logs to stdout, which is kept for the JSON report
+    with contextlib.redirect_stdout(sys.stderr):
+        import app as api_app
+
+    if api_app.model_manager.current is None:
+        sys.exit("Models not loaded; train models first (or set MODEL_PATH)")
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=api_app.app), base_url='http://ds-api'
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Load test the DS API with the backend's call pattern"
+    )
+    parser.add_argument(
+        '--url', default=None, help='API base URL (default: run api/app.py in-process)'
+    )
+    parser.add_argument('--concurrency', type=int, default=32, help='Virtual users')
+    parser.add_argument('--requests', type=int, default=2000, help='Total /predict calls')
+    parser.add_argument('--duration', type=float, default=None, help='Stop after this many seconds')
+    parser.add_argument(
+        '--rate', type=float, default=None, help='Target arrival rate, requests/s (Poisson)'
+    )
+    parser.add_argument(
+        '--think-time', type=float, default=0.0, help="Mean pause between a user's calls, s"
+    )
+    parser.add_argument('--warmup', type=int, default=100, help='Unmeasured calls sent first')
+    parser.add_argument(
+        '--health-interval', type=float, default=5.0, help='Seconds between /health checks (0: off)'
+    )
+    parser.add_argument('--corpus', default='synthetic', help="'synthetic', 'mock' or a CSV path")
+    parser.add_argument('--corpus-rows', type=int, default=10000, help='Synthetic corpus size')
+    parser.add_argument('--mean-extra-sentences', type=float, default=1.0,
+                        help='Synthetic description length: mean extra detail sentences')
+    parser.add_argument('--seed', type=int, default=42, help='Corpus and sampling seed')
+    parser.add_argument(
+        '--slo-p50-ms', type=float, default=None, help='Fail if p50 latency is above this'
+    )
+    parser.add_argument(
+        '--slo-p95-ms', type=float, default=None, help='Fail if p95 latency is above this'
+    )
+    parser.add_argument(
+        '--slo-p99-ms', type=float, default=None, help='Fail if p99 latency is above this'
+    )
+    parser.add_argument(
+        '--max-error-rate', type=float, default=None, help='Fail if more calls fail'
+    )
+    parser.add_argument('--max-timeout-rate', type=float, default=None,
+                        help="Fail if more calls exceed the backend's 5 s timeout")
+    parser.add_argument('--output', type=Path, help='Write the JSON report here')
+    args = parser.parse_args(argv)
+
+    titles, descriptions = load_tickets(
+        args.corpus, args.corpus_rows, args.seed, args.mean_extra_sentences
+    )
+    lengths = np.array([len(t) + len(d) for t, d in zip(titles, descriptions)])
+
+    async def run() -> Dict[str, Any]:
+        import httpx
+
+        if args.url:
+            # Generous client timeout: slow calls are measured, not cut off at the backend's 5 s
+            client = httpx.AsyncClient(
+                base_url=args.url,
+                timeout=60.0,
+                limits=httpx.Limits(max_connections=args.concurrency + 1)
+            )
+        else:
+            client = _in_process_client()
+        async with client:
+            if args.warmup:
+                await run_load(client, titles, descriptions, min(args.concurrency, args.warmup),
+                               args.warmup, health_interval=0, seed=args.seed + 1)
+            return await run_load(
+                client, titles, descriptions,
+                concurrency=args.concurrency,
+                n_requests=args.requests,
+                duration=args.duration,
+                rate=args.rate,
+                think_time=args.think_time,
+                health_interval=args.health_interval,
+                seed=args.seed
+            )
+
+    report = asyncio.run(run())
+    report['config'] = {
+        'target': args.url or 'in-process',
+        'concurrency': args.concurrency,
+        'rate': args.rate,
+        'think_time': args.think_time,
+        'corpus': args.corpus,
+        'ticket_chars': {
+            'p50': int(np.percentile(lengths, 50)),
+            'p95': int(np.percentile(lengths, 95)),
+            'max': int(lengths.max())
+        }
+    }
+    report['slo'] = check_slos(report, {
+        'p50_ms': args.slo_p50_ms,
+        'p95_ms': args.slo_p95_ms,
+        'p99_ms': args.slo_p99_ms,
+        'error_rate': args.max_error_rate,
+        'over_backend_timeout_rate': args.max_timeout_rate
+    })
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(output)
+        print(f"Wrote load test report to {args.output}")
+    else:
+        print(output)
+
+    violations = [row for row in report['slo'] if not row['passed']]
+    for row in violations:
+        print(f"SLO VIOLATED {row['metric']}: {row['actual']} > {row['limit']}", file=sys.stderr)
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""
+Reproducible benchmark suite for the training pipeline and RequestPredictor.
+
+For each corpus size a seeded synthetic corpus (src/data/synthetic.py) is generated and
+pushed through the same steps as production:
+
+- vectorization: text normalization throughput, TF-IDF fit time and transform throughput
+- training: wall time of train_model.main (both heads, plus bundle export)
+- load: RequestPredictor construction time from pickles and from the bundle
+- predict: single-request p50/p99 latency and batch throughput (cache disabled)
+
+Results are written as JSON. Passing ``--baseline`` compares every metric against a
+stored run and exits non-zero when any metric regresses by more than ``--tolerance``.
+
+Usage (from packages/data-science):
+    python -m src.benchmarks.run_benchmarks --sizes 1000,10000 --output bench.json
+    python -m src.benchmarks.run_benchmarks --sizes 1000,10000 --baseline bench.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import sklearn
+from sklearn.preprocessing import LabelEncoder
+
+from src.data.synthetic import generate_corpus
+from src.features.build_features import save_features
+from src.features.normalize import normalize_texts
+from src.features.vectorizers import build_vectorizer
+from src.models import train_model
+from src.models.predict import RequestPredictor
+
+# Metrics where a larger value is better; everything else is a duration
+HIGHER_IS_BETTER = ('_per_second',)
+
+
+def _timed(fn: Callable[[], Any], repeat: int = 1) -> float:
+    """Best wall time of ``repeat`` calls, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def write_features(df, output_dir: Path, feature_mode: str = 'tfidf') -> Dict[str, float]:
+    """
+    Fit the feature step on df and write the artifacts train_model expects.
+
+    Mirrors notebooks/02-feature-engineering.ipynb (TF-IDF settings and artifact names);
+    ``feature_mode='hashing'`` uses the HashingFeaturizer instead.
+    """
+    # Same text RequestPredictor.preprocess_text builds at serving time
+    combined = (df['title'] + ' ' + df['description']).tolist()
+    vectorizer = build_vectorizer(feature_mode)
+
+    normalize_texts(combined[:1])  # keep the lemmatizer's one-off load out of the timing
+    start = time.perf_counter()
+    texts = normalize_texts(combined)
+    normalize_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    X = vectorizer.fit_transform(texts)
+    fit_seconds = time.perf_counter() - start
+
+    sample = texts[:min(len(texts), 10000)]
+    transform_seconds = _timed(lambda: vectorizer.transform(sample), repeat=3)
+
+    category_encoder, priority_encoder = LabelEncoder(), LabelEncoder()
+    save_features(
+        X,
+        category_encoder.fit_transform(df['category']),
+        priority_encoder.fit_transform(df['priority']),
+        vectorizer, category_encoder, priority_encoder, output_dir
+    )
+
+    return {
+        'normalize_docs_per_second': len(combined) / normalize_seconds,
+        'fit_seconds': fit_seconds,
+        'transform_docs_per_second': len(sample) / transform_seconds
+    }
+
+
+def bench_training(data_dir: Path, models_dir: Path) -> Dict[str, float]:
+    """Wall time of the full training script, output silenced."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        wall = _timed(lambda: train_model.main(data_dir, models_dir, export_bundle=True))
+    return {'wall_seconds': wall}
+
+
+def bench_load(models_dir: Path, data_dir: Path, repeat: int = 5) -> Dict[str, float]:
+    """Best-of-``repeat`` predictor construction time for each artifact format."""
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for mode, use_bundle in [('pickle', False), ('bundle', True)]:
+            results[f'{mode}_seconds'] = _timed(
+                lambda: RequestPredictor(str(models_dir), str(data_dir), use_bundle=use_bundle),
+                repeat=repeat
+            )
+    return results
+
+
+def bench_predict(
+    predictor: RequestPredictor,
+    requests: List[Dict[str, str]],
+    batch_sizes=(32, 256)
+) -> Dict[str, float]:
+    """Single-request latency percentiles and batch throughput, cache disabled."""
+    predictor.cache = None
+    predictor.instrument = False
+
+    latencies = []
+    for request in requests[:2000]:
+        start = time.perf_counter()
+        predictor.predict(request['title'], request['description'])
+        latencies.append(time.perf_counter() - start)
+    latencies_us = np.array(latencies) * 1e6
+
+    results = {
+        'single_p50_us': float(np.percentile(latencies_us, 50)),
+        'single_p99_us': float(np.percentile(latencies_us, 99))
+    }
+    for batch_size in batch_sizes:
+        batches = [requests[i:i + batch_size] for i in range(0, len(requests), batch_size)]
+        batches = [batch for batch in batches if len(batch) == batch_size][:50] or [requests]
+        seconds = _timed(lambda: [predictor.predict_batch(batch) for batch in batches])
+        results[f'batch{batch_size}_requests_per_second'] = sum(map(len, batches)) / seconds
+    return results
+
+
+def run(sizes: List[int], seed: int = 42) -> Dict[str, Any]:
+    """Run every benchmark for each corpus size and return the report."""
+    results: Dict[str, Dict[str, Any]] = {}
+    for size in sizes:
+        print(f"Benchmarking corpus size {size}...", file=sys.stderr)
+        df = generate_corpus(size, seed=seed)
+        requests = df[['title', 'description']].to_dict('records')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir, models_dir = Path(tmp) / 'processed', Path(tmp) / 'models'
+            entry = {'vectorization': write_features(df, data_dir)}
+            entry['training'] = bench_training(data_dir, models_dir)
+            entry['load'] = bench_load(models_dir, data_dir)
+            with contextlib.redirect_stdout(io.StringIO()):
+                predictor = RequestPredictor(str(models_dir), str(data_dir))
+            entry['predict'] = bench_predict(predictor, requests)
+        results[str(size)] = entry
+
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(),
+            'seed': seed,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'scikit_learn': sklearn.__version__,
+            'machine': platform.machine(),
+            'platform': platform.platform()
+        },
+        'results': results
+    }
+
+
+def _flatten(results: Dict[str, Any], prefix: str = '') -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        path = f'{prefix}/{key}' if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path))
+        else:
+            flat[path] = value
+    return flat
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.1
+) -> List[Dict[str, Any]]:
+    """
+    Compare two reports metric by metric.
+
+    Returns:
+        One entry per metric present in both reports, with the relative change
+        (positive = better) and whether it regressed by more than ``tolerance``
+    """
+    now, before = _flatten(current['results']), _flatten(baseline['results'])
+    rows = []
+    for metric in sorted(now.keys() & before.keys()):
+        old, new = before[metric], now[metric]
+        if not old:
+            continue
+        higher_is_better = metric.endswith(HIGHER_IS_BETTER)
+        change = (new - old) / old if higher_is_better else (old - new) / old
+        rows.append({
+            'metric': metric,
+            'baseline': old,
+            'current': new,
+            'change': change,
+            'regressed': change < -tolerance
+        })
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the DS training and prediction pipeline"
+    )
+    parser.add_argument('--sizes', default='1000,10000', help='Comma-separated corpus sizes')
+    parser.add_argument('--seed', type=int, default=42, help='Corpus random seed')
+    parser.add_argument('--output', type=Path, help='Write the JSON report here')
+    parser.add_argument('--baseline', type=Path, help='Compare against this stored report')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='Allowed relative regression before failing (default 10%%)')
+    args = parser.parse_args(argv)
+
+    report = run([int(size) for size in args.sizes.split(',')], seed=args.seed)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['comparison'] = compare(report, json.load(f), args.tolerance)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(output)
+        print(f"Wrote benchmark report to {args.output}")
+    else:
+        print(output)
+
+    regressions = [row for row in report.get('comparison', []) if row['regressed']]
+    for row in regressions:
+        print(f"REGRESSION {row['metric']}: {row['baseline']:.4g} -> {row['current']:.4g} "
+              f"({row['change']:+.1%})", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+Columnar cache for training data.
+
+Parsing requests.csv (or JSON) and converting its timestamp columns is the slow part
+of every notebook and training run. The first load of a source file writes a Parquet
+copy with compact dtypes (low-cardinality columns as categoricals, timestamps already
+parsed); later loads read that copy, projecting only the requested columns.
+
+Cache entries are keyed on the source file's path and fingerprint (size and
+modification time) plus CACHE_FORMAT_VERSION, so editing the source or changing the
+dtype rules invalidates them automatically. Stale entries for the same source are removed when a
+new one is written.
+
+If no Parquet engine (pyarrow or fastparquet) can be imported, entries are written as
+pandas pickles instead, with a warning naming the import error: dtypes are preserved
+but columns are projected after loading. pyarrow 26+ needs NumPy 2, so the declared
+range stops below it while NumPy is pinned to 1.x.
+
+Usage:
+    df = load_cached(Path('contracts/mock-data/requests.csv'), columns=['title', 'category'])
+
+Compare cold parsing with cached loads (from packages/data-science):
+    python -m src.data.frame_cache --rows 200000
+"""
+
+import hashlib
+import json
+import os
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+
+# Bump when compact_dtypes changes so old entries are not reused
+CACHE_FORMAT_VERSION = 1
+
+CATEGORICAL_COLUMNS = (
+    'category', 'priority', 'status', 'requester_type', 'channel', 'assigned_to', 'resolution_code'
+)
+TIMESTAMP_COLUMNS = (
+    'created_at', 'updated_at', 'resolved_at', 'createdAt', 'updatedAt', 'resolvedAt'
+)
+PARQUET_ENGINES = ('pyarrow', 'fastparquet')
+
+
+def default_cache_dir() -> Path:
+    return Path(os.getenv('DATA_CACHE_DIR', Path(__file__).parents[2] / 'data' / 'cache'))
+
+
+def _short_hash(key: str) -> str:
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def fingerprint(path: Path) -> str:
+    """Short hash of the source's size and mtime (and the cache format version)."""
+    stat = Path(path).stat()
+    return _short_hash(f"{CACHE_FORMAT_VERSION}:{stat.st_size}:{stat.st_mtime_ns}")
+
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert enum-like columns to categoricals and parse timestamps, in place."""
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+    for column in TIMESTAMP_COLUMNS:
+        if column in df.columns and not pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = pd.to_datetime(df[column], errors='coerce', utc=True)
+    return df
+
+
+def read_source(path: Path) -> pd.DataFrame:
+    """Parse a CSV or JSON (list of records) request file."""
+    path = Path(path)
+    if path.suffix == '.csv':
+        return pd.read_csv(path)
+    if path.suffix == '.json':
+        with open(path) as f:
+            return pd.DataFrame(json.load(f))
+    raise ValueError(f"Unsupported source format: {path.suffix}")
+
+
+@lru_cache(maxsize=None)
+def parquet_engine_available() -> bool:
+    """True if pandas can write Parquet; warns (once) when caches fall back to pickles."""
+    errors = []
+    for module in PARQUET_ENGINES:
+        try:
+            __import__(module)
+            return True
+        except ImportError as e:
+            errors.append(f"{module}: {e}")
+    print(f"⚠️  Warning: no Parquet engine ({'; '.join(errors)}); "
+          f"data caches are written as pickles instead", file=sys.stderr)
+    return False
+
+
+def load_cached(
+    source_path: Path,
+    columns: Optional[List[str]] = None,
+    cache_dir: Optional[Path] = None
+) -> pd.DataFrame:
+    """
+    Load a request file through the columnar cache.
+
+    Args:
+        source_path: CSV or JSON file to load
+        columns: Columns to return (all if None)
+        cache_dir: Cache directory (defaults to env DATA_CACHE_DIR or data/cache)
+
+    Returns:
+        DataFrame with compact dtypes (see compact_dtypes)
+    """
+    source_path = Path(source_path)
+    cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+    use_parquet = parquet_engine_available()
+    suffix = '.parquet' if use_parquet else '.pkl'
+    # <stem>-<source id>-<fingerprint>: the source id keeps same-named files apart
+    prefix = f"{source_path.stem}-{_short_hash(str(source_path.resolve()))}"
+    cache_path = cache_dir / f"{prefix}-{fingerprint(source_path)}{suffix}"
+
+    if cache_path.exists():
+        if use_parquet:
+            return pd.read_parquet(cache_path, columns=columns)
+        df = pd.read_pickle(cache_path)
+        return df[columns] if columns else df
+
+    df = compact_dtypes(read_source(source_path))
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(f".{cache_path.name}.tmp")
+    if use_parquet:
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, cache_path)
+
+    # Entries for earlier versions of this source can never be hit again
+    for stale in cache_dir.glob(f"{prefix}-*"):
+        if stale != cache_path and stale.suffix in ('.parquet', '.pkl'):
+            stale.unlink(missing_ok=True)
+
+    return df[columns] if columns else df
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+    import time
+
+    from src.data.synthetic import generate_requests
+
+    parser = argparse.ArgumentParser(description="Compare CSV parsing with cached loads")
+    parser.add_argument(
+        '--rows', type=int, default=200000, help='Synthetic requests in the source CSV'
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / 'requests.csv'
+        for i, chunk in enumerate(generate_requests(args.rows)):
+            chunk.to_csv(source, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+
+        start = time.perf_counter()
+        raw = pd.read_csv(source)
+        for column in TIMESTAMP_COLUMNS:
+            if column in raw.columns:
+                raw[column] = pd.to_datetime(raw[column], errors='coerce')
+        parse_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        load_cached(source, cache_dir=Path(tmp) / 'cache')
+        first_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cached = load_cached(source, cache_dir=Path(tmp) / 'cache')
+        cached_seconds = time.perf_counter() - start
+
+        training_columns = ['title', 'description', 'category', 'priority']
+        start = time.perf_counter()
+        projected = load_cached(source, columns=training_columns, cache_dir=Path(tmp) / 'cache')
+        projected_seconds = time.perf_counter() - start
+
+        print(json.dumps({
+            'rows': args.rows,
+            'format': 'parquet' if parquet_engine_available() else 'pickle',
+            'csv_parse_seconds': parse_seconds,
+            'first_cached_load_seconds': first_seconds,
+            'cached_load_seconds': cached_seconds,
+            'projected_load_seconds': projected_seconds,
+            'csv_memory_mb': raw.memory_usage(deep=True).sum() / 2 ** 20,
+            'cached_memory_mb': cached.memory_usage(deep=True).sum() / 2 ** 20,
+            'projected_memory_mb': projected.memory_usage(deep=True).sum() / 2 ** 20
+        }, indent=2))
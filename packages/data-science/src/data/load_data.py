@@ -8,89 +8,326 @@ This module provides functions to load data from:
 """
 
 import pandas as pd
-import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 import os
 from dotenv import load_dotenv
 
+from src.data.frame_cache import TIMESTAMP_COLUMNS, load_cached, read_source
+
 load_dotenv()
 
 
-def load_mock_data(format: str = "csv") -> pd.DataFrame:
+def load_mock_data(
+    format: str = "csv",
+    columns: Optional[List[str]] = None,
+    use_cache: bool = True
+) -> pd.DataFrame:
     """
     Load mock data from contracts/mock-data directory.
     
     Args:
         format: 'csv' or 'json'
+        columns: Only load these columns
+        use_cache: Load through the columnar cache (see src/data/frame_cache.py), which
+            parses the file once and stores categoricals and parsed timestamps
         
     Returns:
         DataFrame with request data
         
     TODO: Update path based on actual project structure
     """
-    base_path = Path(__file__).parents[3] / "contracts" / "mock-data"
+    base_path = Path(__file__).parents[4] / "contracts" / "mock-data"
     
-    if format == "csv":
-        file_path = base_path / "requests.csv"
-        df = pd.read_csv(file_path)
-    elif format == "json":
-        file_path = base_path / "requests.json"
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        df = pd.DataFrame(data)
-    else:
+    if format not in ("csv", "json"):
         raise ValueError(f"Unsupported format: {format}")
+    file_path = base_path / f"requests.{format}"
+
+    if use_cache:
+        df = load_cached(file_path, columns=columns)
+    else:
+        df = read_source(file_path)
+        if columns:
+            df = df[columns]
     
     print(f"Loaded {len(df)} requests from {file_path}")
     return df
 
 
-def load_from_api(api_url: Optional[str] = None, api_key: Optional[str] = None) -> pd.DataFrame:
+def _utc_timestamp(value: str) -> pd.Timestamp:
+    """Parse an ISO timestamp, treating naive values as UTC."""
+    timestamp = pd.Timestamp(value)
+    return timestamp.tz_localize('UTC') if timestamp.tzinfo is None else timestamp.tz_convert('UTC')
+
+
+def _api_session(api_key: Optional[str], pool_size: int, retries: int):
+    """
+    Build a requests.Session with a connection pool and retry policy.
+
+    Idempotent GETs are retried with exponential backoff on connection errors,
+    429 and 5xx responses (honouring Retry-After).
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET']),
+        respect_retry_after_header=True
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if api_key:
+        session.headers['Authorization'] = f"Bearer {api_key}"
+    return session
+
+
+def iter_api_pages(
+    api_url: Optional[str] = None,
+    api_key: Optional[str] = None,
+    page_size: int = 100,
+    max_workers: int = 4,
+    timeout: Tuple[float, float] = (5.0, 30.0),
+    retries: int = 3,
+    updated_since: Optional[str] = None,
+    newest_first: Optional[bool] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield the backend's request records one page at a time, in page order.
+
+    Page 1 is fetched first to learn ``pagination.total_pages``; the remaining pages
+    are fetched concurrently by at most ``max_workers`` threads sharing one pooled
+    session, and at most ``2 * max_workers`` pages are held ahead of the consumer. A
+    backend that returns a bare JSON list (no pagination) is read as a single page.
+
+    The API contract has no server-side ``updated_since`` filter, so by default every
+    page is downloaded and filtered here. If the backend is known to list the most
+    recently updated tickets first, ``newest_first`` stops paging at the first page
+    whose tickets are all older than ``updated_since``. Should the pages turn out not
+    to be in that order, paging carries on to the last page.
+
+    Args:
+        api_url: Backend base URL (defaults to env var BACKEND_API_URL)
+        api_key: API key for authentication (defaults to env var BACKEND_API_KEY)
+        page_size: Records per page (the API contract allows at most 100)
+        max_workers: Maximum pages in flight at once
+        timeout: (connect, read) timeout in seconds for each page
+        retries: Retries per page on connection errors, 429 and 5xx
+        updated_since: ISO timestamp; sent as ``updated_since`` so backends that
+            support it return only tickets updated since then, and applied client-side
+            as well (the API contract has no such filter yet)
+        newest_first: The backend lists tickets by ``updated_at``, newest first
+            (defaults to env var BACKEND_API_NEWEST_FIRST)
+
+    Yields:
+        Each page's records (after the ``updated_since`` filter)
+    """
+    api_url = api_url or os.getenv("BACKEND_API_URL", "http://localhost:3000")
+    api_key = api_key or os.getenv("BACKEND_API_KEY")
+    if newest_first is None:
+        newest_first = os.getenv("BACKEND_API_NEWEST_FIRST", "false").lower() == "true"
+
+    # TODO: Adjust endpoint based on actual API
+    endpoint = f"{api_url}/api/requests"
+    base_params: Dict[str, Any] = {'limit': page_size}
+    if updated_since:
+        base_params['updated_since'] = updated_since
+
+    since = _utc_timestamp(updated_since) if updated_since else None
+    # Oldest updated_at seen so far, while the pages are still in newest-first order
+    oldest: Optional[pd.Timestamp] = None
+    in_order = newest_first and since is not None
+
+    def past_mark(records: List[Dict[str, Any]]) -> bool:
+        """True once a newest-first listing has moved entirely below the high-water mark."""
+        nonlocal oldest, in_order
+        if not in_order or not records:
+            return False
+        if not all(record.get('updated_at') for record in records):
+            return False
+        stamps = [_utc_timestamp(record['updated_at']) for record in records]
+        if any(later > earlier for earlier, later in zip([oldest or stamps[0]] + stamps, stamps)):
+            in_order = False
+            return False
+        oldest = stamps[-1]
+        return bool(stamps[0] < since)
+
+    def select(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if since is None:
+            return records
+        # >= rather than >: tickets sharing the mark's timestamp may not all have been
+        # seen yet, and re-fetched ones are deduplicated by id when merged
+        return [
+            record for record in records
+            if not record.get('updated_at') or _utc_timestamp(record['updated_at']) >= since
+        ]
+
+    with _api_session(api_key, max_workers, retries) as session:
+        def fetch_page(page: int):
+            response = session.get(endpoint, params={**base_params, 'page': page}, timeout=timeout)
+            response.raise_for_status()
+            return response.json()
+
+        first = fetch_page(1)
+        if isinstance(first, list):
+            yield select(first)
+            return
+        records = list(first.get('data', []))
+        yield select(records)
+        total_pages = int(first.get('pagination', {}).get('total_pages') or 1)
+        if total_pages <= 1 or past_mark(records):
+            return
+        pages = iter(range(2, total_pages + 1))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            # Bounded read-ahead, consumed in page order
+            in_flight = deque(
+                pool.submit(fetch_page, page) for page in islice(pages, 2 * max_workers)
+            )
+            while in_flight:
+                records = in_flight.popleft().result().get('data', [])
+                yield select(records)
+                if past_mark(records):
+                    for future in in_flight:
+                        future.cancel()
+                    return
+                for page in islice(pages, 1):
+                    in_flight.append(pool.submit(fetch_page, page))
+
+
+def fetch_api_records(
+    api_url: Optional[str] = None,
+    api_key: Optional[str] = None,
+    updated_since: Optional[str] = None,
+    **kwargs
+) -> List[Dict[str, Any]]:
+    """
+    Fetch every request record from the backend API (see ``iter_api_pages``).
+
+    Args:
+        api_url: Backend base URL (defaults to env var BACKEND_API_URL)
+        api_key: API key for authentication (defaults to env var BACKEND_API_KEY)
+        updated_since: Only records updated since this ISO timestamp
+        **kwargs: Paging, concurrency, timeout and retry settings for iter_api_pages
+
+    Returns:
+        Records in page order
+    """
+    return [
+        record
+        for page in iter_api_pages(api_url, api_key, updated_since=updated_since, **kwargs)
+        for record in page
+    ]
+
+
+def load_from_api(
+    api_url: Optional[str] = None,
+    api_key: Optional[str] = None,
+    updated_since: Optional[str] = None,
+    **kwargs
+) -> pd.DataFrame:
     """
     Load data from backend API.
     
     Args:
         api_url: Backend API endpoint (defaults to env var BACKEND_API_URL)
         api_key: API key for authentication (defaults to env var BACKEND_API_KEY)
+        updated_since: Only return tickets updated after this ISO timestamp
+        **kwargs: Paging, concurrency and retry settings for fetch_api_records
         
     Returns:
         DataFrame with request data
-        
-    TODO: Implement API client logic
     """
-    import requests
-    
-    api_url = api_url or os.getenv("BACKEND_API_URL", "http://localhost:3000")
-    api_key = api_key or os.getenv("BACKEND_API_KEY")
-    
-    headers = {}
-    if api_key:
-        headers["Authorization"] = f"Bearer {api_key}"
-    
-    # TODO: Adjust endpoint based on actual API
-    response = requests.get(f"{api_url}/api/requests", headers=headers)
-    response.raise_for_status()
-    
-    data = response.json()
-    df = pd.DataFrame(data)
+    records = fetch_api_records(api_url, api_key, updated_since=updated_since, **kwargs)
+    df = pd.DataFrame(records)
     
     print(f"Loaded {len(df)} requests from API")
     return df
 
 
-def preprocess_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+def sync_from_api(
+    store_path: Optional[Path] = None,
+    api_url: Optional[str] = None,
+    api_key: Optional[str] = None,
+    **kwargs
+) -> pd.DataFrame:
+    """
+    Incrementally mirror the backend's requests into a local CSV store.
+
+    The store's latest ``updated_at`` is the high-water mark: only tickets updated
+    after it are fetched, then merged by ``id`` (edited tickets replace their old
+    row). The merged store is written to a temporary file and renamed into place,
+    so readers never see a partial file.
+
+    Args:
+        store_path: Local store (defaults to env API_STORE_PATH or data/raw/api_requests.csv)
+        api_url: Backend API endpoint (defaults to env var BACKEND_API_URL)
+        api_key: API key for authentication (defaults to env var BACKEND_API_KEY)
+        **kwargs: Paging, concurrency and retry settings for fetch_api_records
+
+    Returns:
+        The full merged DataFrame
+    """
+    if store_path is None:
+        store_path = Path(os.getenv(
+            "API_STORE_PATH", str(Path(__file__).parents[2] / "data" / "raw" / "api_requests.csv")
+        ))
+    store_path = Path(store_path)
+
+    store = pd.read_csv(store_path) if store_path.exists() else pd.DataFrame()
+    high_water_mark = None
+    if 'updated_at' in store.columns and not store.empty:
+        high_water_mark = pd.to_datetime(store['updated_at'], errors='coerce', utc=True).max()
+        high_water_mark = None if pd.isna(high_water_mark) else high_water_mark.isoformat()
+
+    changes = pd.DataFrame(
+        fetch_api_records(api_url, api_key, updated_since=high_water_mark, **kwargs)
+    )
+    print(
+        f"Fetched {len(changes)} new or updated requests since {high_water_mark or 'the beginning'}"
+    )
+    if changes.empty:
+        return store
+
+    if 'tags' in changes.columns:
+        # Match contracts/mock-data/requests.csv, which stores tags comma-joined
+        changes['tags'] = changes['tags'].map(
+            lambda tags: ','.join(tags) if isinstance(tags, list) else tags
+        )
+
+    merged = pd.concat([store, changes], ignore_index=True)
+    if 'id' in merged.columns:
+        merged = merged.drop_duplicates(subset='id', keep='last')
+
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = store_path.with_name(f".{store_path.name}.tmp")
+    merged.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, store_path)
+
+    print(f"Local store {store_path} now has {len(merged)} requests")
+    return merged
+
+
+def preprocess_dataframe(df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
     """
     Basic preprocessing of request data.
     
     Args:
         df: Raw DataFrame
+        copy: Work on a copy; pass False when the caller owns df (e.g. a fresh load)
         
     Returns:
         Preprocessed DataFrame
     """
-    # Make a copy
-    df = df.copy()
+    if copy:
+        df = df.copy()
     
     # Handle missing values
     df['title'] = df['title'].fillna('')
@@ -102,31 +339,35 @@ def preprocess_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     if 'priority' not in df.columns:
         raise ValueError("Missing 'priority' column")
     
-    # Convert timestamps if present
-    timestamp_cols = ['createdAt', 'updatedAt', 'resolvedAt']
-    for col in timestamp_cols:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors='coerce')
+    # Convert timestamps if present (cached loads already have them parsed)
+    for col in TIMESTAMP_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors='coerce', utc=True)
     
     return df
 
 
-def get_training_data(use_local: bool = True) -> pd.DataFrame:
+def get_training_data(use_local: bool = True, columns: Optional[List[str]] = None) -> pd.DataFrame:
     """
     Get data for model training.
     
     Args:
-        use_local: If True, use local mock data; otherwise fetch from API
+        columns: Only load these columns (must include title, description,
+            category and priority)
+        use_local: If True, use local mock data; otherwise sync new and updated
+            tickets from the API into the local store and use that
         
     Returns:
         DataFrame ready for training
     """
     if use_local or os.getenv("USE_LOCAL_DATA", "true").lower() == "true":
-        df = load_mock_data(format="csv")
+        df = load_mock_data(format="csv", columns=columns)
     else:
-        df = load_from_api()
+        df = sync_from_api()
+        if columns:
+            df = df[columns]
     
-    df = preprocess_dataframe(df)
+    df = preprocess_dataframe(df, copy=False)
     return df
 
 
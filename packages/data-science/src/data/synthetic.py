@@ -0,0 +1,274 @@
+"""
+Synthetic request corpus generator.
+
+A seeded Python port of contracts/mock-data/data-generator.js that produces the same
+columns as contracts/mock-data/requests.csv. Rows are generated in fixed-size chunks
+so corpora of millions of requests can be streamed to disk without holding them in
+memory. Description length varies per ticket (extra detail sentences are drawn from a
+geometric distribution) to mimic the long tail of real tickets.
+
+Usage:
+    df = generate_corpus(10000, seed=42)
+    for chunk in generate_requests(5_000_000, chunk_size=100_000):
+        ...
+
+    python -m src.data.synthetic --rows 1000000 --output data/raw/synthetic.csv
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+CATEGORIES = ['technical', 'account', 'billing', 'general']
+STATUSES = ['new', 'triaged', 'in_progress', 'waiting', 'resolved', 'closed']
+REQUESTER_TYPES = ['free', 'paid', 'enterprise', 'internal']
+CHANNELS = ['email', 'chat', 'phone', 'web_form', 'api']
+AGENTS = ['agent-001', 'agent-002', 'agent-003', 'agent-004', 'agent-005', 'agent-006']
+RESOLUTION_CODES = ['solved', 'workaround', 'duplicate', 'wont_fix']
+
+COLUMNS = [
+    'id', 'title', 'description', 'category', 'priority', 'status', 'requester_type',
+    'channel', 'created_at', 'updated_at', 'assigned_to', 'resolution_code', 'tags'
+]
+
+TITLE_TEMPLATES = {
+    'technical': [
+        'Cannot {action} {feature}',
+        '{feature} not working',
+        'Error when {action}',
+        'Slow performance in {feature}',
+        '{feature} crashes on {platform}',
+        'Integration with {service} failing',
+        'API {issue} errors',
+        'Database connection {issue}',
+        '{feature} timeout errors',
+    ],
+    'account': [
+        'Update {field} on account',
+        'Cannot {action} team members',
+        'User permissions not {state}',
+        'Need to {action} subscription',
+        'Delete my account and data',
+        'Forgot {credential}',
+        'Change {setting} settings',
+        'Account {issue} issue',
+    ],
+    'billing': [
+        'Payment {issue}',
+        '{issue} charge on credit card',
+        'Invoice {action} for last month',
+        'Billing cycle {action} request',
+        'Refund request for {reason}',
+        'Promo code not {state}',
+        'Subscription {action} failed',
+        'Need invoice with {requirement}',
+    ],
+    'general': [
+        'How to {action}',
+        'Feature request: {feature}',
+        'Request documentation for {topic}',
+        'Question about {topic}',
+        'Need training for {purpose}',
+        'Request access to {feature}',
+        'Feedback on {feature}',
+        'Suggestion: {feature}',
+    ],
+}
+
+SUBSTITUTIONS = {
+    'action': ['access', 'login', 'export', 'import', 'update', 'change', 'add', 'remove',
+               'configure'],
+    'feature': ['dashboard', 'reports', 'analytics', 'API', 'mobile app', 'notifications',
+                'webhooks', 'workflows'],
+    'platform': ['iOS', 'Android', 'Chrome', 'Firefox', 'Safari', 'Windows', 'macOS', 'Linux'],
+    'service': ['Salesforce', 'Slack', 'Google Sheets', 'Zapier', 'HubSpot', 'Jira', 'GitHub'],
+    'issue': ['failed', 'timeout', 'rate limit', 'connection', 'authentication', 'authorization'],
+    'field': ['email address', 'name', 'timezone', 'language', 'phone number'],
+    'state': ['applying', 'working', 'loading', 'syncing', 'enabled'],
+    'credential': ['password', 'username', 'API key', '2FA device'],
+    'setting': ['notification', 'privacy', 'security', 'team', 'billing'],
+    'reason': ['unused subscription', 'duplicate charge', 'cancellation', 'service issue'],
+    'requirement': ['VAT number', 'tax ID', 'PO number', 'billing address'],
+    'topic': ['pricing', 'features', 'API', 'security', 'compliance', 'integrations'],
+    'purpose': ['new team members', 'onboarding', 'advanced features', 'API usage'],
+}
+
+TAG_POOLS = {
+    'technical': ['bug', 'performance', 'api', 'integration', 'mobile', 'web', 'crash', 'error',
+                  'timeout', 'authentication', 'authorization'],
+    'account': ['account-management', 'permissions', 'team', 'user', 'subscription', 'profile',
+                'settings', 'privacy'],
+    'billing': ['payment', 'invoice', 'refund', 'subscription', 'pricing', 'discount',
+                'promo-code', 'tax', 'vat'],
+    'general': ['how-to', 'feature-request', 'documentation', 'training', 'feedback', 'question',
+                'sales'],
+}
+
+INTROS = [
+    "I'm experiencing an issue where",
+    'For the past few hours,',
+    'Since this morning,',
+    "I've noticed that",
+    'When I try to',
+    "I'm having trouble with",
+]
+DETAILS = [
+    "This is affecting our team's productivity.",
+    "I've tried the standard troubleshooting steps.",
+    'This only started after the recent update.',
+    'Other users in my organization are having the same issue.',
+    "I've checked the documentation but couldn't find a solution.",
+    "This is urgent as it's blocking our work.",
+]
+CLOSINGS = [
+    'Can you please help me resolve this?',
+    'Please investigate as soon as possible.',
+    'Any guidance would be appreciated.',
+    'Looking forward to your response.',
+    'Please let me know what information you need from me.',
+]
+
+# Priority distributions mirroring generatePriority() in data-generator.js
+PRIORITY_POOLS = {
+    'enterprise': ['P0', 'P1', 'P2'],
+    'billing': ['P1', 'P2', 'P2', 'P3'],
+    'technical': ['P0', 'P1', 'P1', 'P2', 'P2', 'P3'],
+    'default': ['P2', 'P2', 'P3', 'P3', 'P3'],
+}
+
+_PLACEHOLDER = re.compile(r'\{(\w+)\}')
+
+
+def _fill_template(template: str, rng: np.random.Generator) -> str:
+    return _PLACEHOLDER.sub(
+        lambda match: SUBSTITUTIONS[match.group(1)][
+            rng.integers(len(SUBSTITUTIONS[match.group(1)]))
+        ],
+        template
+    )
+
+
+def _priority(category: str, requester_type: str, rng: np.random.Generator) -> str:
+    if requester_type == 'enterprise':
+        pool = PRIORITY_POOLS['enterprise']
+    else:
+        pool = PRIORITY_POOLS.get(category, PRIORITY_POOLS['default'])
+    return pool[rng.integers(len(pool))]
+
+
+def _generate_chunk(
+    start: int,
+    size: int,
+    rng: np.random.Generator,
+    end_time: datetime,
+    mean_extra_sentences: float
+) -> pd.DataFrame:
+    """Generate ``size`` requests with ids starting after ``start``."""
+    categories = rng.choice(CATEGORIES, size)
+    requester_types = rng.choice(REQUESTER_TYPES, size)
+    statuses = rng.choice(STATUSES, size)
+    channels = rng.choice(CHANNELS, size)
+    extra_sentences = rng.geometric(1.0 / (1.0 + mean_extra_sentences), size) - 1
+
+    week = 7 * 24 * 3600
+    created_offsets = rng.uniform(0, week, size)
+    updated_offsets = np.minimum(created_offsets, rng.uniform(0, 5 * 24 * 3600, size))
+
+    rows = []
+    for i in range(size):
+        category = categories[i]
+        status = statuses[i]
+        title = _fill_template(
+            TITLE_TEMPLATES[category][rng.integers(len(TITLE_TEMPLATES[category]))], rng
+        )
+
+        sentences = [f"{INTROS[rng.integers(len(INTROS))]} {title.lower()}."]
+        sentences.extend(
+            DETAILS[j] for j in rng.integers(len(DETAILS), size=1 + extra_sentences[i])
+        )
+        sentences.append(CLOSINGS[rng.integers(len(CLOSINGS))])
+
+        pool = TAG_POOLS[category]
+        tags = rng.choice(pool, size=min(2 + rng.integers(3), len(pool)), replace=False)
+
+        created_at = end_time - timedelta(seconds=float(created_offsets[i]))
+        if status == 'new':
+            updated_at = created_at
+        else:
+            updated_at = end_time - timedelta(seconds=float(updated_offsets[i]))
+        assigned = status != 'new' and rng.random() < len(AGENTS) / (len(AGENTS) + 1)
+
+        resolved = status in ('resolved', 'closed')
+
+        rows.append((
+            f"REQ-{start + i + 1:06d}",
+            title,
+            ' '.join(sentences),
+            category,
+            _priority(category, requester_types[i], rng),
+            status,
+            requester_types[i],
+            channels[i],
+            created_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            updated_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            AGENTS[rng.integers(len(AGENTS))] if assigned else None,
+            RESOLUTION_CODES[rng.integers(len(RESOLUTION_CODES))] if resolved else None,
+            ','.join(tags)
+        ))
+
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+def generate_requests(
+    n_rows: int,
+    seed: int = 42,
+    chunk_size: int = 100_000,
+    end_time: Optional[datetime] = None,
+    mean_extra_sentences: float = 1.0
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a synthetic corpus as DataFrame chunks.
+
+    Args:
+        n_rows: Total number of requests
+        seed: Random seed; the same seed and chunk_size always give the same corpus
+        chunk_size: Rows per yielded DataFrame
+        end_time: Latest created_at timestamp (defaults to 2026-02-04T12:00:00Z)
+        mean_extra_sentences: Mean number of extra detail sentences per description
+
+    Yields:
+        DataFrames with the columns of contracts/mock-data/requests.csv
+    """
+    rng = np.random.default_rng(seed)
+    end_time = end_time or datetime(2026, 2, 4, 12, 0, tzinfo=timezone.utc)
+    for start in range(0, n_rows, chunk_size):
+        yield _generate_chunk(
+            start, min(chunk_size, n_rows - start), rng, end_time, mean_extra_sentences
+        )
+
+
+def generate_corpus(n_rows: int, seed: int = 42, **kwargs) -> pd.DataFrame:
+    """Generate a synthetic corpus as a single DataFrame (see generate_requests)."""
+    chunks: List[pd.DataFrame] = list(generate_requests(n_rows, seed=seed, **kwargs))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=COLUMNS)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic request corpus")
+    parser.add_argument('--rows', type=int, default=10000, help='Number of requests')
+    parser.add_argument('--output', type=Path, default=Path('../data/raw/synthetic_requests.csv'),
+                        help='Output CSV path')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--chunk-size', type=int, default=100_000, help='Rows generated per chunk')
+    args = parser.parse_args()
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    for i, chunk in enumerate(generate_requests(args.rows, args.seed, args.chunk_size)):
+        chunk.to_csv(args.output, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+    print(f"Wrote {args.rows} requests to {args.output}")
@@ -0,0 +1,290 @@
+"""
+Scripted feature pipeline (production replacement for notebooks/02-feature-engineering.ipynb).
+
+Loads requests, normalizes ``title + ' ' + description`` with the shared normalizer,
+fits the vectorizer and label encoders, and writes the artifacts that
+``train_model.load_processed_data`` and RequestPredictor expect:
+
+    X_tfidf.npz, y_category.npy, y_priority.npy, features.json,
+    tfidf_vectorizer.pkl (or hashing_idf.npy), category_encoder.pkl, priority_encoder.pkl
+
+Normalization is the expensive step, so its output is cached per row in
+``<DATA_CACHE_DIR>/normalized-<normalizer fingerprint>.parquet`` (or ``.pkl``), keyed
+by request id plus a hash of the row's title and description. A retrain only
+normalizes new or edited tickets; those are spread over a process pool. The cache
+is keyed on the normalizer's settings too (stopwords, whether WordNet is
+available), so changing them starts a fresh cache instead of mixing outputs.
+
+Usage (from packages/data-science):
+    python -m src.features.build_features --output-dir ../data/processed
+    python -m src.features.build_features --input ../data/raw/requests.csv --workers 8
+    python -m src.features.build_features --feature-mode hashing
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse
+from sklearn.preprocessing import LabelEncoder
+
+from src.data.frame_cache import default_cache_dir, parquet_engine_available
+from src.features.normalize import (
+    NORMALIZER_VERSION,
+    STOPWORDS,
+    lemmatization_available,
+    normalize_texts
+)
+from src.features.vectorizers import FEATURE_MODES, build_vectorizer, save_vectorizer
+from src.monitoring.drift import TEXT_PROFILE_FILE, held_out_text_profile
+
+# Rows per process-pool task; large enough that pickling overhead stays small
+POOL_CHUNK_SIZE = 5_000
+
+COLUMNS = ['id', 'title', 'description', 'category', 'priority']
+
+
+def normalizer_fingerprint() -> str:
+    """Short hash of everything that changes normalize_text's output."""
+    key = f"{NORMALIZER_VERSION}:{' '.join(sorted(STOPWORDS))}:{lemmatization_available()}"
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def combined_text(df: pd.DataFrame) -> pd.Series:
+    """title + ' ' + description, as built by the notebook and RequestPredictor."""
+    return df['title'].fillna('').astype(str) + ' ' + df['description'].fillna('').astype(str)
+
+
+def content_hashes(texts: pd.Series) -> np.ndarray:
+    """Vectorized 64-bit hash of each text (pandas' stable object hashing)."""
+    return np.asarray(pd.util.hash_pandas_object(texts, index=False).to_numpy())
+
+
+class NormalizedTextCache:
+    """
+    Normalized text per request, keyed by id and content hash.
+
+    Usage:
+        cache = NormalizedTextCache.load()
+        texts, stats = cache.normalize(ids, combined, workers=4)
+        cache.save()
+    """
+
+    def __init__(self, path: Path, entries: Optional[pd.DataFrame] = None):
+        self.path = path
+        self.entries = entries if entries is not None else pd.DataFrame(
+            {'hash': pd.Series(dtype='uint64'), 'text': pd.Series(dtype=object)},
+            index=pd.Index([], dtype=object, name='id')
+        )
+
+    @classmethod
+    def load(cls, cache_dir: Optional[Path] = None) -> 'NormalizedTextCache':
+        cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        suffix = '.parquet' if parquet_engine_available() else '.pkl'
+        path = cache_dir / f"normalized-{normalizer_fingerprint()}{suffix}"
+        if not path.exists():
+            return cls(path)
+        entries = pd.read_parquet(path) if suffix == '.parquet' else pd.read_pickle(path)
+        return cls(path, entries)
+
+    def save(self) -> None:
+        """Write the cache beside its target and rename it into place."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        if self.path.suffix == '.parquet':
+            self.entries.to_parquet(tmp_path)
+        else:
+            self.entries.to_pickle(tmp_path)
+        os.replace(tmp_path, self.path)
+        # Caches from other normalizer settings can never be hit again
+        for stale in self.path.parent.glob('normalized-*'):
+            if stale != self.path and stale.suffix in ('.parquet', '.pkl'):
+                stale.unlink(missing_ok=True)
+
+    def normalize(
+        self,
+        ids: pd.Series,
+        texts: pd.Series,
+        workers: Optional[int] = None
+    ) -> Tuple[List[str], Dict[str, int]]:
+        """
+        Normalized form of each text, reusing cached rows whose content is unchanged.
+
+        Args:
+            ids: Request ids (rows with a missing id are normalized but not cached)
+            texts: Combined text per row
+            workers: Processes for the rows that need normalizing (None: CPU count)
+
+        Returns:
+            (normalized texts in input order, {'cached': n, 'normalized': n})
+        """
+        ids = ids.astype(object).reset_index(drop=True)
+        texts = texts.reset_index(drop=True)
+        hashes = content_hashes(texts)
+
+        # fill_value keeps the hashes uint64 (a NaN fill would cast them to float)
+        cached_hashes = self.entries['hash'].reindex(ids, fill_value=0).to_numpy()
+        hit = (cached_hashes == hashes) & ids.notna().to_numpy()
+        result = self.entries['text'].reindex(ids).to_numpy(dtype=object, copy=True)
+
+        miss = np.flatnonzero(~hit)
+        if len(miss):
+            result[miss] = normalize_parallel(texts.iloc[miss].tolist(), workers)
+
+            # New and edited rows replace any older entry for the same id
+            keyed = miss[ids.iloc[miss].notna().to_numpy()]
+            update = pd.DataFrame(
+                {'hash': hashes[keyed], 'text': result[keyed]},
+                index=pd.Index(ids.iloc[keyed], name='id')
+            )
+            update = update[~update.index.duplicated(keep='last')]
+            self.entries = pd.concat([self.entries.drop(update.index, errors='ignore'), update])
+
+        return result.tolist(), {'cached': int(hit.sum()), 'normalized': len(miss)}
+
+
+def normalize_parallel(texts: List[str], workers: Optional[int] = None) -> List[str]:
+    """normalize_texts spread over a process pool in POOL_CHUNK_SIZE pieces."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(texts) <= POOL_CHUNK_SIZE:
+        return normalize_texts(texts)
+    chunks = [texts[i:i + POOL_CHUNK_SIZE] for i in range(0, len(texts), POOL_CHUNK_SIZE)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [text for chunk in pool.map(normalize_texts, chunks) for text in chunk]
+
+
+def save_features(
+    X: scipy.sparse.spmatrix,
+    y_category: np.ndarray,
+    y_priority: np.ndarray,
+    vectorizer,
+    category_encoder: LabelEncoder,
+    priority_encoder: LabelEncoder,
+    output_dir: Path
+) -> Dict[str, Any]:
+    """Write the feature artifacts train_model expects; returns the features.json config."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    scipy.sparse.save_npz(output_dir / 'X_tfidf.npz', X)
+    np.save(output_dir / 'y_category.npy', y_category)
+    np.save(output_dir / 'y_priority.npy', y_priority)
+    config = save_vectorizer(vectorizer, output_dir)
+    for name, encoder in [
+        ('category_encoder', category_encoder),
+        ('priority_encoder', priority_encoder)
+    ]:
+        with open(output_dir / f'{name}.pkl', 'wb') as f:
+            pickle.dump(encoder, f)
+    return config
+
+
+def build_features(
+    df: pd.DataFrame,
+    output_dir: Path,
+    feature_mode: str = 'tfidf',
+    workers: Optional[int] = None,
+    cache_dir: Optional[Path] = None,
+    use_cache: bool = True,
+    **vectorizer_params
+) -> Dict[str, Any]:
+    """
+    Normalize, vectorize and encode requests, then write the training artifacts.
+
+    Args:
+        df: Requests with title, description, category and priority (and id for caching)
+        output_dir: Where to write the artifacts (e.g. ../data/processed)
+        feature_mode: 'tfidf' or 'hashing' (see src/features/vectorizers.py)
+        workers: Processes used to normalize uncached rows (None: CPU count)
+        cache_dir: Normalized-text cache directory (defaults to env DATA_CACHE_DIR or data/cache)
+        use_cache: Read and update the normalized-text cache
+        **vectorizer_params: Overrides for the feature mode's defaults
+
+    Returns:
+        Row counts, cache statistics and timings per stage
+    """
+    stats: Dict[str, Any] = {'rows': len(df)}
+    texts = combined_text(df)
+
+    start = time.perf_counter()
+    if use_cache and 'id' in df.columns:
+        cache = NormalizedTextCache.load(cache_dir)
+        normalized, counts = cache.normalize(df['id'], texts, workers)
+        cache.save()
+    else:
+        normalized = normalize_parallel(texts.tolist(), workers)
+        counts = {'cached': 0, 'normalized': len(normalized)}
+    stats.update(counts, normalize_seconds=time.perf_counter() - start)
+
+    start = time.perf_counter()
+    vectorizer = build_vectorizer(feature_mode, **vectorizer_params)
+    X = vectorizer.fit_transform(normalized)
+    stats['vectorize_seconds'] = time.perf_counter() - start
+
+    category_encoder, priority_encoder = LabelEncoder(), LabelEncoder()
+    stats['features'] = save_features(
+        X,
+        category_encoder.fit_transform(df['category'].astype(str)),
+        priority_encoder.fit_transform(df['priority'].astype(str)),
+        vectorizer, category_encoder, priority_encoder, output_dir
+    )
+
+    # OOV reference for the serving drift monitor (copied into metadata.json by training)
+    start = time.perf_counter()
+    profile = held_out_text_profile(
+        normalized, lambda: build_vectorizer(feature_mode, **vectorizer_params)
+    )
+    with open(output_dir / TEXT_PROFILE_FILE, 'w') as f:
+        json.dump(profile, f)
+    stats['profile_seconds'] = time.perf_counter() - start
+    return stats
+
+
+def main(argv=None) -> Dict[str, Any]:
+    from src.data.frame_cache import load_cached
+    from src.data.load_data import get_training_data, preprocess_dataframe
+
+    parser = argparse.ArgumentParser(description="Build training features from request data")
+    parser.add_argument(
+        '--input', type=Path, help='CSV/JSON of requests (defaults to get_training_data)'
+    )
+    parser.add_argument(
+        '--output-dir', type=Path, default=Path('../data/processed'), help='Artifact directory'
+    )
+    parser.add_argument('--feature-mode', choices=FEATURE_MODES, default='tfidf', help='Vectorizer')
+    parser.add_argument(
+        '--workers', type=int, default=None, help='Normalization processes (default: CPU count)'
+    )
+    parser.add_argument(
+        '--cache-dir', type=Path, default=None, help='Normalized-text cache directory'
+    )
+    parser.add_argument('--no-cache', action='store_true', help='Normalize every row')
+    args = parser.parse_args(argv)
+
+    if args.input:
+        df = preprocess_dataframe(load_cached(args.input, columns=COLUMNS), copy=False)
+    else:
+        df = get_training_data(columns=COLUMNS)
+    print(f"Loaded {len(df)} requests", file=sys.stderr)
+
+    stats = build_features(
+        df, args.output_dir, feature_mode=args.feature_mode, workers=args.workers,
+        cache_dir=args.cache_dir, use_cache=not args.no_cache
+    )
+    print(f"Normalized {stats['normalized']} rows ({stats['cached']} from cache) "
+          f"in {stats['normalize_seconds']:.2f}s")
+    print(f"Vectorized ({stats['features']['mode']}, {stats['features']['n_features']} features) "
+          f"in {stats['vectorize_seconds']:.2f}s")
+    print(f"Saved processed data and encoders to: {args.output_dir}")
+    return stats
+
+
+if __name__ == "__main__":
+    main()
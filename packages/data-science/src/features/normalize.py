@@ -0,0 +1,265 @@
+"""
+Text normalization shared by the feature pipeline and the predictor.
+
+Implements the preprocessing from notebooks/02-feature-engineering.ipynb
+(lowercase, keep letters and whitespace, drop stopwords, lemmatize) so that the
+TF-IDF vectorizer sees the same text at training and at serving time. Compared to
+the notebook version:
+
+- regexes are compiled once at import
+- stopwords are a frozenset built once instead of ``stopwords.words()`` per row
+- after the character filter only letters and whitespace remain, so
+  ``word_tokenize`` reduces to ``str.split`` plus the Treebank contraction splits
+  that need no apostrophe ("cannot" -> "can not", "gotta" -> "got ta", ...), and
+  punkt is not needed
+- each distinct token is stopword-checked and lemmatized once (memoized)
+- ``normalize_texts`` processes whole columns in chunks and normalizes each
+  distinct text in a chunk only once
+
+Usage:
+    normalize_text("Password reset needed. I can't log in!")
+    # -> 'password reset needed cant log'
+    normalize_texts(df['title'] + ' ' + df['description'])
+
+Compare throughput with the notebook implementation (from packages/data-science):
+    python -m src.features.normalize --rows 20000
+"""
+
+import re
+import sys
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Bump when the output changes for the same input (feature caches and trained models
+# record it)
+NORMALIZER_VERSION = 2
+
+# NLTK's English stopword list. Entries with apostrophes are left out: the
+# character filter removes apostrophes before stopwords are checked, so they can
+# never match (the notebook behaves the same way).
+STOPWORDS = frozenset("""
+a about above after again against ain all am an and any are aren as at be because been
+before being below between both but by can couldn d did didn do does doesn doing don down
+during each few for from further had hadn has hasn have haven having he her here hers
+herself him himself his how i if in into is isn it its itself just ll m ma me mightn more
+most mustn my myself needn no nor not now o of off on once only or other our ours
+ourselves out over own re s same shan she should shouldn so some such t than that the
+their theirs them themselves then there these they this those through to too under until
+up ve very was wasn we were weren what when where which while who whom why will with won
+wouldn y you your yours yourself yourselves
+""".split())
+
+_NON_ALPHA = re.compile(r'[^a-z\s]')
+
+# Whole tokens that NLTK's Treebank tokenizer (behind word_tokenize) splits in two.
+# Its other contraction rules need an apostrophe, which the character filter removes.
+TREEBANK_SPLITS = {
+    'cannot': ('can', 'not'),
+    'gimme': ('gim', 'me'),
+    'gonna': ('gon', 'na'),
+    'gotta': ('got', 'ta'),
+    'lemme': ('lem', 'me'),
+    'wanna': ('wan', 'na')
+}
+
+# Distinct tokens are few (vocabulary-sized), so this comfortably holds all of them
+TOKEN_CACHE_SIZE = 200_000
+
+
+@lru_cache(maxsize=None)
+def _load_lemmatizer() -> Optional[Callable[[str], str]]:
+    """Return WordNet's lemmatize function, or None if the corpus isn't installed."""
+    try:
+        from nltk.stem import WordNetLemmatizer
+
+        lemmatizer = WordNetLemmatizer()
+        lemmatizer.lemmatize('tickets')  # forces the lazy corpus load
+        lemmatize: Callable[[str], str] = lemmatizer.lemmatize
+        return lemmatize
+    except LookupError:
+        print("⚠️  Warning: WordNet corpus not found, text will not be lemmatized. "
+              "Run nltk.download('wordnet') in training and serving environments.", file=sys.stderr)
+        return None
+
+
+def lemmatization_available() -> bool:
+    """True if this environment lemmatizes (recorded in features.json, checked at serving)."""
+    return _load_lemmatizer() is not None
+
+
+class TextNormalizer:
+    """
+    Precompiled, memoized text normalizer.
+
+    Usage:
+        normalizer = TextNormalizer()
+        normalizer.normalize("Cannot export reports")        # 'export report'
+        normalizer.normalize_many(texts, chunk_size=10000)
+    """
+
+    def __init__(
+        self,
+        stopwords: Iterable[str] = STOPWORDS,
+        lemmatize: bool = True,
+        cache_size: int = TOKEN_CACHE_SIZE
+    ):
+        """
+        Args:
+            stopwords: Tokens removed after the character filter
+            lemmatize: Lemmatize tokens with WordNet (loaded on first use)
+            cache_size: Max distinct tokens whose normalized form is memoized
+        """
+        self.stopwords = frozenset(stopwords)
+        self.lemmatize = lemmatize
+        self._lemmatizer: Optional[Callable[[str], str]] = None
+        self._lemmatizer_loaded = False
+        # '' marks a dropped token, so each token costs one cache lookup after first sight
+        self._normalize_token = lru_cache(maxsize=cache_size)(self._normalize_token_uncached)
+
+    def _normalize_token_uncached(self, token: str) -> str:
+        parts = TREEBANK_SPLITS.get(token)
+        if parts is not None:
+            # Normalized as two tokens; either may be dropped
+            return ' '.join(filter(None, map(self._normalize_token_uncached, parts)))
+        if token in self.stopwords:
+            return ''
+        if self.lemmatize:
+            if not self._lemmatizer_loaded:
+                self._lemmatizer = _load_lemmatizer()
+                self._lemmatizer_loaded = True
+            if self._lemmatizer is not None:
+                return self._lemmatizer(token)
+        return token
+
+    def normalize(self, text) -> str:
+        """Normalize one text; None and NaN become an empty string."""
+        if not isinstance(text, str):
+            # Missing values (None, NaN) as in the notebook's pd.isna check
+            return ''
+        normalize_token = self._normalize_token
+        tokens = [normalize_token(token) for token in _NON_ALPHA.sub('', text.lower()).split()]
+        return ' '.join([token for token in tokens if token])
+
+    def normalize_many(self, texts: Iterable, chunk_size: int = 10_000) -> List[str]:
+        """
+        Normalize a column of texts (list, pandas Series or any iterable).
+
+        Works through ``chunk_size`` texts at a time so memory stays bounded on large
+        corpora; within a chunk each distinct text is normalized once.
+        """
+        results: List[str] = []
+        chunk: List = []
+        for text in texts:
+            chunk.append(text)
+            if len(chunk) >= chunk_size:
+                results.extend(self._normalize_chunk(chunk))
+                chunk = []
+        if chunk:
+            results.extend(self._normalize_chunk(chunk))
+        return results
+
+    def _normalize_chunk(self, chunk: List) -> List[str]:
+        normalize = self.normalize
+        seen: Dict[str, str] = {}
+        out = []
+        for text in chunk:
+            try:
+                normalized = seen.get(text)
+            except TypeError:
+                # Unhashable value; normalize() maps it to ''
+                normalized = ''
+            if normalized is None:
+                normalized = seen[text] = normalize(text)
+            out.append(normalized)
+        return out
+
+
+# Shared instance used by the predictor and the feature pipeline
+_DEFAULT = TextNormalizer()
+
+
+def combine_fields(title, description) -> str:
+    """Join title and description the way the feature pipeline does (missing fields count as '')."""
+    title = title if isinstance(title, str) else ''
+    description = description if isinstance(description, str) else ''
+    return f"{title} {description}"
+
+
+def normalize_text(text) -> str:
+    """Normalize one text with the shared normalizer."""
+    return _DEFAULT.normalize(text)
+
+
+def normalize_texts(texts: Iterable, chunk_size: int = 10_000) -> List[str]:
+    """Normalize a column of texts with the shared normalizer (bulk mode)."""
+    return _DEFAULT.normalize_many(texts, chunk_size=chunk_size)
+
+
+def notebook_preprocess_text(text) -> str:
+    """The per-row implementation from notebooks/02-feature-engineering.ipynb, for comparison."""
+    import pandas as pd
+    from nltk.corpus import stopwords
+    from nltk.stem import WordNetLemmatizer
+    from nltk.tokenize import word_tokenize
+
+    if pd.isna(text):
+        return ""
+    text = text.lower()
+    text = re.sub(r'[^a-z\s]', '', text)
+    tokens = word_tokenize(text)
+    stop_words = set(stopwords.words('english'))
+    tokens = [t for t in tokens if t not in stop_words]
+    lemmatizer = WordNetLemmatizer()
+    tokens = [lemmatizer.lemmatize(t) for t in tokens]
+    return ' '.join(tokens)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import time
+
+    from src.data.synthetic import generate_corpus
+
+    parser = argparse.ArgumentParser(
+        description="Compare normalizer throughput with the notebook version"
+    )
+    parser.add_argument('--rows', type=int, default=20000, help='Synthetic requests to normalize')
+    parser.add_argument('--seed', type=int, default=42, help='Corpus random seed')
+    args = parser.parse_args()
+
+    df = generate_corpus(args.rows, seed=args.seed)
+    texts = (df['title'] + ' ' + df['description']).tolist()
+    report: Dict[str, Any] = {'rows': len(texts)}
+
+    # Load the lemmatizer up front so its one-off import isn't timed
+    normalizer = TextNormalizer()
+    normalizer.normalize('warm up')
+    start = time.perf_counter()
+    for text in texts:
+        normalizer.normalize(text)
+    report['normalize_text_docs_per_second'] = len(texts) / (time.perf_counter() - start)
+
+    bulk_normalizer = TextNormalizer()
+    bulk_normalizer.normalize('warm up')
+    start = time.perf_counter()
+    bulk = bulk_normalizer.normalize_many(texts)
+    report['normalize_texts_docs_per_second'] = len(texts) / (time.perf_counter() - start)
+
+    try:
+        sample = texts[:min(len(texts), 2000)]
+        start = time.perf_counter()
+        reference = [notebook_preprocess_text(text) for text in sample]
+        report['notebook_docs_per_second'] = len(sample) / (time.perf_counter() - start)
+        report['speedup_bulk'] = (
+            report['normalize_texts_docs_per_second'] / report['notebook_docs_per_second']
+        )
+        report['identical_output'] = reference == bulk[:len(sample)]
+    except LookupError as e:
+        report['notebook_docs_per_second'] = None
+        report['notebook_error'] = next(
+            (line.strip() for line in str(e).splitlines() if 'Resource' in line),
+            'NLTK data missing'
+        )
+
+    print(json.dumps(report, indent=2))
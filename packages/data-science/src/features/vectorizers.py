@@ -0,0 +1,349 @@
+"""
+Feature modes: fitted TF-IDF vocabulary or stateless feature hashing.
+
+The feature step records which mode it used in ``features.json`` next to the other
+preprocessing artifacts. train_model.py copies that config into metadata.json, and
+RequestPredictor uses it to load the matching vectorizer.
+
+- ``tfidf`` (default): sklearn TfidfVectorizer pickled as ``tfidf_vectorizer.pkl``,
+  as written by notebooks/02-feature-engineering.ipynb.
+- ``hashing``: HashingFeaturizer. Terms are hashed into a fixed number of columns,
+  so there is no vocabulary to fit or store. Optional IDF weights are kept as one flat
+  float array (``hashing_idf.npy``) that can be accumulated chunk by chunk with
+  ``partial_fit``. Memory is fixed by ``n_features`` regardless of corpus size.
+
+Usage:
+    vectorizer = build_vectorizer('hashing', n_features=2**16)
+    X = vectorizer.fit_transform(texts)
+    save_vectorizer(vectorizer, Path('../data/processed'))
+    vectorizer = load_vectorizer(Path('../data/processed'))
+
+Compare both modes (accuracy, memory, latency) from packages/data-science:
+    python -m src.features.vectorizers --rows 20000
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import scipy.sparse
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.preprocessing import normalize
+from sklearn.utils import murmurhash3_32
+
+from src.features.normalize import NORMALIZER_VERSION, lemmatization_available
+
+FEATURE_MODES = ('tfidf', 'hashing')
+FEATURES_CONFIG_FILE = 'features.json'
+HASHING_IDF_FILE = 'hashing_idf.npy'
+HASHING_DF_FILE = 'hashing_df.npy'
+
+# Settings from notebooks/02-feature-engineering.ipynb
+TFIDF_DEFAULTS = {'max_features': 1000, 'ngram_range': (1, 2), 'min_df': 2, 'max_df': 0.8}
+HASHING_DEFAULTS: Dict[str, Any] = {
+    'n_features': 2 ** 16, 'ngram_range': (1, 2), 'use_idf': True, 'sublinear_tf': False
+}
+
+
+class HashingFeaturizer:
+    """
+    TF-IDF over hashed terms.
+
+    Matches TfidfVectorizer's transform (smoothed IDF, then L2 normalization) except
+    that term -> column is a hash instead of a vocabulary lookup. Colliding terms
+    share a column, and min_df/max_df/max_features don't apply.
+    """
+
+    mode = 'hashing'
+
+    def __init__(
+        self,
+        n_features: int = HASHING_DEFAULTS['n_features'],
+        ngram_range=HASHING_DEFAULTS['ngram_range'],
+        use_idf: bool = True,
+        sublinear_tf: bool = False,
+        idf: Optional[np.ndarray] = None,
+        doc_freq: Optional[np.ndarray] = None,
+        n_docs: int = 0
+    ):
+        """
+        Args:
+            n_features: Number of hash buckets (columns)
+            ngram_range: Word n-gram range, as in TfidfVectorizer
+            use_idf: Reweight columns by inverse document frequency
+            sublinear_tf: Replace tf with 1 + log(tf)
+            idf: Precomputed IDF weights, shape (n_features,)
+            doc_freq: Document frequencies accumulated so far (to resume partial_fit)
+            n_docs: Documents seen so far
+        """
+        self.n_features = int(n_features)
+        self.ngram_range = tuple(ngram_range)
+        self.use_idf = use_idf
+        self.sublinear_tf = sublinear_tf
+        self.idf_ = idf
+        self.doc_freq_ = doc_freq
+        self.n_docs_ = int(n_docs)
+        self._hasher = HashingVectorizer(
+            n_features=self.n_features,
+            ngram_range=self.ngram_range,
+            alternate_sign=False,
+            norm=None,
+            dtype=np.float64
+        )
+        self._analyzer: Optional[Callable[[str], List[str]]] = None
+
+    def get_config(self) -> Dict[str, Any]:
+        return {
+            'mode': self.mode,
+            'n_features': self.n_features,
+            'ngram_range': list(self.ngram_range),
+            'use_idf': self.use_idf,
+            'sublinear_tf': self.sublinear_tf,
+            'n_docs': self.n_docs_
+        }
+
+    def partial_fit(self, texts: Iterable[str]) -> 'HashingFeaturizer':
+        """Accumulate document frequencies from one chunk of texts and refresh the IDF."""
+        if not self.use_idf:
+            return self
+        counts = self._hasher.transform(texts)
+        if self.doc_freq_ is None:
+            self.doc_freq_ = np.zeros(self.n_features, dtype=np.int64)
+        else:
+            self.doc_freq_ = np.array(self.doc_freq_, dtype=np.int64)
+        self.doc_freq_ += np.bincount(counts.indices, minlength=self.n_features)
+        self.n_docs_ += counts.shape[0]
+        # Smoothed IDF, identical to TfidfVectorizer(smooth_idf=True)
+        self.idf_ = np.log((1 + self.n_docs_) / (1 + self.doc_freq_)) + 1.0
+        return self
+
+    def fit(self, texts: Iterable[str]) -> 'HashingFeaturizer':
+        self.doc_freq_ = None
+        self.n_docs_ = 0
+        return self.partial_fit(texts)
+
+    def transform(self, texts: Iterable[str]) -> scipy.sparse.csr_matrix:
+        """Vectorize texts into an L2-normalized CSR matrix."""
+        X = self._hasher.transform(texts)
+        if self.sublinear_tf:
+            np.log(X.data, X.data)
+            X.data += 1
+        if self.use_idf and self.idf_ is not None:
+            X.data *= self.idf_[X.indices]
+        return normalize(X, norm='l2', copy=False)
+
+    def fit_transform(self, texts) -> scipy.sparse.csr_matrix:
+        texts = list(texts)
+        return self.fit(texts).transform(texts)
+
+    def column_terms(self, text: str) -> Dict[int, str]:
+        """
+        Map the columns of one text's row back to the n-grams that hashed there.
+
+        Hashing can't be inverted globally, but the text's own n-grams can be rehashed
+        (work proportional to the text's length). Colliding n-grams keep the first seen.
+        """
+        if self._analyzer is None:
+            self._analyzer = self._hasher.build_analyzer()
+        columns: Dict[int, str] = {}
+        for ngram in self._analyzer(text):
+            column = abs(murmurhash3_32(ngram, seed=0)) % self.n_features
+            columns.setdefault(column, ngram)
+        return columns
+
+    def save(self, directory: Path) -> None:
+        """
+        Write the IDF and document frequencies as flat arrays.
+
+        Each file is written beside the target and renamed over it, so processes that
+        have the previous arrays memory-mapped keep reading intact data.
+        """
+        if self.idf_ is None:
+            return
+        for name, array in [
+            (HASHING_IDF_FILE, np.asarray(self.idf_, dtype=np.float64)),
+            (HASHING_DF_FILE, np.asarray(self.doc_freq_, dtype=np.int64))
+        ]:
+            tmp_path = directory / f'.{name}.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.save(f, array)
+            os.replace(tmp_path, directory / name)
+
+    @classmethod
+    def load(cls, directory: Path, config: Dict[str, Any]) -> 'HashingFeaturizer':
+        """Load from a features.json config, memory-mapping the IDF array."""
+        idf_path = directory / HASHING_IDF_FILE
+        df_path = directory / HASHING_DF_FILE
+        return cls(
+            n_features=config['n_features'],
+            ngram_range=config['ngram_range'],
+            use_idf=config['use_idf'],
+            sublinear_tf=config['sublinear_tf'],
+            idf=np.load(idf_path, mmap_mode='r') if idf_path.exists() else None,
+            doc_freq=np.load(df_path, mmap_mode='r') if df_path.exists() else None,
+            n_docs=config.get('n_docs', 0)
+        )
+
+
+def build_vectorizer(mode: str = 'tfidf', **params):
+    """
+    Create an unfitted vectorizer for a feature mode.
+
+    Args:
+        mode: 'tfidf' or 'hashing'
+        **params: Overrides for the mode's defaults
+
+    Raises:
+        ValueError: If the mode is unknown
+    """
+    if mode == 'tfidf':
+        return TfidfVectorizer(**{**TFIDF_DEFAULTS, **params})
+    if mode == 'hashing':
+        return HashingFeaturizer(**{**HASHING_DEFAULTS, **params})
+    raise ValueError(f"Unknown feature mode '{mode}' (expected one of {FEATURE_MODES})")
+
+
+def n_features(vectorizer) -> int:
+    """Number of feature columns of a fitted vectorizer (TF-IDF, hashing or bundle)."""
+    if hasattr(vectorizer, 'n_features'):
+        return int(vectorizer.n_features)
+    return len(vectorizer.vocabulary_)
+
+
+def fingerprint(vectorizer) -> str:
+    """
+    Short hash of a fitted vectorizer's feature space: its terms in column order (or
+    hashing settings) and IDF weights.
+
+    The same for a pickled vectorizer and the bundle exported from it; any refit that
+    moves or reweights a column changes it.
+    """
+    digest = hashlib.sha256()
+    if hasattr(vectorizer, 'get_feature_names_out'):
+        for term in vectorizer.get_feature_names_out():
+            digest.update(term.encode('utf-8') + b'\n')
+    else:
+        digest.update(
+            json.dumps([int(vectorizer.n_features), list(vectorizer.ngram_range)]).encode()
+        )
+    idf = getattr(vectorizer, 'idf_', None)
+    if idf is not None:
+        digest.update(np.ascontiguousarray(idf, dtype='<f8').tobytes())
+    return digest.hexdigest()[:16]
+
+
+def feature_config(vectorizer) -> Dict[str, Any]:
+    """Describe a fitted vectorizer for features.json / metadata.json."""
+    if isinstance(vectorizer, HashingFeaturizer):
+        return vectorizer.get_config()
+    return {
+        'mode': 'tfidf',
+        'n_features': len(vectorizer.vocabulary_),
+        'ngram_range': list(vectorizer.ngram_range),
+        'max_features': vectorizer.max_features,
+        'min_df': vectorizer.min_df,
+        'max_df': vectorizer.max_df
+    }
+
+
+def save_vectorizer(vectorizer, data_dir: Path) -> Dict[str, Any]:
+    """Write a fitted vectorizer and its features.json; returns the config."""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    config = feature_config(vectorizer)
+    # The predictor refuses to serve if its normalizer would produce different text
+    config['lemmatize'] = lemmatization_available()
+    config['normalizer_version'] = NORMALIZER_VERSION
+    if config['mode'] == 'hashing':
+        vectorizer.save(data_dir)
+    else:
+        with open(data_dir / 'tfidf_vectorizer.pkl', 'wb') as f:
+            pickle.dump(vectorizer, f)
+    with open(data_dir / FEATURES_CONFIG_FILE, 'w') as f:
+        json.dump(config, f, indent=2)
+    return config
+
+
+def load_feature_config(data_dir: Path) -> Dict[str, Any]:
+    """Read features.json; directories written before it existed are TF-IDF."""
+    path = data_dir / FEATURES_CONFIG_FILE
+    if not path.exists():
+        return {'mode': 'tfidf'}
+    with open(path) as f:
+        config: Dict[str, Any] = json.load(f)
+    return config
+
+
+def load_vectorizer(data_dir: Path):
+    """Load the fitted vectorizer recorded in data_dir/features.json."""
+    config = load_feature_config(data_dir)
+    if config['mode'] == 'hashing':
+        return HashingFeaturizer.load(data_dir, config)
+    with open(data_dir / 'tfidf_vectorizer.pkl', 'rb') as f:
+        return pickle.load(f)
+
+
+def _compare_modes(n_rows: int, seed: int) -> Dict[str, Any]:
+    """Train both modes on one synthetic corpus; report accuracy, size, memory and latency."""
+    import contextlib
+    import io
+    import tempfile
+    import time
+    import tracemalloc
+
+    from src.benchmarks.run_benchmarks import bench_predict, write_features
+    from src.data.synthetic import generate_corpus
+    from src.models import train_model
+    from src.models.bundle import BUNDLE_DIRNAME
+    from src.models.predict import RequestPredictor
+
+    df = generate_corpus(n_rows, seed=seed)
+    requests = df[['title', 'description']].to_dict('records')
+    report: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in FEATURE_MODES:
+            data_dir, models_dir = Path(tmp) / mode / 'processed', Path(tmp) / mode / 'models'
+            entry: Dict[str, Any] = {
+                'vectorization': write_features(df, data_dir, feature_mode=mode)
+            }
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                train_model.main(data_dir, models_dir, export_bundle=True)
+                entry['training_seconds'] = time.perf_counter() - start
+
+                tracemalloc.start()
+                predictor = RequestPredictor(str(models_dir), str(data_dir), use_bundle=False)
+                entry['predictor_memory_bytes'] = tracemalloc.get_traced_memory()[0]
+                tracemalloc.stop()
+
+            with open(models_dir / 'metadata.json') as f:
+                metadata = json.load(f)
+            entry['category_accuracy'] = metadata['category_model']['accuracy']
+            entry['priority_accuracy'] = metadata['priority_model']['accuracy']
+            serving_files = [data_dir / name for name in (
+                'tfidf_vectorizer.pkl', HASHING_IDF_FILE, 'category_encoder.pkl',
+                'priority_encoder.pkl'
+            )] + [models_dir / 'category_model.pkl', models_dir / 'priority_model.pkl']
+            entry['pickle_artifact_bytes'] = sum(
+                p.stat().st_size for p in serving_files if p.exists()
+            )
+            entry['bundle_bytes'] = sum(
+                p.stat().st_size for p in (models_dir / BUNDLE_DIRNAME).iterdir()
+            )
+            entry['predict'] = bench_predict(predictor, requests)
+            report[mode] = entry
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare TF-IDF and hashing feature modes")
+    parser.add_argument('--rows', type=int, default=20000, help='Synthetic requests to train on')
+    parser.add_argument('--seed', type=int, default=42, help='Corpus random seed')
+    args = parser.parse_args()
+
+    print(json.dumps(_compare_modes(args.rows, args.seed), indent=2))
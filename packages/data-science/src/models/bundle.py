@@ -0,0 +1,445 @@
+"""
+Compact, memory-mappable model bundle.
+
+A bundle replaces the five pickle artifacts (two models, the TF-IDF vectorizer and two
+label encoders) with one versioned directory:
+
+    model_bundle/
+    ├── manifest.json   # format/model version, vectorizer settings, class labels, array index
+    └── arrays.bin      # raw little-endian arrays, 64-byte aligned
+
+The arrays are the vocabulary (a UTF-8 blob of terms with an offsets array and an
+open-addressing hash table over it), IDF weights, the stacked coefficient matrix and
+intercepts of both heads. Bundles of hashing-mode models (see
+src/features/vectorizers.py) have no vocabulary arrays, only the flat IDF. The serving
+side maps ``arrays.bin`` read-only and wraps it with ``np.frombuffer``, so nothing is
+deserialized and the pages are shared between worker processes instead of copied into
+each one.
+
+Usage:
+    export_bundle(Path('../models/model_bundle'), vectorizer, cat_model, pri_model,
+                  cat_encoder, pri_encoder, model_version='v1.0.0')
+    bundle = ModelBundle(Path('../models/model_bundle'))
+
+Compare load time and RSS against the pickle artifacts (from packages/data-science):
+    python -m src.models.bundle --models-dir models --data-dir data/processed
+"""
+
+import json
+import mmap
+import os
+import shutil
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import scipy.sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import LabelEncoder, normalize
+
+from src.features.vectorizers import HashingFeaturizer
+from src.models.scoring import LinearScorer
+
+BUNDLE_DIRNAME = 'model_bundle'
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+ARRAYS_FILE = 'arrays.bin'
+ALIGNMENT = 64
+
+# TfidfVectorizer settings that affect transform() and survive a JSON round trip
+VECTORIZER_PARAMS = [
+    'encoding', 'decode_error', 'strip_accents', 'lowercase', 'stop_words',
+    'token_pattern', 'ngram_range', 'analyzer', 'binary', 'norm', 'use_idf',
+    'smooth_idf', 'sublinear_tf'
+]
+
+
+def _build_hash_table(terms: List[bytes]) -> np.ndarray:
+    """Open-addressing (linear probing) table of term indices, -1 for empty slots."""
+    size = 1
+    while size < 2 * max(len(terms), 1):
+        size *= 2
+    mask = size - 1
+
+    slots = np.full(size, -1, dtype=np.int32)
+    for idx, term in enumerate(terms):
+        slot = zlib.crc32(term) & mask
+        while slots[slot] >= 0:
+            slot = (slot + 1) & mask
+        slots[slot] = idx
+    return slots
+
+
+def export_bundle(
+    bundle_dir: Path,
+    vectorizer: TfidfVectorizer,
+    category_model,
+    priority_model,
+    category_encoder,
+    priority_encoder,
+    model_version: str,
+    trained_at: Optional[str] = None
+) -> Path:
+    """
+    Write a model bundle from fitted training artifacts.
+
+    Each file is written beside the target and renamed over it, arrays first and the
+    manifest last, so processes that have the previous ``arrays.bin`` memory-mapped
+    keep reading intact data.
+
+    Args:
+        bundle_dir: Output directory (created if missing, files replaced)
+        vectorizer: Fitted TfidfVectorizer or HashingFeaturizer
+        category_model: Fitted category LogisticRegression
+        priority_model: Fitted priority LogisticRegression
+        category_encoder: Fitted category LabelEncoder
+        priority_encoder: Fitted priority LabelEncoder
+        model_version: Version string recorded in the manifest
+        trained_at: ``training_info.trained_at`` of the metadata.json written with the
+            bundle; the predictor only serves a bundle whose value matches it
+
+    Returns:
+        Path to the bundle directory
+
+    Raises:
+        ValueError: If the vectorizer uses custom callables or the heads are not
+            linear logistic models (neither can be represented as raw arrays)
+    """
+    scorer = LinearScorer.from_models([category_model, priority_model])
+    if scorer is None:
+        raise ValueError(
+            "Both heads must be softmax-linear or one-vs-rest logistic models to be bundled"
+        )
+
+    arrays: Dict[str, np.ndarray] = {}
+    if isinstance(vectorizer, HashingFeaturizer):
+        feature_mode = 'hashing'
+        n_features = vectorizer.n_features
+        vectorizer_config = vectorizer.get_config()
+    else:
+        params = vectorizer.get_params()
+        if any(callable(params[name]) for name in ('preprocessor', 'tokenizer', 'analyzer')):
+            raise ValueError(
+                "Cannot bundle a vectorizer with a custom preprocessor/tokenizer/analyzer"
+            )
+
+        # Vocabulary ordered by feature index, so term i is column i
+        feature_mode = 'tfidf'
+        feature_names = vectorizer.get_feature_names_out()
+        terms = [term.encode('utf-8') for term in feature_names]
+        term_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        term_offsets[1:] = np.cumsum([len(term) for term in terms])
+        arrays['vocab_blob'] = np.frombuffer(b''.join(terms), dtype=np.uint8)
+        arrays['vocab_offsets'] = term_offsets
+        arrays['vocab_slots'] = _build_hash_table(terms)
+        n_features = len(terms)
+
+        vectorizer_config = {name: params[name] for name in VECTORIZER_PARAMS}
+        if isinstance(vectorizer_config['stop_words'], (set, frozenset)):
+            vectorizer_config['stop_words'] = sorted(vectorizer_config['stop_words'])
+        vectorizer_config['dtype'] = np.dtype(params['dtype']).name
+
+    arrays['weights'] = scorer.weights
+    arrays['bias'] = scorer.bias
+    arrays['head_offsets'] = scorer.offsets.astype(np.int64)
+    if vectorizer.use_idf and vectorizer.idf_ is not None:
+        arrays['idf'] = np.asarray(vectorizer.idf_, dtype=np.float64)
+
+    bundle_dir = Path(bundle_dir)
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+
+    index = {}
+    offset = 0
+    arrays_tmp = bundle_dir / f'.{ARRAYS_FILE}.tmp'
+    with open(arrays_tmp, 'wb') as f:
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            array = array.astype(array.dtype.newbyteorder('<'), copy=False)
+            padding = -offset % ALIGNMENT
+            f.write(b'\x00' * padding)
+            offset += padding
+            index[name] = {
+                'dtype': array.dtype.str,
+                'shape': list(array.shape),
+                'offset': offset
+            }
+            f.write(array.tobytes())
+            offset += array.nbytes
+    os.replace(arrays_tmp, bundle_dir / ARRAYS_FILE)
+
+    manifest = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'model_version': model_version,
+        'trained_at': trained_at,
+        'feature_mode': feature_mode,
+        'head_kinds': list(scorer.kinds),
+        'n_features': n_features,
+        'vectorizer': vectorizer_config,
+        'category_classes': category_encoder.classes_.tolist(),
+        'priority_classes': priority_encoder.classes_.tolist(),
+        'arrays': index
+    }
+    manifest_tmp = bundle_dir / f'.{MANIFEST_FILE}.tmp'
+    with open(manifest_tmp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_tmp, bundle_dir / MANIFEST_FILE)
+
+    return bundle_dir
+
+
+def remove_bundle(models_dir: Path) -> bool:
+    """Delete models_dir/model_bundle, e.g. when retraining without exporting one."""
+    bundle_dir = Path(models_dir) / BUNDLE_DIRNAME
+    if not bundle_dir.exists():
+        return False
+    shutil.rmtree(bundle_dir)
+    return True
+
+
+def bundle_is_current(models_dir: Path) -> bool:
+    """
+    True if models_dir/model_bundle was exported by the run that wrote metadata.json.
+
+    A bundle left behind by an earlier training run (or from before bundles recorded
+    ``trained_at``) would serve different models than the pickles next to it.
+    """
+    models_dir = Path(models_dir)
+    manifest_path = models_dir / BUNDLE_DIRNAME / MANIFEST_FILE
+    metadata_path = models_dir / 'metadata.json'
+    if not manifest_path.exists():
+        return False
+    if not metadata_path.exists():
+        # A bundle shipped on its own
+        return True
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    with open(metadata_path) as f:
+        metadata = json.load(f)
+    trained_at = metadata.get('training_info', {}).get('trained_at')
+    return bool(
+        manifest.get('trained_at') == trained_at
+        and manifest.get('model_version') == metadata.get('model_version')
+    )
+
+
+class BundleVectorizer:
+    """
+    TF-IDF transform backed by memory-mapped vocabulary and IDF arrays.
+
+    Produces the same matrix as the fitted TfidfVectorizer it was exported from, using
+    that vectorizer's own analyzer settings for tokenization.
+    """
+
+    def __init__(self, config: Dict[str, Any], blob, offsets, slots, idf: Optional[np.ndarray]):
+        config = dict(config)
+        self.dtype = np.dtype(config.pop('dtype'))
+        config['ngram_range'] = tuple(config['ngram_range'])
+        self._analyze = TfidfVectorizer(**config).build_analyzer()
+        self.binary = config['binary']
+        self.norm = config['norm']
+        self.sublinear_tf = config['sublinear_tf']
+
+        self._blob = blob
+        self._offsets = offsets
+        self._slots = slots
+        self._mask = len(slots) - 1
+        self.idf_ = idf
+        self.n_features = len(offsets) - 1
+
+    def lookup(self, term: str) -> int:
+        """Return the feature index of term, or -1 if it is out of vocabulary."""
+        key = term.encode('utf-8')
+        slot = zlib.crc32(key) & self._mask
+        while True:
+            idx = self._slots[slot]
+            if idx < 0:
+                return -1
+            if self._blob[self._offsets[idx]:self._offsets[idx + 1]] == key:
+                return int(idx)
+            slot = (slot + 1) & self._mask
+
+    def transform(self, texts: List[str]) -> scipy.sparse.csr_matrix:
+        """Vectorize texts into an L2-normalized TF-IDF CSR matrix."""
+        seen: Dict[str, int] = {}
+        indptr = [0]
+        indices: List[int] = []
+        values: List[int] = []
+
+        for text in texts:
+            counts: Dict[int, int] = {}
+            for term in self._analyze(text):
+                idx = seen.get(term)
+                if idx is None:
+                    idx = seen[term] = self.lookup(term)
+                if idx >= 0:
+                    counts[idx] = counts.get(idx, 0) + 1
+            for idx in sorted(counts):
+                indices.append(idx)
+                values.append(counts[idx])
+            indptr.append(len(indices))
+
+        data = np.asarray(values, dtype=self.dtype)
+        X = scipy.sparse.csr_matrix(
+            (data, np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int32)),
+            shape=(len(texts), self.n_features)
+        )
+
+        if self.binary:
+            X.data.fill(1)
+        if self.sublinear_tf:
+            np.log(X.data, X.data)
+            X.data += 1
+        if self.idf_ is not None:
+            X.data *= self.idf_[X.indices]
+        if self.norm:
+            X = normalize(X, norm=self.norm, copy=False)
+        return X
+
+    def term(self, idx: int) -> str:
+        """Decode one vocabulary term by feature index."""
+        return bytes(self._blob[self._offsets[idx]:self._offsets[idx + 1]]).decode('utf-8')
+
+    def get_feature_names_out(self) -> np.ndarray:
+        """Decode the vocabulary (only needed for reporting, not on the hot path)."""
+        return np.array([self.term(i) for i in range(self.n_features)], dtype=object)
+
+
+class ModelBundle:
+    """
+    A loaded model bundle: vectorizer, fused scorer and label encoders.
+
+    Attributes:
+        model_version: Version recorded at export time
+        trained_at: Training run that exported it (None for older bundles)
+        vectorizer: BundleVectorizer over the mapped vocabulary, or a
+            HashingFeaturizer over the mapped IDF for hashing-mode bundles
+        scorer: LinearScorer over the mapped coefficient matrix
+        category_encoder: LabelEncoder with the category classes
+        priority_encoder: LabelEncoder with the priority classes
+    """
+
+    def __init__(self, bundle_dir: Path):
+        bundle_dir = Path(bundle_dir)
+        with open(bundle_dir / MANIFEST_FILE) as f:
+            self.manifest = json.load(f)
+        if self.manifest['format_version'] != BUNDLE_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported bundle format {self.manifest['format_version']} "
+                f"(expected {BUNDLE_FORMAT_VERSION})"
+            )
+
+        with open(bundle_dir / ARRAYS_FILE, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        index = self.manifest['arrays']
+        idf = self._array(index['idf']) if 'idf' in index else None
+        self.model_version = self.manifest['model_version']
+        self.trained_at = self.manifest.get('trained_at')
+
+        # Bundles written before feature modes existed are all TF-IDF
+        self.vectorizer: Union[HashingFeaturizer, BundleVectorizer]
+        if self.manifest.get('feature_mode', 'tfidf') == 'hashing':
+            config = self.manifest['vectorizer']
+            self.vectorizer = HashingFeaturizer(
+                n_features=config['n_features'],
+                ngram_range=config['ngram_range'],
+                use_idf=config['use_idf'],
+                sublinear_tf=config['sublinear_tf'],
+                idf=idf,
+                n_docs=config.get('n_docs', 0)
+            )
+        else:
+            # memoryviews give fast Python-int indexing for the per-token hash lookups
+            slots = self._view(index['vocab_slots'])
+            offsets = self._view(index['vocab_offsets'])
+            vocab = index['vocab_blob']
+            blob = memoryview(self._mmap)[vocab['offset']:vocab['offset'] + vocab['shape'][0]]
+            self.vectorizer = BundleVectorizer(
+                self.manifest['vectorizer'], blob, offsets, slots, idf
+            )
+        self.scorer = LinearScorer.from_arrays(
+            self._array(index['weights']),
+            self._array(index['bias']),
+            self._array(index['head_offsets']),
+            self.manifest.get('head_kinds')
+        )
+        self.category_encoder = self._encoder(self.manifest['category_classes'])
+        self.priority_encoder = self._encoder(self.manifest['priority_classes'])
+
+    def _array(self, spec: Dict[str, Any]) -> np.ndarray:
+        """Zero-copy, read-only numpy view of one array in arrays.bin."""
+        dtype = np.dtype(spec['dtype'])
+        count = int(np.prod(spec['shape'])) if spec['shape'] else 1
+        array = np.frombuffer(self._mmap, dtype=dtype, count=count, offset=spec['offset'])
+        return array.reshape(spec['shape'])
+
+    def _view(self, spec: Dict[str, Any]) -> memoryview:
+        """Zero-copy memoryview of a 1-D integer array in arrays.bin."""
+        dtype = np.dtype(spec['dtype'])
+        start = spec['offset']
+        end = start + spec['shape'][0] * dtype.itemsize
+        # dtype.char is an integer format ('q', 'i', ...), which typeshed can't see
+        view = memoryview(self._mmap)[start:end]
+        return view.cast(dtype.char)  # type: ignore[call-overload, no-any-return]
+
+    @staticmethod
+    def _encoder(classes: List[str]) -> LabelEncoder:
+        encoder = LabelEncoder()
+        encoder.classes_ = np.array(classes)
+        return encoder
+
+
+def _measure_load(mode: str, models_dir: str, data_dir: str) -> None:
+    """Load one artifact format in this (fresh) process and print timing as JSON."""
+    import resource
+    import time
+
+    from src.models.predict import RequestPredictor
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    predictor = RequestPredictor(
+        models_dir=models_dir,
+        data_dir=data_dir,
+        use_bundle=(mode == 'bundle')
+    )
+    load_seconds = time.perf_counter() - start
+    predictor.predict("Password reset needed", "I can't log into my account")
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(json.dumps({
+        'mode': mode,
+        'load_seconds': load_seconds,
+        'rss_increase_kb': rss_after - rss_before
+    }))
+
+
+if __name__ == "__main__":
+    import argparse
+    import subprocess
+    import sys
+
+    parser = argparse.ArgumentParser(description="Compare bundle vs pickle load time and RSS")
+    parser.add_argument('--models-dir', default='models', help='Directory with models and bundle')
+    parser.add_argument(
+        '--data-dir', default='data/processed', help='Directory with pickled artifacts'
+    )
+    parser.add_argument('--measure', choices=['pickle', 'bundle'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        _measure_load(args.measure, args.models_dir, args.data_dir)
+        sys.exit(0)
+
+    # Each format is measured in a fresh interpreter so imports and caches don't carry over
+    results = []
+    for mode in ('pickle', 'bundle'):
+        output = subprocess.run(
+            [sys.executable, '-m', 'src.models.bundle', '--measure', mode,
+             '--models-dir', args.models_dir, '--data-dir', args.data_dir],
+            check=True, capture_output=True, text=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(json.dumps(results, indent=2))
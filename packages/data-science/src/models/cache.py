@@ -0,0 +1,109 @@
+"""
+In-process prediction cache.
+
+Tickets repeat a lot (templated requests, re-opened tickets, backend retries), so the
+predictor keeps a bounded LRU of raw class probabilities keyed on a hash of the
+preprocessed text and the model version. Probabilities are cached rather than final
+labels so one entry can serve any confidence threshold.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+CacheEntry = Tuple[np.ndarray, np.ndarray]
+
+
+def make_cache_key(text: str, model_version: str) -> bytes:
+    """Hash preprocessed text and model version into a compact cache key."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(model_version.encode('utf-8'))
+    digest.update(b'\x00')
+    digest.update(text.encode('utf-8'))
+    return digest.digest()
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache with a per-entry time-to-live.
+
+    Usage:
+        cache = PredictionCache(max_size=10000, ttl_seconds=3600)
+        key = make_cache_key(text, model_version)
+        probas = cache.get(key)
+        if probas is None:
+            probas = score(text)
+            cache.put(key, probas)
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 3600.0):
+        """
+        Args:
+            max_size: Maximum number of entries before least-recently-used eviction
+            ttl_seconds: Seconds an entry stays valid after insertion (0 = no expiry)
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[bytes, Tuple[float, CacheEntry]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: bytes) -> Optional[CacheEntry]:
+        """Return cached (category_proba, priority_proba) for key, or None."""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = item
+            if self.ttl_seconds and time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: bytes, value: CacheEntry) -> None:
+        """Store probabilities for key, evicting the least recently used entries if full."""
+        if self.max_size <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
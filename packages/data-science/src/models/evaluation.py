@@ -0,0 +1,188 @@
+"""
+Confidence threshold sweep and calibration report for a classification head.
+
+The serving threshold trades coverage (the share of requests that get a label) against
+accuracy on the labelled ones. ``threshold_sweep`` sorts the test predictions by
+confidence once and reads coverage and accuracy for every threshold off cumulative
+sums, for the head as a whole and for each predicted class (one cumulative sum per
+class column, computed together). ``reliability_bins`` groups predictions by
+confidence to show whether a confidence of 0.8 really means 80% correct.
+
+train_model.py stores both in metadata.json under each head's ``evaluation`` key,
+with curves sampled on a fixed threshold grid, so serving can choose thresholds
+without re-running evaluation:
+
+    with open('models/metadata.json') as f:
+        evaluation = json.load(f)['category_model']['evaluation']
+    select_thresholds(evaluation['threshold_curve'], target_accuracy=0.9)
+    # -> {'account': 0.41, 'billing': 0.55, ...}
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Thresholds 0.00, 0.01, ..., 1.00
+DEFAULT_GRID = np.round(np.linspace(0.0, 1.0, 101), 2)
+DEFAULT_BINS = 10
+
+
+def threshold_sweep(
+    y_proba: np.ndarray,
+    y_true: np.ndarray,
+    classes: Sequence[str],
+    grid: Optional[np.ndarray] = DEFAULT_GRID
+) -> Dict[str, Any]:
+    """
+    Coverage and accuracy of a head at every confidence threshold.
+
+    A prediction is accepted when its confidence (top probability) is >= the
+    threshold. Per-class curves count the predictions of that class only, so their
+    accuracy is the precision of the class among accepted predictions and their
+    coverage is relative to how often the class is predicted.
+
+    Args:
+        y_proba: Predicted probabilities, shape (n_samples, n_classes)
+        y_true: True class indices, shape (n_samples,)
+        classes: Class labels, in column order
+        grid: Thresholds to report; None reports every distinct confidence value
+
+    Returns:
+        {'thresholds': [...], 'overall': {'coverage': [...], 'accuracy': [...]},
+         'per_class': {label: {'coverage': [...], 'accuracy': [...], 'support': n}}}
+        Accuracy is None where no prediction is accepted.
+    """
+    y_pred = y_proba.argmax(axis=1)
+    confidence = y_proba[np.arange(len(y_pred)), y_pred]
+    order = np.argsort(-confidence, kind='stable')
+    confidence_desc = confidence[order]
+    correct = (y_pred == np.asarray(y_true))[order]
+
+    # One-hot of the predicted class in confidence order: column sums give per-class counts
+    predicted = np.zeros((len(order), len(classes)), dtype=np.int64)
+    predicted[np.arange(len(order)), y_pred[order]] = 1
+    cum_predicted = np.cumsum(predicted, axis=0)
+    cum_correct_by_class = np.cumsum(predicted * correct[:, np.newaxis], axis=0)
+    cum_correct = cum_correct_by_class.sum(axis=1)
+
+    if grid is None:
+        thresholds = np.unique(confidence_desc)[::-1]
+    else:
+        thresholds = np.asarray(grid, dtype=float)
+    # Number of predictions with confidence >= t, for every t at once
+    accepted = np.searchsorted(-confidence_desc, -thresholds, side='right')
+    last = accepted - 1
+
+    def rates(covered: np.ndarray, hits: np.ndarray, total: int) -> Dict[str, List]:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            accuracy = np.where(covered > 0, hits / np.maximum(covered, 1), np.nan)
+        return {
+            'coverage': (covered / max(total, 1)).round(6).tolist(),
+            'accuracy': [None if np.isnan(value) else round(float(value), 6) for value in accuracy]
+        }
+
+    has_any = last >= 0
+    index = np.maximum(last, 0)
+    covered = np.where(has_any, accepted, 0)
+    overall = rates(covered, np.where(has_any, cum_correct[index], 0), len(order))
+
+    per_class = {}
+    support = cum_predicted[-1] if len(order) else np.zeros(len(classes), dtype=np.int64)
+    for column, label in enumerate(classes):
+        class_covered = np.where(has_any, cum_predicted[index, column], 0)
+        class_hits = np.where(has_any, cum_correct_by_class[index, column], 0)
+        per_class[str(label)] = {
+            **rates(class_covered, class_hits, int(support[column])),
+            'support': int(support[column])
+        }
+
+    return {
+        'thresholds': thresholds.tolist(),
+        'overall': overall,
+        'per_class': per_class
+    }
+
+
+def reliability_bins(
+    y_proba: np.ndarray, y_true: np.ndarray, n_bins: int = DEFAULT_BINS
+) -> Dict[str, Any]:
+    """
+    Calibration of the top-class confidence in equal-width bins.
+
+    Returns:
+        {'bins': [{'lower', 'upper', 'count', 'mean_confidence', 'accuracy'}],
+         'expected_calibration_error': float, 'max_calibration_error': float}
+    """
+    y_pred = y_proba.argmax(axis=1)
+    confidence = y_proba[np.arange(len(y_pred)), y_pred]
+    correct = (y_pred == np.asarray(y_true)).astype(float)
+
+    edges = np.linspace(0.0, 1.0, n_bins + 1)
+    # Right-closed bins; a confidence of exactly 0 lands in the first bin
+    bin_index = np.clip(np.searchsorted(edges, confidence, side='left') - 1, 0, n_bins - 1)
+    counts = np.bincount(bin_index, minlength=n_bins)
+    confidence_sums = np.bincount(bin_index, weights=confidence, minlength=n_bins)
+    correct_sums = np.bincount(bin_index, weights=correct, minlength=n_bins)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_confidence = confidence_sums / counts
+        accuracy = correct_sums / counts
+    gaps = np.abs(mean_confidence - accuracy)
+    occupied = counts > 0
+
+    return {
+        'bins': [
+            {
+                'lower': round(float(edges[i]), 6),
+                'upper': round(float(edges[i + 1]), 6),
+                'count': int(counts[i]),
+                'mean_confidence': float(mean_confidence[i]) if occupied[i] else None,
+                'accuracy': float(accuracy[i]) if occupied[i] else None
+            }
+            for i in range(n_bins)
+        ],
+        'expected_calibration_error': float(
+            (counts[occupied] * gaps[occupied]).sum() / max(len(y_pred), 1)
+        ),
+        'max_calibration_error': float(gaps[occupied].max()) if occupied.any() else 0.0
+    }
+
+
+def evaluation_report(
+    y_proba: np.ndarray, y_true: np.ndarray, classes: Sequence[str]
+) -> Dict[str, Any]:
+    """Threshold curve plus calibration bins, as stored in metadata.json."""
+    return {
+        'threshold_curve': threshold_sweep(y_proba, y_true, classes),
+        'calibration': reliability_bins(y_proba, y_true)
+    }
+
+
+def select_thresholds(
+    curve: Dict[str, Any],
+    target_accuracy: float,
+    default: Optional[float] = None
+) -> Dict[str, Optional[float]]:
+    """
+    Lowest threshold per class whose accepted predictions reach target_accuracy.
+
+    The lowest qualifying threshold keeps the most coverage. Classes that never
+    reach the target get ``default``.
+
+    Args:
+        curve: A ``threshold_curve`` from metadata.json (see threshold_sweep)
+        target_accuracy: Required accuracy (precision) of accepted predictions
+        default: Threshold for classes that can't reach the target
+
+    Returns:
+        {label: threshold}
+    """
+    thresholds = curve['thresholds']
+    selected = {}
+    for label, class_curve in curve['per_class'].items():
+        selected[label] = default
+        for threshold, accuracy in sorted(zip(thresholds, class_curve['accuracy'])):
+            if accuracy is not None and accuracy >= target_accuracy:
+                selected[label] = threshold
+                break
+    return selected
@@ -5,11 +5,26 @@ Provides a unified interface for making predictions with trained category and pr
 Outputs match the schema defined in contracts/integration-points/ds-model-output.schema.json
 """
 
+import json
 import pickle
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, cast
 from datetime import datetime
+from time import perf_counter
 import os
+import sys
+
+import numpy as np
+
+from src.features.normalize import (
+    NORMALIZER_VERSION, combine_fields, lemmatization_available, normalize_text, normalize_texts
+)
+from src.features.vectorizers import HashingFeaturizer, load_feature_config, load_vectorizer
+from src.models.bundle import BUNDLE_DIRNAME, ModelBundle, bundle_is_current
+from src.models.cache import CacheEntry, PredictionCache, make_cache_key
+from src.models.scoring import LinearScorer
+from src.monitoring.drift import DriftMonitor
+from src.monitoring.metrics import BATCH_SIZE, BELOW_THRESHOLD, PREDICTIONS, STAGE_SECONDS
 
 
 class RequestPredictor:
@@ -21,51 +36,159 @@ class RequestPredictor:
         result = predictor.predict("Password reset needed", "I can't log into my account")
     """
     
-    def __init__(self, models_dir: str = '../models', data_dir: str = '../data/processed'):
+    def __init__(
+        self,
+        models_dir: str = '../models',
+        data_dir: str = '../data/processed',
+        cache_size: Optional[int] = None,
+        cache_ttl: Optional[float] = None,
+        use_bundle: Optional[bool] = None,
+        instrument: bool = True
+    ):
         """
         Initialize predictor with trained models and preprocessing artifacts.
         
         Args:
             models_dir: Path to directory containing trained models
             data_dir: Path to directory containing preprocessing artifacts (vectorizer, encoders)
+            cache_size: Max cached predictions (defaults to env PREDICTION_CACHE_SIZE; 0 disables)
+            cache_ttl: Seconds a cached prediction stays valid
+                (defaults to env PREDICTION_CACHE_TTL)
+            use_bundle: Load models_dir/model_bundle instead of the pickle artifacts
+                (defaults to using the bundle when it was exported with metadata.json)
+            instrument: Record per-stage latency and prediction counters
+                (see src/monitoring/metrics.py)
         """
+        self.instrument = instrument
         models_path = Path(models_dir)
         data_path = Path(data_dir)
+        bundle_path = models_path / BUNDLE_DIRNAME
+        metadata = {}
+        if (models_path / 'metadata.json').exists():
+            with open(models_path / 'metadata.json') as f:
+                metadata = json.load(f)
+        self._check_normalizer(metadata.get('features') or load_feature_config(data_path))
+        
+        if use_bundle is None:
+            use_bundle = bundle_is_current(models_path)
+            if bundle_path.exists() and not use_bundle:
+                print(f"⚠️  Warning: {bundle_path} is from another training run; "
+                      f"loading the pickles", file=sys.stderr)
+        elif use_bundle and not bundle_is_current(models_path):
+            raise ValueError(
+                f"{bundle_path} was not exported with {models_path / 'metadata.json'}; "
+                f"re-export it with train_model.py --export-bundle"
+            )
+        if use_bundle:
+            self._load_bundle(bundle_path)
+        else:
+            self._load_pickles(models_path, data_path)
+
+        # Cache raw probabilities so any confidence threshold can be served from one entry
+        if cache_size is None:
+            cache_size = int(os.getenv('PREDICTION_CACHE_SIZE', 10000))
+        if cache_ttl is None:
+            cache_ttl = float(os.getenv('PREDICTION_CACHE_TTL', 3600))
+        self.cache = PredictionCache(cache_size, cache_ttl) if cache_size > 0 else None
         
+        # Vocabulary by feature index, decoded on first use by term attributions
+        self._feature_names: Optional[np.ndarray] = None
+
+        # Live traffic sketches against the training profile (GET /drift)
+        self.drift = None
+        if instrument:
+            self.drift = DriftMonitor(
+                metadata.get('drift_reference'), self.vectorizer,
+                self.category_encoder.classes_.tolist(), self.priority_encoder.classes_.tolist(),
+                window_seconds=float(os.getenv('DRIFT_WINDOW_SECONDS', 300))
+            )
+
+        print("RequestPredictor initialized successfully")
+
+    @staticmethod
+    def _check_normalizer(features: Dict[str, Any]) -> None:
+        """
+        Refuse to serve if text would be normalized differently than at training time.
+
+        Lemmatization silently turns off without the WordNet corpus, and normalizer
+        versions differ in output; either mismatch would send the vectorizer unseen token
+        forms.
+        """
+        # Configs recording 'lemmatize' but no version were written by version 1
+        version = features.get('normalizer_version', 1 if 'lemmatize' in features else None)
+        if version is not None and version != NORMALIZER_VERSION:
+            raise ValueError(
+                f"Models were trained with text normalizer version {version}, but this code "
+                f"normalizes with version {NORMALIZER_VERSION}; retrain the models"
+            )
+        trained = features.get('lemmatize')
+        if trained is not None and trained != lemmatization_available():
+            raise ValueError(
+                f"Models were trained {'with' if trained else 'without'} lemmatization but this "
+                f"environment {'lacks' if trained else 'has'} the WordNet corpus; "
+                + (
+                    "run nltk.download('wordnet')"
+                    if trained
+                    else "retrain with the WordNet corpus installed"
+                )
+            )
+
+    def _load_pickles(self, models_path: Path, data_path: Path) -> None:
+        """Load the two models, vectorizer and encoders from their pickle files."""
         # Load models
         with open(models_path / 'category_model.pkl', 'rb') as f:
             self.category_model = pickle.load(f)
         with open(models_path / 'priority_model.pkl', 'rb') as f:
             self.priority_model = pickle.load(f)
         
-        # Load preprocessing artifacts
-        with open(data_path / 'tfidf_vectorizer.pkl', 'rb') as f:
-            self.vectorizer = pickle.load(f)
+        # Load preprocessing artifacts (TF-IDF or hashing, per data_dir/features.json)
+        self.vectorizer = load_vectorizer(data_path)
         with open(data_path / 'category_encoder.pkl', 'rb') as f:
             self.category_encoder = pickle.load(f)
         with open(data_path / 'priority_encoder.pkl', 'rb') as f:
             self.priority_encoder = pickle.load(f)
         
+        # Stack both heads into one weight matrix; None means fall back to sklearn
+        self.scorer = LinearScorer.from_models([self.category_model, self.priority_model])
+
         # Load model version from metadata if available
         self.model_version = os.getenv('MODEL_VERSION', '1.0.0')
-        
-        print("RequestPredictor initialized successfully")
+        self.trained_at = None
+        metadata_path = models_path / 'metadata.json'
+        if metadata_path.exists():
+            with open(metadata_path) as f:
+                metadata = json.load(f)
+            self.model_version = metadata.get('model_version', self.model_version)
+            self.trained_at = metadata.get('training_info', {}).get('trained_at')
+
+    def _load_bundle(self, bundle_path: Path) -> None:
+        """Map a model bundle exported by train_model.py (see src/models/bundle.py)."""
+        bundle = ModelBundle(bundle_path)
+        self.category_model = None
+        self.priority_model = None
+        self.vectorizer = bundle.vectorizer
+        self.category_encoder = bundle.category_encoder
+        self.priority_encoder = bundle.priority_encoder
+        self.scorer = bundle.scorer
+        self.model_version = bundle.model_version
+        self.trained_at = bundle.trained_at
     
     def preprocess_text(self, title: str, description: str) -> str:
         """
         Preprocess text for prediction.
         
-        TODO: This should match the preprocessing in notebooks/02-feature-engineering.ipynb
-        For now, simple concatenation.
+        Uses the same normalizer as the feature pipeline (src/features/normalize.py),
+        so the vectorizer sees text prepared exactly as it was at training time.
         """
-        combined = f"{title} {description}"
-        return combined
+        return normalize_text(combine_fields(title, description))
     
     def predict(
         self,
         title: str,
         description: str,
-        confidence_threshold: float = 0.6
+        confidence_threshold: float = 0.6,
+        top_k: Optional[int] = None,
+        top_terms: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Predict category and priority for a request.
@@ -74,6 +197,9 @@ class RequestPredictor:
             title: Request title
             description: Request description
             confidence_threshold: Minimum confidence to return prediction
+            top_k: Also return the k most likely classes of each head
+            top_terms: Also return the n-grams that contributed most to each
+                head's predicted class (scores without the prediction cache)
             
         Returns:
             Dictionary matching ds-model-output.schema.json:
@@ -85,57 +211,351 @@ class RequestPredictor:
                 "model_version": str,
                 "timestamp": str (ISO 8601)
             }
+            plus, when requested, ``category_top_k``/``priority_top_k``
+            ([{"label", "confidence"}]) and ``category_terms``/``priority_terms``
+            ([{"term", "weight"}])
         """
-        # Preprocess
+        start = perf_counter()
         text = self.preprocess_text(title, description)
+        self._observe('preprocess', start)
+
+        X = None
+        if top_terms:
+            # Attributions need the feature row, so score it without the cache
+            X, cat_proba, pri_proba = self._score_uncached([text])
+        else:
+            cat_proba, pri_proba = self._score_texts([text])
         
-        # Vectorize
-        X = self.vectorizer.transform([text])
+        start = perf_counter()
+        results = self._build_results(cat_proba, pri_proba, np.array([confidence_threshold]))
+        if top_k or top_terms:
+            self._add_details(results, [text], cat_proba, pri_proba, X, [top_k], [top_terms])
+        self._observe('postprocess', start)
+        return results[0]
+    
+    def predict_batch(
+        self,
+        requests: list[Dict[str, Any]],
+        confidence_threshold: float = 0.6
+    ) -> list[Dict[str, Any]]:
+        """
+        Predict for multiple requests at once.
         
-        # Predict category
-        cat_proba = self.category_model.predict_proba(X)[0]
-        cat_idx = cat_proba.argmax()
-        cat_confidence = float(cat_proba[cat_idx])
+        The whole batch is vectorized into one sparse matrix and each model is run
+        once over it, so the per-call overhead is paid once per batch, not per item.
         
-        if cat_confidence >= confidence_threshold:
-            predicted_category = self.category_encoder.classes_[cat_idx]
-        else:
-            predicted_category = None
+        Args:
+            requests: List of dicts with 'title', 'description' and optional
+                per-item 'confidence_threshold', 'top_k' and 'top_terms'
+                (see ``predict``; if any item asks for terms, the batch is
+                scored without the prediction cache)
+            confidence_threshold: Threshold for items that don't set their own
+            
+        Returns:
+            List of prediction results, in the same order as ``requests``
+        """
+        if not requests:
+            return []
+
+        start = perf_counter()
+        texts = normalize_texts(
+            [combine_fields(req['title'], req['description']) for req in requests]
+        )
+        self._observe('preprocess', start)
         
-        # Predict priority
-        pri_proba = self.priority_model.predict_proba(X)[0]
-        pri_idx = pri_proba.argmax()
-        pri_confidence = float(pri_proba[pri_idx])
+        thresholds = np.array([
+            req.get('confidence_threshold') if req.get('confidence_threshold') is not None
+            else confidence_threshold
+            for req in requests
+        ], dtype=float)
         
-        if pri_confidence >= confidence_threshold:
-            predicted_priority = self.priority_encoder.classes_[pri_idx]
+        top_ks = [req.get('top_k') for req in requests]
+        top_terms = [req.get('top_terms') for req in requests]
+        X = None
+        if any(top_terms):
+            X, cat_proba, pri_proba = self._score_uncached(texts)
         else:
-            predicted_priority = None
+            cat_proba, pri_proba = self._score_texts(texts)
         
-        # Build output matching schema
-        result = {
-            "predicted_category": predicted_category,
-            "category_confidence": cat_confidence,
-            "predicted_priority": predicted_priority,
-            "priority_confidence": pri_confidence,
-            "model_version": self.model_version,
-            "timestamp": datetime.utcnow().isoformat() + 'Z'
-        }
-        
-        return result
+        start = perf_counter()
+        results = self._build_results(cat_proba, pri_proba, thresholds)
+        if any(top_ks) or X is not None:
+            self._add_details(results, texts, cat_proba, pri_proba, X, top_ks, top_terms)
+        self._observe('postprocess', start)
+        return results
     
-    def predict_batch(self, requests: list[Dict[str, str]]) -> list[Dict[str, Any]]:
+    def predict_proba_batch(self, requests: list[Dict[str, Any]]) -> tuple[np.ndarray, np.ndarray]:
         """
-        Predict for multiple requests at once.
+        Class probabilities for a batch of requests (no thresholds or formatting).
         
         Args:
             requests: List of dicts with 'title' and 'description'
             
         Returns:
-            List of prediction results
+            (category probabilities, priority probabilities); columns follow
+            ``category_encoder.classes_`` and ``priority_encoder.classes_``
+        """
+        start = perf_counter()
+        texts = normalize_texts(
+            [combine_fields(req['title'], req['description']) for req in requests]
+        )
+        self._observe('preprocess', start)
+        return self._score_texts(texts)
+
+    def predict_proba_raw(self, requests: list[Dict[str, Any]]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Like ``predict_proba_batch``, but straight from the models: no prediction
+        cache, metrics or drift sketches.
+
+        For side-by-side model comparisons (src/serving/shadow.py), where both models
+        must do the full work and sampled traffic mustn't be counted twice.
+        """
+        texts = normalize_texts(
+            [combine_fields(req['title'], req['description']) for req in requests]
+        )
+        X = self.vectorizer.transform(texts)
+        if self.scorer is not None:
+            cat_proba, pri_proba = self.scorer.predict_proba(X)
+            return cat_proba, pri_proba
+        return self.category_model.predict_proba(X), self.priority_model.predict_proba(X)
+
+    def _observe(self, stage: str, start: float) -> None:
+        """Record the time since ``start`` against a prediction stage."""
+        if self.instrument:
+            STAGE_SECONDS.labels(stage).observe(perf_counter() - start)
+
+    def _score_texts(self, texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Compute probabilities for preprocessed texts, serving repeats from the cache.
+
+        Cache misses are vectorized and scored together as one matrix.
+        """
+        if self.cache is None:
+            _, cat_proba, pri_proba = self._score_uncached(texts)
+            return cat_proba, pri_proba
+
+        if self.instrument:
+            BATCH_SIZE.labels().observe(len(texts))
+
+        start = perf_counter()
+        keys = [make_cache_key(text, self.model_version) for text in texts]
+        cached = [self.cache.get(key) for key in keys]
+        missing = [i for i, entry in enumerate(cached) if entry is None]
+        self._observe('cache_lookup', start)
+
+        if len(missing) == len(texts):
+            X = self._vectorize(texts)
+            cat_proba, pri_proba = self._score(X)
+            for i, key in enumerate(keys):
+                self.cache.put(key, (cat_proba[i].copy(), pri_proba[i].copy()))
+            self._observe_drift(texts, cat_proba, pri_proba, X)
+            return cat_proba, pri_proba
+
+        X = None
+        if missing:
+            X = self._vectorize([texts[i] for i in missing])
+            cat_miss, pri_miss = self._score(X)
+            for row, i in enumerate(missing):
+                entry = (cat_miss[row].copy(), pri_miss[row].copy())
+                cached[i] = entry
+                self.cache.put(keys[i], entry)
+
+        # Every row is filled in now
+        entries = cast(List[CacheEntry], cached)
+        cat_proba = np.vstack([entry[0] for entry in entries])
+        pri_proba = np.vstack([entry[1] for entry in entries])
+        self._observe_drift(texts, cat_proba, pri_proba, X, missing)
+        return cat_proba, pri_proba
+
+    def _score_uncached(self, texts: list[str]):
+        """
+        Vectorize and score preprocessed texts without the cache, recording the batch
+        size and drift like cached scoring does.
+
+        Returns:
+            (feature matrix, category probabilities, priority probabilities)
+        """
+        if self.instrument:
+            BATCH_SIZE.labels().observe(len(texts))
+        X = self._vectorize(texts)
+        cat_proba, pri_proba = self._score(X)
+        self._observe_drift(texts, cat_proba, pri_proba, X)
+        return X, cat_proba, pri_proba
+
+    def _observe_drift(
+        self,
+        texts: list[str],
+        cat_proba: np.ndarray,
+        pri_proba: np.ndarray,
+        X,
+        rows: Optional[list[int]] = None
+    ) -> None:
+        """Add a scored batch to the drift sketches; X holds the vectorized ``rows`` (or all)."""
+        # Uninstrumented calls (e.g. ModelManager warm-up) are not live traffic
+        if self.drift is None or not self.instrument:
+            return
+        start = perf_counter()
+        row_nnz = np.diff(X.indptr) if X is not None else None
+        if rows is not None:
+            # Cached rows weren't vectorized: -1 leaves them out of the nnz sketch
+            aligned = np.full(len(texts), -1, dtype=np.int64)
+            if row_nnz is not None:
+                aligned[rows] = row_nnz
+            row_nnz = aligned
+        self.drift.observe(texts, cat_proba, pri_proba, row_nnz)
+        self._observe('drift', start)
+
+    def _vectorize(self, texts: list[str]):
+        """Transform preprocessed texts into a sparse feature matrix."""
+        start = perf_counter()
+        X = self.vectorizer.transform(texts)
+        self._observe('vectorize', start)
+        return X
+
+    def _score(self, X) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Compute category and priority probabilities for a feature matrix.
+
+        Uses the fused LinearScorer when both heads support it, otherwise the
+        models' own predict_proba.
+        """
+        start = perf_counter()
+        if self.scorer is not None:
+            cat_proba, pri_proba = self.scorer.predict_proba(X)
+            self._observe('score', start)
+            return cat_proba, pri_proba
+
+        cat_proba = self.category_model.predict_proba(X)
+        self._observe('category_model', start)
+        start = perf_counter()
+        pri_proba = self.priority_model.predict_proba(X)
+        self._observe('priority_model', start)
+        return cat_proba, pri_proba
+
+    def _build_results(
+        self,
+        cat_proba: np.ndarray,
+        pri_proba: np.ndarray,
+        thresholds: np.ndarray
+    ) -> list[Dict[str, Any]]:
+        """
+        Turn probability arrays into output dicts matching ds-model-output.schema.json.
+
+        Args:
+            cat_proba: Category probabilities, shape (n_requests, n_categories)
+            pri_proba: Priority probabilities, shape (n_requests, n_priorities)
+            thresholds: Confidence threshold per request, shape (n_requests,)
+
+        Returns:
+            One result dict per row, with labels set to None below threshold
         """
-        return [self.predict(req['title'], req['description']) for req in requests]
+        rows = np.arange(cat_proba.shape[0])
+
+        cat_idx = cat_proba.argmax(axis=1)
+        cat_confidence = cat_proba[rows, cat_idx]
+        cat_labels = self.category_encoder.classes_[cat_idx]
+        cat_accepted = cat_confidence >= thresholds
+
+        pri_idx = pri_proba.argmax(axis=1)
+        pri_confidence = pri_proba[rows, pri_idx]
+        pri_labels = self.priority_encoder.classes_[pri_idx]
+        pri_accepted = pri_confidence >= thresholds
+
+        if self.instrument:
+            n_rows = len(rows)
+            PREDICTIONS.labels('category').inc(n_rows)
+            PREDICTIONS.labels('priority').inc(n_rows)
+            cat_nulls = n_rows - int(cat_accepted.sum())
+            pri_nulls = n_rows - int(pri_accepted.sum())
+            if cat_nulls:
+                BELOW_THRESHOLD.labels('category').inc(cat_nulls)
+            if pri_nulls:
+                BELOW_THRESHOLD.labels('priority').inc(pri_nulls)
+
+        timestamp = datetime.utcnow().isoformat() + 'Z'
+
+        return [
+            {
+                "predicted_category": cat_label if cat_ok else None,
+                "category_confidence": cat_conf,
+                "predicted_priority": pri_label if pri_ok else None,
+                "priority_confidence": pri_conf,
+                "model_version": self.model_version,
+                "timestamp": timestamp
+            }
+            for cat_label, cat_conf, cat_ok, pri_label, pri_conf, pri_ok in zip(
+                cat_labels.tolist(), cat_confidence.tolist(), cat_accepted.tolist(),
+                pri_labels.tolist(), pri_confidence.tolist(), pri_accepted.tolist()
+            )
+        ]
+
+    def _add_details(
+        self,
+        results: list[Dict[str, Any]],
+        texts: list[str],
+        cat_proba: np.ndarray,
+        pri_proba: np.ndarray,
+        X,
+        top_ks: list[Optional[int]],
+        top_terms: list[Optional[int]]
+    ) -> None:
+        """
+        Add the opt-in top-k classes and term attributions to result dicts, in place.
+
+        Attributions come from the rows of X that were just scored and the fused
+        scorer's coefficients (see LinearScorer.contributions), so they cost work
+        proportional to each row's non-zeros. They are None when the heads aren't
+        linear.
+        """
+        heads = [
+            ('category', cat_proba, self.category_encoder.classes_),
+            ('priority', pri_proba, self.priority_encoder.classes_)
+        ]
+        for head, (name, proba, classes) in enumerate(heads):
+            order = np.argsort(-proba, axis=1) if any(top_ks) else None
+            for row, result in enumerate(results):
+                k = top_ks[row]
+                if k and order is not None:
+                    idx = order[row, :k]
+                    result[f'{name}_top_k'] = [
+                        {'label': label, 'confidence': confidence}
+                        for label, confidence in zip(
+                            classes[idx].tolist(), proba[row, idx].tolist()
+                        )
+                    ]
+                n_terms = top_terms[row]
+                if n_terms:
+                    result[f'{name}_terms'] = self._top_terms(
+                        X, row, head, int(proba[row].argmax()), n_terms, texts[row]
+                    )
+
+    def _top_terms(self, X, row: int, head: int, class_index: int, n_terms: int, text: str):
+        """The n features with the largest positive contribution to one head's class."""
+        if self.scorer is None:
+            return None
+        indices, contributions = self.scorer.contributions(X, row, head, class_index)
+        if len(contributions) > n_terms:
+            top = np.argpartition(-contributions, n_terms - 1)[:n_terms]
+        else:
+            top = np.arange(len(contributions))
+        top = top[np.argsort(-contributions[top])]
+        top = top[contributions[top] > 0]
+        term = self._term_lookup(text)
+        return [
+            {'term': term(index), 'weight': weight}
+            for index, weight in zip(indices[top].tolist(), contributions[top].tolist())
+        ]
 
+    def _term_lookup(self, text: str):
+        """Function mapping a feature index back to its n-gram, for this vectorizer."""
+        if isinstance(self.vectorizer, HashingFeaturizer):
+            # No vocabulary: rehash the request's own n-grams
+            return self.vectorizer.column_terms(text).get
+        if hasattr(self.vectorizer, 'term'):
+            return self.vectorizer.term
+        if self._feature_names is None:
+            self._feature_names = self.vectorizer.get_feature_names_out()
+        return self._feature_names.__getitem__
 
 if __name__ == "__main__":
     # Test prediction
@@ -0,0 +1,322 @@
+"""
+Offline bulk scoring of ticket exports.
+
+Streams a CSV or JSONL export in fixed-size chunks, scores each chunk with
+``RequestPredictor.predict_proba_batch`` in a pool of worker processes and writes one
+output part per chunk, in the shape of
+contracts/integration-points/ds-model-output.schema.json:
+
+    {"request_id": "REQ-000123", "model_version": "v1.0.0", "timestamp": "...",
+     "predictions": {"category": {"predicted_value": "billing", "confidence": 0.91,
+                                  "probabilities": {"account": 0.02, ...}},
+                     "priority": {...}}}
+
+Each worker loads the predictor once (the prediction cache is disabled: every ticket
+is scored once). At most ``2 * workers`` chunks are read ahead of the writers, so
+memory is bounded by the chunk size, not the export size.
+
+Parts are written as ``part-00000.jsonl`` (or ``.parquet``) beside a temporary file
+and renamed into place, so a part either exists completely or not at all. Re-running
+the same command after an interruption skips the chunks whose parts exist. The output
+directory's ``_manifest.json`` records the input fingerprint, chunk size and model
+(version and training time), and a resume with different ones is refused instead of
+mixing outputs.
+
+Usage (from packages/data-science):
+    python -m src.models.score_bulk --input ../data/raw/requests.csv --output-dir ../data/scored
+    python -m src.models.score_bulk --input export.jsonl --output-dir scored --format parquet \\
+        --chunk-size 20000 --workers 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data.frame_cache import parquet_engine_available
+from src.models.bundle import (
+    BUNDLE_DIRNAME,
+    MANIFEST_FILE as BUNDLE_MANIFEST_FILE,
+    bundle_is_current
+)
+
+OUTPUT_FORMATS = ('jsonl', 'parquet')
+MANIFEST_FILE = '_manifest.json'
+INPUT_COLUMNS = ('id', 'title', 'description')
+
+# Set once per worker process by _init_worker
+_PREDICTOR: Any = None
+
+
+def iter_chunks(path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yield the id/title/description columns of a CSV or JSONL export, chunk by chunk."""
+    if path.suffix == '.csv':
+        reader = pd.read_csv(
+            path, chunksize=chunk_size, usecols=lambda column: column in INPUT_COLUMNS,
+            dtype={'id': str}
+        )
+    elif path.suffix in ('.jsonl', '.ndjson'):
+        reader = pd.read_json(path, lines=True, chunksize=chunk_size, dtype={'id': str})
+    else:
+        raise ValueError(f"Unsupported input format: {path.suffix} (expected .csv or .jsonl)")
+    with reader:
+        for chunk in reader:
+            missing = set(INPUT_COLUMNS) - set(chunk.columns)
+            if missing:
+                raise ValueError(f"Input is missing columns: {sorted(missing)}")
+            yield chunk[list(INPUT_COLUMNS)]
+
+
+def contract_version(model_version: str) -> str:
+    """Model versions are 'vMAJOR.MINOR.PATCH' in the output contract."""
+    return model_version if model_version.startswith('v') else f'v{model_version}'
+
+
+def build_records(
+    ids: List[str],
+    cat_proba: np.ndarray,
+    pri_proba: np.ndarray,
+    category_classes: List[str],
+    priority_classes: List[str],
+    model_version: str
+) -> List[Dict[str, Any]]:
+    """Format probability arrays as ds-model-output records (argmax, no threshold)."""
+    timestamp = datetime.utcnow().isoformat() + 'Z'
+    version = contract_version(model_version)
+    heads = []
+    for proba, classes in ((cat_proba, category_classes), (pri_proba, priority_classes)):
+        best = proba.argmax(axis=1)
+        heads.append((
+            [classes[i] for i in best.tolist()],
+            proba[np.arange(len(best)), best].tolist(),
+            proba.tolist(),
+            classes
+        ))
+
+    records = []
+    for row, request_id in enumerate(ids):
+        predictions = {}
+        for name, (labels, confidences, probabilities, classes) in zip(
+            ('category', 'priority'), heads
+        ):
+            predictions[name] = {
+                'predicted_value': labels[row],
+                'confidence': confidences[row],
+                'probabilities': dict(zip(classes, probabilities[row]))
+            }
+        records.append({
+            'request_id': request_id,
+            'model_version': version,
+            'timestamp': timestamp,
+            'predictions': predictions
+        })
+    return records
+
+
+def write_part(records: List[Dict[str, Any]], path: Path, output_format: str) -> None:
+    """Write one part beside its final name, then rename it into place."""
+    tmp_path = path.with_name(f'.{path.name}.tmp')
+    if output_format == 'parquet':
+        pd.DataFrame.from_records(records).to_parquet(tmp_path, index=False)
+    else:
+        with open(tmp_path, 'w') as f:
+            for record in records:
+                f.write(json.dumps(record))
+                f.write('\n')
+    os.replace(tmp_path, path)
+
+
+def _init_worker(models_dir: str, data_dir: str) -> None:
+    global _PREDICTOR
+    import contextlib
+
+    from src.models.predict import RequestPredictor
+
+    # Keep stdout for the summary
+    with contextlib.redirect_stdout(sys.stderr):
+        _PREDICTOR = RequestPredictor(models_dir, data_dir, cache_size=0, instrument=False)
+
+
+def _score_chunk(
+    index: int, chunk: pd.DataFrame, path: Path, output_format: str
+) -> Tuple[int, int]:
+    """Score one chunk and write its part; returns (chunk index, rows)."""
+    requests = [
+        {'title': title, 'description': description}
+        for title, description in zip(chunk['title'].tolist(), chunk['description'].tolist())
+    ]
+    cat_proba, pri_proba = _PREDICTOR.predict_proba_batch(requests)
+    records = build_records(
+        chunk['id'].astype(str).tolist(), cat_proba, pri_proba,
+        _PREDICTOR.category_encoder.classes_.tolist(),
+        _PREDICTOR.priority_encoder.classes_.tolist(),
+        _PREDICTOR.model_version
+    )
+    write_part(records, path, output_format)
+    return index, len(records)
+
+
+def _read_model_identity(models_dir: Path) -> Dict[str, Optional[str]]:
+    """
+    Version and training time of the model that will score, for the resume check.
+
+    The version alone stays the same across retrains (it defaults to 1.0.0), so a
+    resume after retraining would mix two models' output without the training time.
+    """
+    # Same choice of artifacts as RequestPredictor: a bundle only if it is current
+    if bundle_is_current(models_dir):
+        with open(models_dir / BUNDLE_DIRNAME / BUNDLE_MANIFEST_FILE) as f:
+            manifest = json.load(f)
+        return {
+            'model_version': manifest.get('model_version'),
+            'model_trained_at': manifest.get('trained_at')
+        }
+    path = models_dir / 'metadata.json'
+    if not path.exists():
+        return {'model_version': None, 'model_trained_at': None}
+    with open(path) as f:
+        metadata = json.load(f)
+    return {
+        'model_version': metadata.get('model_version'),
+        'model_trained_at': metadata.get('training_info', {}).get('trained_at')
+    }
+
+
+def _check_manifest(output_dir: Path, manifest: Dict[str, Any], overwrite: bool) -> None:
+    """Refuse to resume into an output directory written for other inputs or settings."""
+    path = output_dir / MANIFEST_FILE
+    if path.exists() and not overwrite:
+        with open(path) as f:
+            previous = json.load(f)
+        if previous != manifest:
+            changed = sorted(key for key in manifest if previous.get(key) != manifest[key])
+            raise ValueError(
+                f"{output_dir} holds output for a different run (changed: {', '.join(changed)}); "
+                f"use a new --output-dir or pass --overwrite"
+            )
+        return
+    if overwrite:
+        for part in output_dir.glob('part-*'):
+            part.unlink()
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def score_file(
+    input_path: Path,
+    output_dir: Path,
+    models_dir: Path,
+    data_dir: Path,
+    output_format: str = 'jsonl',
+    chunk_size: int = 10_000,
+    workers: Optional[int] = None,
+    overwrite: bool = False
+) -> Dict[str, Any]:
+    """
+    Score an export into output_dir, resuming from the parts already written.
+
+    Args:
+        input_path: CSV or JSONL export with id, title and description
+        output_dir: Directory for part files and the manifest
+        models_dir: Trained models (and optionally model_bundle/)
+        data_dir: Preprocessing artifacts
+        output_format: 'jsonl' or 'parquet'
+        chunk_size: Rows per chunk (and per output part)
+        workers: Scoring processes (default: CPU count)
+        overwrite: Discard existing parts instead of resuming
+
+    Returns:
+        Counts of scored and skipped chunks/rows and throughput
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Unknown output format '{output_format}' (expected one of {OUTPUT_FORMATS})"
+        )
+    # Before the manifest is written, so a failed run doesn't pin the output directory
+    if output_format == 'parquet' and not parquet_engine_available():
+        raise ValueError("Parquet output needs pyarrow or fastparquet; install one or use jsonl")
+    input_path, output_dir = Path(input_path), Path(output_dir)
+    workers = workers or os.cpu_count() or 1
+    stat = input_path.stat()
+    manifest = {
+        'input': str(input_path.resolve()),
+        'input_size': stat.st_size,
+        'input_mtime_ns': stat.st_mtime_ns,
+        'chunk_size': chunk_size,
+        'format': output_format,
+        **_read_model_identity(Path(models_dir))
+    }
+    output_dir.mkdir(parents=True, exist_ok=True)
+    _check_manifest(output_dir, manifest, overwrite)
+
+    stats: Dict[str, Any] = {'chunks_scored': 0, 'chunks_skipped': 0, 'rows_scored': 0}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(str(models_dir), str(data_dir))
+    ) as pool:
+        pending: Set[Future] = set()
+        for index, chunk in enumerate(iter_chunks(input_path, chunk_size)):
+            part_path = output_dir / f'part-{index:05d}.{output_format}'
+            if part_path.exists():
+                stats['chunks_skipped'] += 1
+                continue
+            # Bounded read-ahead: wait for a slot before reading more of the export
+            while len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    _record(future.result(), stats, start)
+            pending.add(pool.submit(_score_chunk, index, chunk, part_path, output_format))
+        for future in wait(pending).done:
+            _record(future.result(), stats, start)
+
+    stats['seconds'] = time.perf_counter() - start
+    stats['rows_per_second'] = stats['rows_scored'] / stats['seconds'] if stats['seconds'] else 0.0
+    return stats
+
+
+def _record(result: Tuple[int, int], stats: Dict[str, Any], start: float) -> None:
+    index, rows = result
+    stats['chunks_scored'] += 1
+    stats['rows_scored'] += rows
+    elapsed = time.perf_counter() - start
+    print(f"Chunk {index}: {rows} rows ({stats['rows_scored'] / elapsed:.0f} rows/s overall)",
+          file=sys.stderr)
+
+
+def main(argv=None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Score a ticket export in bulk")
+    parser.add_argument('--input', type=Path, required=True, help='CSV or JSONL export')
+    parser.add_argument('--output-dir', type=Path, required=True, help='Directory for output parts')
+    parser.add_argument('--models-dir', type=Path, default=Path('../models'), help='Trained models')
+    parser.add_argument('--data-dir', type=Path, default=Path('../data/processed'),
+                        help='Preprocessing artifacts')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='jsonl', help='Output format')
+    parser.add_argument('--chunk-size', type=int, default=10_000, help='Rows per chunk')
+    parser.add_argument(
+        '--workers', type=int, default=None, help='Scoring processes (default: CPU count)'
+    )
+    parser.add_argument(
+        '--overwrite', action='store_true', help='Discard existing output instead of resuming'
+    )
+    args = parser.parse_args(argv)
+
+    stats = score_file(
+        args.input, args.output_dir, args.models_dir, args.data_dir, output_format=args.format,
+        chunk_size=args.chunk_size, workers=args.workers, overwrite=args.overwrite
+    )
+    print(json.dumps(stats, indent=2))
+    return stats
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Fused linear scoring for the category and priority heads.
+
+Both heads are linear models over the same TF-IDF features, so their coefficients can
+be stacked into one dense weight matrix at load time. A request is then scored with a
+single sparse x dense product plus a softmax over each head's slice of the logits,
+skipping sklearn's per-call input validation entirely. One-vs-rest logistic heads (e.g.
+SGDClassifier(loss='log_loss') from incremental training) use normalized sigmoids over
+their slice instead, which is what their predict_proba computes.
+
+Usage:
+    scorer = LinearScorer.from_models([category_model, priority_model])
+    cat_proba, pri_proba = scorer.predict_proba(X)
+"""
+
+from typing import Any, List, Optional, Sequence, Tuple, cast
+
+import numpy as np
+import scipy.sparse
+from scipy.special import expit
+
+HEAD_KINDS = ('softmax', 'ovr')
+
+
+def is_softmax_linear(model: Any) -> bool:
+    """
+    Check whether a fitted model's predict_proba is softmax(X @ coef_.T + intercept_).
+
+    True for LogisticRegression with the default (multinomial) multi-class handling,
+    and for any binary LogisticRegression. One-vs-rest models normalize independent
+    sigmoids instead, so they are not fusable.
+    """
+    if not (hasattr(model, 'coef_') and hasattr(model, 'intercept_')):
+        return False
+    if type(model).__name__ != 'LogisticRegression':
+        return False
+    if len(model.classes_) == 2:
+        return True
+    multi_class = getattr(model, 'multi_class', 'auto')
+    if multi_class == 'ovr':
+        return False
+    if multi_class in ('auto', 'deprecated') and model.solver == 'liblinear':
+        return False
+    return True
+
+
+def is_ovr_logistic(model: Any) -> bool:
+    """
+    Check whether a fitted model's predict_proba is normalized sigmoid(X @ coef_.T + intercept_).
+
+    True for one-vs-rest LogisticRegression and for SGDClassifier with log loss.
+    """
+    if not (hasattr(model, 'coef_') and hasattr(model, 'intercept_')):
+        return False
+    name = type(model).__name__
+    if name == 'SGDClassifier':
+        return bool(model.loss == 'log_loss')
+    return name == 'LogisticRegression' and not is_softmax_linear(model)
+
+
+def head_kind(model: Any) -> Optional[str]:
+    """Return 'softmax' or 'ovr' for models LinearScorer can fuse, else None."""
+    if is_softmax_linear(model):
+        return 'softmax'
+    if is_ovr_logistic(model):
+        # Binary heads have one logit: sigmoid(z) == softmax([0, z])[1]
+        return 'softmax' if len(model.classes_) == 2 else 'ovr'
+    return None
+
+
+class LinearScorer:
+    """
+    Scores several softmax-linear heads with one matrix product.
+
+    Attributes:
+        weights: Dense (n_features, n_total_classes) matrix of stacked coefficients
+        bias: Stacked intercepts, shape (n_total_classes,)
+        offsets: Column offsets of each head in ``weights``; head i owns
+            columns ``offsets[i]:offsets[i + 1]``
+        kinds: Per-head probability link, 'softmax' or 'ovr'
+    """
+
+    def __init__(
+        self,
+        coefs: List[np.ndarray],
+        intercepts: List[np.ndarray],
+        kinds: Optional[Sequence[str]] = None
+    ):
+        """
+        Args:
+            coefs: Per-head coefficient matrices, shape (n_classes, n_features)
+            intercepts: Per-head intercept vectors, shape (n_classes,)
+            kinds: Per-head link ('softmax' or 'ovr'); defaults to all softmax
+        """
+        self.weights = np.ascontiguousarray(np.vstack(coefs).T, dtype=np.float64)
+        self.bias = np.concatenate(intercepts).astype(np.float64)
+        self.offsets = np.cumsum([0] + [c.shape[0] for c in coefs])
+        self.kinds = tuple(kinds) if kinds else ('softmax',) * len(coefs)
+        self.n_features = self.weights.shape[0]
+
+        # Keep the stacked arrays read-only: they are shared by every request
+        self.weights.setflags(write=False)
+        self.bias.setflags(write=False)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        weights: np.ndarray,
+        bias: np.ndarray,
+        offsets: np.ndarray,
+        kinds: Optional[Sequence[str]] = None
+    ) -> 'LinearScorer':
+        """
+        Wrap already-stacked arrays without copying them (e.g. views of a memory-mapped bundle).
+
+        Args:
+            weights: Dense (n_features, n_total_classes) weight matrix
+            bias: Stacked intercepts, shape (n_total_classes,)
+            offsets: Head column offsets, shape (n_heads + 1,)
+            kinds: Per-head link ('softmax' or 'ovr'); defaults to all softmax
+        """
+        scorer = cls.__new__(cls)
+        scorer.weights = weights
+        scorer.bias = bias
+        scorer.offsets = offsets
+        scorer.kinds = tuple(kinds) if kinds else ('softmax',) * (len(offsets) - 1)
+        scorer.n_features = weights.shape[0]
+        return scorer
+
+    @classmethod
+    def from_models(cls, models: List[Any]) -> Optional['LinearScorer']:
+        """
+        Build a scorer from fitted sklearn models.
+
+        Returns None if any model is neither softmax-linear nor one-vs-rest logistic,
+        or the models don't share a feature space; callers should then fall back to
+        ``model.predict_proba``.
+        """
+        kinds = [head_kind(m) for m in models]
+        if not models or None in kinds:
+            return None
+        if len({m.coef_.shape[1] for m in models}) != 1:
+            return None
+
+        coefs, intercepts = [], []
+        for model in models:
+            coef = np.asarray(model.coef_, dtype=np.float64)
+            intercept = np.asarray(model.intercept_, dtype=np.float64)
+            if coef.shape[0] == 1:
+                # Binary LR: sigmoid(z) == softmax([0, z])[1]
+                coef = np.vstack([np.zeros_like(coef), coef])
+                intercept = np.concatenate([[0.0], intercept])
+            coefs.append(coef)
+            intercepts.append(intercept)
+
+        return cls(coefs, intercepts, cast(List[str], kinds))
+
+    def decision_function(self, X) -> np.ndarray:
+        """
+        Compute stacked logits for every head.
+
+        Args:
+            X: Sparse CSR feature matrix, shape (n_samples, n_features)
+
+        Returns:
+            Dense logits, shape (n_samples, n_total_classes)
+        """
+        if X.shape[0] == 1 and scipy.sparse.issparse(X) and X.format == 'csr':
+            # Single row: gather only the weight rows for the non-zero features
+            return np.asarray(X.data @ self.weights[X.indices] + self.bias)[np.newaxis, :]
+        return np.asarray(X @ self.weights + self.bias)
+
+    def contributions(
+        self, X, row: int, head: int, class_index: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per-feature contributions of one CSR row to one class of a head.
+
+        Each non-zero feature contributes ``x_j * (w_j[class] - mean(w_j[head classes]))``,
+        i.e. how much it raises that class's logit relative to the head's other classes.
+        Work is proportional to the row's non-zeros.
+
+        Args:
+            X: Sparse CSR feature matrix the row was scored from
+            row: Row index in X
+            head: Head index (0 = category, 1 = priority)
+            class_index: Class index within the head
+
+        Returns:
+            (feature indices, contributions), both shape (nnz,)
+        """
+        start, end = X.indptr[row], X.indptr[row + 1]
+        indices = X.indices[start:end]
+        head_weights = self.weights[indices, self.offsets[head]:self.offsets[head + 1]]
+        centered = head_weights[:, class_index] - head_weights.mean(axis=1)
+        return indices, X.data[start:end] * centered
+
+    def predict_proba(self, X) -> List[np.ndarray]:
+        """
+        Compute per-head class probabilities with a segmented softmax (or normalized
+        sigmoids for one-vs-rest heads).
+
+        Args:
+            X: Sparse CSR feature matrix, shape (n_samples, n_features)
+
+        Returns:
+            One probability array per head, shape (n_samples, n_classes_of_head)
+        """
+        logits = self.decision_function(X)
+        probas = []
+        for kind, start, end in zip(self.kinds, self.offsets[:-1], self.offsets[1:]):
+            segment = logits[:, start:end]
+            if kind == 'ovr':
+                prob = expit(segment)
+                total = prob.sum(axis=1, keepdims=True)
+                # Same guard as sklearn: all-zero rows become uniform
+                prob[total[:, 0] == 0] = 1.0
+                probas.append(prob / prob.sum(axis=1, keepdims=True))
+                continue
+            exp = np.exp(segment - segment.max(axis=1, keepdims=True))
+            probas.append(exp / exp.sum(axis=1, keepdims=True))
+        return probas
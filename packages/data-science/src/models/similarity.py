@@ -0,0 +1,576 @@
+"""
+Near-duplicate ticket lookup over the serving vectorizer's features.
+
+Tickets are vectorized with the same normalizer and vectorizer as RequestPredictor,
+then pruned to their ``max_terms`` highest-weight features and re-normalized, so the
+dot product of two pruned rows is a cosine similarity over the terms that characterize
+each ticket. Identical tickets score 1.0.
+
+The pruned rows are kept twice: as CSR rows (for exact scoring) and as a CSC inverted
+index (the postings of each feature). A query reads the postings of its rarest terms
+first, up to ``scan_budget`` postings, so very common terms never turn a lookup into a
+full scan. It then scores the best ``n_candidates`` exactly. Work depends on the postings
+read, not on the number of tickets indexed.
+
+New tickets go to a small pending segment that is scanned directly. Once it reaches
+``max(MERGE_MIN_ROWS, MERGE_FRACTION * indexed rows)`` it is merged into the inverted
+index, so merge cost stays amortized as the index grows. Adding a ticket id again
+replaces its previous text.
+
+An index saved with ``save`` can be opened with an insert log (``inserts.jsonl`` in
+the index directory). ``add`` then appends tickets to the log, and every process
+serving the index replays new log lines before each lookup. This keeps pre-forked API
+workers consistent with each other and across restarts. The manifest records how much
+of the log a saved index already contains. A rebuild deletes the log; processes notice
+the new file and replay it from the start, and malformed lines are skipped.
+
+Usage (from packages/data-science):
+    python -m src.models.similarity --input ../data/raw/requests.csv \\
+        --output-dir ../models/similarity
+    python -m src.models.similarity --bench --sizes 100000,1000000
+
+    index = SimilarityIndex.load(Path('../models/similarity'), predictor.vectorizer)
+    index.add(['REQ-000124'], ['Cannot log in'], ['Password reset link expired'])
+    index.query('Login broken', 'My reset link does not work', k=5)
+    # -> [{'request_id': 'REQ-000124', 'score': 0.83}, ...]
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import scipy.sparse
+from sklearn.preprocessing import normalize
+
+from src.features.normalize import combine_fields, normalize_texts
+from src.features.vectorizers import fingerprint
+
+DEFAULT_MAX_TERMS = 16
+DEFAULT_SCAN_BUDGET = 50_000
+DEFAULT_CANDIDATES = 1_000
+MERGE_MIN_ROWS = 2_000
+MERGE_FRACTION = 0.05
+
+VECTORS_FILE = 'vectors.npz'
+IDS_FILE = 'ids.json'
+MANIFEST_FILE = 'manifest.json'
+INSERT_LOG_FILE = 'inserts.jsonl'
+
+
+def prune_rows(X, max_terms: int = DEFAULT_MAX_TERMS) -> scipy.sparse.csr_matrix:
+    """Keep each row's ``max_terms`` largest weights and L2-normalize what is left (float32)."""
+    X = scipy.sparse.csr_matrix(X)
+    n_rows = X.shape[0]
+    lengths = np.diff(X.indptr)
+    data, indices, indptr = X.data, X.indices, X.indptr
+    if n_rows and lengths.max() > max_terms:
+        row_of = np.repeat(np.arange(n_rows), lengths)
+        # Rank entries within their row by weight, then keep the top ones in column order
+        order = np.lexsort((-np.abs(data), row_of))
+        rank = np.arange(len(order)) - np.repeat(indptr[:-1], lengths)
+        keep = np.sort(order[rank < max_terms])
+        data, indices = data[keep], indices[keep]
+        indptr = np.concatenate([[0], np.cumsum(np.minimum(lengths, max_terms))])
+    pruned = scipy.sparse.csr_matrix(
+        (data.astype(np.float32), indices, indptr), shape=X.shape
+    )
+    return normalize(pruned, norm='l2', copy=False)
+
+
+def _n_features(vectorizer) -> int:
+    return int(vectorizer.transform(['']).shape[1])
+
+
+class SimilarityIndex:
+    """
+    Inverted index of pruned ticket vectors with incremental inserts.
+
+    Thread-safe: lookups and inserts share one lock; lookups are short (bounded
+    postings scan plus ``n_candidates`` exact scores).
+    """
+
+    def __init__(
+        self,
+        vectorizer,
+        max_terms: int = DEFAULT_MAX_TERMS,
+        scan_budget: int = DEFAULT_SCAN_BUDGET,
+        n_candidates: int = DEFAULT_CANDIDATES,
+        log_path: Optional[Path] = None
+    ):
+        """
+        Args:
+            vectorizer: Fitted vectorizer (TF-IDF, hashing or bundle) tickets are scored with
+            max_terms: Features kept per ticket
+            scan_budget: Postings read per lookup, rarest terms first
+            n_candidates: Candidates from the postings scan that are scored exactly
+            log_path: Insert log shared with other processes (None keeps inserts in memory)
+        """
+        self.vectorizer = vectorizer
+        self.max_terms = max_terms
+        self.scan_budget = scan_budget
+        self.n_candidates = n_candidates
+        self.n_features = _n_features(vectorizer)
+
+        self._lock = threading.Lock()
+        self._rows = scipy.sparse.csr_matrix((0, self.n_features), dtype=np.float32)
+        self._postings = self._rows.tocsc()
+        self._pending: List[scipy.sparse.csr_matrix] = []
+        self._pending_matrix = None
+        self._n_pending = 0
+        self._ids: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+
+        self._log_path = Path(log_path) if log_path is not None else None
+        self._log_offset = 0
+        # Inode of the log _log_offset points into; a rebuild replaces the file
+        self._log_inode: Optional[int] = None
+        self._sync_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def vectorize(
+        self, titles: Sequence[str], descriptions: Sequence[str]
+    ) -> scipy.sparse.csr_matrix:
+        """Normalize, vectorize and prune tickets exactly as they are indexed."""
+        texts = normalize_texts([combine_fields(t, d) for t, d in zip(titles, descriptions)])
+        return prune_rows(self.vectorizer.transform(texts), self.max_terms)
+
+    # -- inserts ---------------------------------------------------------------
+
+    def add(self, ids: Sequence[str], titles: Sequence[str], descriptions: Sequence[str]) -> None:
+        """
+        Index (or re-index) tickets.
+
+        With an insert log, the tickets are appended to it and picked up by ``sync``,
+        so every process sharing the log indexes them in the same order.
+        """
+        if self._log_path is None:
+            self.add_vectors(ids, self.vectorize(titles, descriptions))
+            return
+        lines = ''.join(
+            json.dumps({'request_id': str(i), 'title': t, 'description': d}) + '\n'
+            for i, t, d in zip(ids, titles, descriptions)
+        )
+        # One O_APPEND write: concurrent writers never interleave inside a batch
+        fd = os.open(self._log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, lines.encode('utf-8'))
+        finally:
+            os.close(fd)
+        self.sync()
+
+    def add_vectors(self, ids: Sequence[str], X: scipy.sparse.csr_matrix) -> None:
+        """Index already pruned rows (see ``vectorize``) under the given ticket ids."""
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+        with self._lock:
+            first = len(self._ids)
+            self._grow(first + len(ids))
+            for row, request_id in enumerate(ids, start=first):
+                request_id = str(request_id)
+                previous = self._row_of.get(request_id)
+                if previous is not None:
+                    self._alive[previous] = False
+                self._alive[row] = True
+                self._row_of[request_id] = row
+                self._ids.append(request_id)
+            self._pending.append(scipy.sparse.csr_matrix(X, dtype=np.float32))
+            self._pending_matrix = None
+            self._n_pending += len(ids)
+            if self._n_pending >= max(MERGE_MIN_ROWS, MERGE_FRACTION * self._rows.shape[0]):
+                self._merge()
+
+    def sync(self) -> int:
+        """Index tickets appended to the insert log since the last sync; returns how many."""
+        if self._log_path is None:
+            return 0
+        try:
+            stat = self._log_path.stat()
+        except FileNotFoundError:
+            return 0
+        if stat.st_ino == self._log_inode and stat.st_size == self._log_offset:
+            return 0
+        with self._sync_lock:
+            with open(self._log_path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                if not self._same_log(f, stat):
+                    # Rebuilt since we last read it (the CLI deletes the log): replay it all
+                    self._log_offset = 0
+                self._log_inode = stat.st_ino
+                f.seek(self._log_offset)
+                chunk = f.read(stat.st_size - self._log_offset)
+            # A writer may be mid-line: only consume complete lines
+            end = chunk.rfind(b'\n') + 1
+            if end == 0:
+                return 0
+            entries = []
+            for line in chunk[:end].splitlines():
+                try:
+                    entry = json.loads(line) if line else None
+                    if entry is not None:
+                        entries.append(
+                            (str(entry['request_id']), entry['title'], entry['description'])
+                        )
+                except (ValueError, KeyError, TypeError):
+                    print(f"⚠️  Skipping malformed line in {self._log_path}: {line[:80]!r}",
+                          file=sys.stderr)
+            if entries:
+                ids, titles, descriptions = zip(*entries)
+                self.add_vectors(ids, self.vectorize(titles, descriptions))
+            self._log_offset += end
+            return len(entries)
+
+    def _same_log(self, f, stat) -> bool:
+        """True if the open log is the file ``_log_offset`` was counted in."""
+        if self._log_offset == 0:
+            return True
+        if self._log_inode is not None and stat.st_ino != self._log_inode:
+            return False
+        if stat.st_size < self._log_offset:
+            return False
+        # Inode numbers get reused: the offset must also still follow a complete line
+        f.seek(self._log_offset - 1)
+        return bool(f.read(1) == b'\n')
+
+    def _reset(self, ids: Sequence[str], rows: scipy.sparse.csr_matrix) -> None:
+        """Replace the contents with pruned rows in one merge (a repeated id keeps its last row)."""
+        ids = [str(request_id) for request_id in ids]
+        row_of = {request_id: row for row, request_id in enumerate(ids)}
+        alive = np.zeros(len(ids), dtype=bool)
+        alive[list(row_of.values())] = True
+        with self._lock:
+            self._rows = scipy.sparse.csr_matrix(rows, dtype=np.float32)
+            self._postings = self._rows.tocsc()
+            self._pending, self._pending_matrix, self._n_pending = [], None, 0
+            self._ids, self._row_of, self._alive = ids, row_of, alive
+
+    def _grow(self, size: int) -> None:
+        if size > len(self._alive):
+            alive = np.zeros(max(size, 2 * len(self._alive)), dtype=bool)
+            alive[:len(self._alive)] = self._alive
+            self._alive = alive
+
+    def _merge(self) -> None:
+        """Fold the pending segment into the inverted index (caller holds the lock)."""
+        if not self._pending:
+            return
+        self._rows = scipy.sparse.vstack([self._rows] + self._pending, format='csr')
+        self._postings = self._rows.tocsc()
+        self._pending, self._pending_matrix, self._n_pending = [], None, 0
+
+    # -- lookups ---------------------------------------------------------------
+
+    def query(
+        self,
+        title: str,
+        description: str,
+        k: int = 5,
+        exclude: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Most similar indexed tickets to a title/description.
+
+        Args:
+            title: Ticket title
+            description: Ticket description
+            k: Tickets to return
+            exclude: Ticket ids to leave out (e.g. the ticket itself)
+
+        Returns:
+            Up to k ``{'request_id', 'score'}`` dicts, most similar first
+            (score is the cosine similarity of the pruned vectors)
+        """
+        self.sync()
+        return self.query_vector(self.vectorize([title], [description]), k, exclude)
+
+    def query_vector(
+        self,
+        x: scipy.sparse.csr_matrix,
+        k: int = 5,
+        exclude: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """``query`` for one already pruned row."""
+        terms, weights = x.indices, x.data
+        with self._lock:
+            rows, scores = self._search_postings(terms, weights)
+            if self._n_pending:
+                if self._pending_matrix is None:
+                    self._pending_matrix = scipy.sparse.vstack(self._pending, format='csr')
+                pending_scores = (self._pending_matrix @ x.T).toarray().ravel()
+                hit = np.flatnonzero(pending_scores > 0)
+                rows = np.concatenate([rows, self._rows.shape[0] + hit])
+                scores = np.concatenate([scores, pending_scores[hit]])
+
+            keep = self._alive[rows] & (scores > 0)
+            for request_id in exclude or ():
+                row = self._row_of.get(str(request_id))
+                if row is not None:
+                    keep &= rows != row
+            rows, scores = rows[keep], scores[keep]
+            if len(rows) > k:
+                top = np.argpartition(-scores, k)[:k]
+                rows, scores = rows[top], scores[top]
+            order = np.argsort(-scores, kind='stable')
+            return [
+                {'request_id': self._ids[row], 'score': round(float(score), 6)}
+                for row, score in zip(rows[order].tolist(), scores[order].tolist())
+            ]
+
+    def _search_postings(self, terms: np.ndarray, weights: np.ndarray):
+        """Candidate rows of the merged segment and their exact scores (caller holds the lock)."""
+        if not len(terms) or not self._rows.shape[0]:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        indptr = self._postings.indptr
+        lengths = indptr[terms + 1] - indptr[terms]
+        # Rarest terms first, until the budget is spent (always at least one term)
+        by_rarity = np.argsort(lengths, kind='stable')
+        n_terms = max(
+            1, int(np.searchsorted(np.cumsum(lengths[by_rarity]), self.scan_budget, side='right'))
+        )
+        postings_rows, postings_scores = [], []
+        for i in by_rarity[:n_terms]:
+            start, end = indptr[terms[i]], indptr[terms[i] + 1]
+            postings_rows.append(self._postings.indices[start:end])
+            postings_scores.append(self._postings.data[start:end] * weights[i])
+        candidates, inverse = np.unique(np.concatenate(postings_rows), return_inverse=True)
+        if len(candidates) > self.n_candidates:
+            partial = np.bincount(inverse, weights=np.concatenate(postings_scores))
+            candidates = candidates[
+                np.argpartition(-partial, self.n_candidates)[:self.n_candidates]
+            ]
+        # Exact score over all of the query's terms, not just the scanned ones
+        query = scipy.sparse.csr_matrix(
+            (weights, terms, [0, len(terms)]), shape=(1, self.n_features)
+        )
+        return candidates, (self._rows[candidates] @ query.T).toarray().ravel()
+
+    # -- persistence -----------------------------------------------------------
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the vector and postings arrays (ids not included)."""
+        total = 0
+        for matrix in [self._rows, self._postings] + self._pending:
+            total += matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+        return total + self._alive.nbytes
+
+    def save(self, directory: Path) -> Path:
+        """Write vectors, ids and manifest; returns the directory."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._merge()
+            alive = np.flatnonzero(self._alive[:len(self._ids)])
+            rows = self._rows[alive]
+            ids = [self._ids[row] for row in alive.tolist()]
+        scipy.sparse.save_npz(directory / VECTORS_FILE, rows, compressed=False)
+        with open(directory / IDS_FILE, 'w') as f:
+            json.dump(ids, f)
+        manifest = {
+            'count': len(ids),
+            'n_features': self.n_features,
+            'vectorizer_fingerprint': fingerprint(self.vectorizer),
+            'max_terms': self.max_terms,
+            # Log lines already folded into these vectors (only meaningful for this directory's log)
+            'log_offset': self._log_offset if self._log_path == directory / INSERT_LOG_FILE else 0,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        }
+        with open(directory / MANIFEST_FILE, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        return directory
+
+    @classmethod
+    def load(cls, directory: Path, vectorizer, **kwargs) -> 'SimilarityIndex':
+        """
+        Open a saved index and replay its insert log.
+
+        Raises:
+            ValueError: If the index was built with a different vectorizer
+        """
+        directory = Path(directory)
+        with open(directory / MANIFEST_FILE) as f:
+            manifest = json.load(f)
+        index = cls(
+            vectorizer, max_terms=manifest['max_terms'],
+            log_path=directory / INSERT_LOG_FILE, **kwargs
+        )
+        if index.n_features != manifest['n_features']:
+            raise ValueError(
+                f"Similarity index has {manifest['n_features']} features but the vectorizer has "
+                f"{index.n_features}; rebuild it with the current model"
+            )
+        # Same width is not enough: a refitted vocabulary maps terms to other columns
+        expected = manifest.get('vectorizer_fingerprint')
+        if expected is not None and expected != fingerprint(vectorizer):
+            raise ValueError(
+                "Similarity index was built with a different vectorizer; "
+                "rebuild it with the current model"
+            )
+        with open(directory / IDS_FILE) as f:
+            ids = json.load(f)
+        index._reset(ids, scipy.sparse.load_npz(directory / VECTORS_FILE).tocsr())
+        index._log_offset = manifest.get('log_offset', 0)
+        index.sync()
+        return index
+
+
+def build_index(
+    input_path: Path,
+    vectorizer,
+    chunk_size: int = 50_000,
+    max_terms: int = DEFAULT_MAX_TERMS
+) -> SimilarityIndex:
+    """Index every ticket of a CSV/JSONL export (id, title, description), chunk by chunk."""
+    from src.models.score_bulk import iter_chunks
+
+    index = SimilarityIndex(vectorizer, max_terms=max_terms)
+    ids, chunks = [], []
+    for chunk in iter_chunks(Path(input_path), chunk_size):
+        ids.extend(chunk['id'].astype(str).tolist())
+        chunks.append(index.vectorize(chunk['title'].tolist(), chunk['description'].tolist()))
+    if chunks:
+        # One merge for the whole export instead of one per pending segment
+        index._reset(ids, scipy.sparse.vstack(chunks, format='csr'))
+    return index
+
+
+def _bench_size(df, vectorizer, n_queries: int, k: int, seed: int) -> Dict[str, Any]:
+    """Build, memory, lookup latency and recall against a brute-force scan for one corpus."""
+    import tracemalloc
+
+    rng = np.random.default_rng(seed)
+    ids = df['id'].astype(str).tolist()
+    index = SimilarityIndex(vectorizer)
+
+    start = time.perf_counter()
+    X = index.vectorize(df['title'].tolist(), df['description'].tolist())
+    vectorize_seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    index._reset(ids, X)
+    build_seconds = time.perf_counter() - start
+    traced = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    sample = rng.choice(len(df), size=n_queries, replace=False)
+    queries = index.vectorize(
+        df['title'].iloc[sample].tolist(), df['description'].iloc[sample].tolist()
+    )
+    latencies, brute_latencies, recalls = [], [], []
+    for row in range(n_queries):
+        x = queries[row]
+        start = time.perf_counter()
+        found = index.query_vector(x, k)
+        latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        exact = (X @ x.T).toarray().ravel()
+        best = np.argpartition(-exact, k)[:k]
+        brute_latencies.append(time.perf_counter() - start)
+        # Ties at the k-th score make several top-k sets equally correct
+        cutoff = exact[best].min()
+        recalls.append(
+            np.mean([exact[index._row_of[hit['request_id']]] >= cutoff - 1e-6 for hit in found])
+        )
+
+    insert_ids = [f'new-{i}' for i in range(1000)]
+    start = time.perf_counter()
+    for i, request_id in enumerate(insert_ids):
+        index.add_vectors([request_id], queries[i % n_queries])
+    insert_seconds = time.perf_counter() - start
+
+    def percentile(values, q):
+        return float(np.percentile(values, q) * 1000)
+
+    return {
+        'tickets': len(df),
+        'vectorize_seconds': vectorize_seconds,
+        'build_seconds': build_seconds,
+        'index_bytes': index.memory_bytes(),
+        'build_traced_bytes': traced,
+        'query_ms_p50': percentile(latencies, 50),
+        'query_ms_p99': percentile(latencies, 99),
+        'brute_force_ms_p50': percentile(brute_latencies, 50),
+        f'recall_at_{k}': float(np.mean(recalls)),
+        'insert_us_mean': insert_seconds / len(insert_ids) * 1e6
+    }
+
+
+def run_benchmark(
+    sizes: List[int], n_queries: int = 200, k: int = 10, seed: int = 42
+) -> Dict[str, Any]:
+    """Benchmark the index on synthetic corpora (TF-IDF fitted on the smallest one)."""
+    import pandas as pd
+
+    from src.data.synthetic import generate_requests
+    from src.features.vectorizers import build_vectorizer
+
+    report = {}
+    vectorizer = None
+    for size in sorted(sizes):
+        df = pd.concat(list(generate_requests(size, seed=seed)), ignore_index=True)
+        if vectorizer is None:
+            texts = normalize_texts(
+                [combine_fields(t, d) for t, d in zip(df['title'], df['description'])]
+            )
+            vectorizer = build_vectorizer('tfidf').fit(texts)
+        report[str(size)] = _bench_size(df, vectorizer, n_queries, k, seed)
+        print(json.dumps(report[str(size)]), flush=True)
+    return report
+
+
+def main(argv=None) -> Dict[str, Any]:
+    import argparse
+
+    from src.features.vectorizers import load_vectorizer
+
+    parser = argparse.ArgumentParser(
+        description="Build or benchmark the near-duplicate ticket index"
+    )
+    parser.add_argument(
+        '--input', type=Path, help='CSV or JSONL export with id, title, description'
+    )
+    parser.add_argument('--output-dir', type=Path, default=Path('../models/similarity'),
+                        help='Index directory')
+    parser.add_argument('--data-dir', type=Path, default=Path('../data/processed'),
+                        help='Preprocessing artifacts (the vectorizer to index with)')
+    parser.add_argument(
+        '--max-terms', type=int, default=DEFAULT_MAX_TERMS, help='Features kept per ticket'
+    )
+    parser.add_argument(
+        '--bench', action='store_true', help='Benchmark on synthetic corpora instead'
+    )
+    parser.add_argument(
+        '--sizes', type=str, default='100000,1000000', help='Benchmark corpus sizes'
+    )
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        return run_benchmark([int(s) for s in args.sizes.split(',')])
+    if args.input is None:
+        parser.error('--input is required unless --bench is given')
+
+    start = time.perf_counter()
+    index = build_index(args.input, load_vectorizer(args.data_dir), max_terms=args.max_terms)
+    # A full rebuild already contains everything the old insert log held
+    (args.output_dir / INSERT_LOG_FILE).unlink(missing_ok=True)
+    index.save(args.output_dir)
+    summary = {
+        'tickets': len(index),
+        'seconds': time.perf_counter() - start,
+        'index_bytes': index.memory_bytes(),
+        'output_dir': str(args.output_dir)
+    }
+    print(json.dumps(summary, indent=2))
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Cross-validated hyperparameter sweep over vectorizer and classifier settings.
+
+Replaces hand-tuning the TF-IDF TODOs in notebooks/02-feature-engineering.ipynb.
+Every (vectorizer config, fold) pair is one task in a process pool. A task fits the
+vectorizer on the fold's training texts once, then trains and scores every
+classifier config for both heads on that same matrix, so a vectorizer config is
+never refit per classifier config.
+
+Fitted fold matrices are also cached on disk, keyed on the data fingerprint, the
+vectorizer config and the fold. Re-running with a different classifier grid (or
+more classifier configs) skips vectorization entirely.
+
+Usage (from packages/data-science):
+    python -m src.models.sweep --output sweep_results.json
+    python -m src.models.sweep --data ../data/raw/synthetic_requests.csv --grid grid.json \\
+        --workers 8
+
+A grid file has the shape of DEFAULT_GRID:
+    {"vectorizer": {"max_features": [1000, 5000], "ngram_range": [[1, 1], [1, 2]]},
+     "classifier": {"C": [0.1, 1.0, 10.0]}}
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import StratifiedKFold
+
+from src.features.vectorizers import build_vectorizer
+
+DEFAULT_GRID: Dict[str, Dict[str, List[Any]]] = {
+    'vectorizer': {
+        'max_features': [1000, 5000],
+        'ngram_range': [[1, 1], [1, 2]],
+        'min_df': [1, 2],
+        'max_df': [0.8]
+    },
+    'classifier': {
+        'C': [0.1, 1.0, 10.0],
+        'class_weight': ['balanced']
+    }
+}
+
+HEADS = ('category', 'priority')
+
+# Set once per worker process by _init_worker, so texts aren't pickled per task
+_WORKER: Dict[str, Any] = {}
+
+
+def expand_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Cartesian product of a {param: [values]} dict as a list of configs."""
+    names = sorted(grid)
+    return [
+        dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))
+    ]
+
+
+def _config_key(*parts: Any) -> str:
+    return hashlib.blake2b(
+        json.dumps(parts, sort_keys=True).encode('utf-8'), digest_size=8
+    ).hexdigest()
+
+
+def _init_worker(
+    texts: List[str], labels: Dict[str, np.ndarray], cache_dir: Optional[str], data_key: str
+) -> None:
+    _WORKER.update(texts=texts, labels=labels, cache_dir=cache_dir, data_key=data_key)
+
+
+def _fold_matrices(
+    vectorizer_config: Dict[str, Any],
+    fold: int,
+    train_idx: np.ndarray,
+    test_idx: np.ndarray
+) -> Tuple[scipy.sparse.csr_matrix, scipy.sparse.csr_matrix, bool]:
+    """Fit the vectorizer on the fold's training texts (or load it from the cache)."""
+    cache_dir = _WORKER['cache_dir']
+    if cache_dir:
+        stem = Path(cache_dir) / f"{_config_key(_WORKER['data_key'], vectorizer_config, fold)}"
+        train_path, test_path = stem.with_suffix('.train.npz'), stem.with_suffix('.test.npz')
+        if train_path.exists() and test_path.exists():
+            return scipy.sparse.load_npz(train_path), scipy.sparse.load_npz(test_path), True
+
+    texts = _WORKER['texts']
+    params = dict(vectorizer_config)
+    if 'ngram_range' in params:
+        params['ngram_range'] = tuple(params['ngram_range'])
+    vectorizer = build_vectorizer(params.pop('mode', 'tfidf'), **params)
+    X_train = vectorizer.fit_transform([texts[i] for i in train_idx])
+    X_test = vectorizer.transform([texts[i] for i in test_idx])
+
+    if cache_dir:
+        for path, X in ((train_path, X_train), (test_path, X_test)):
+            tmp_path = path.with_name(f".{path.name}.tmp.npz")
+            scipy.sparse.save_npz(tmp_path, X)
+            os.replace(tmp_path, path)
+    return X_train, X_test, False
+
+
+def _run_task(
+    vectorizer_config: Dict[str, Any],
+    fold: int,
+    train_idx: np.ndarray,
+    test_idx: np.ndarray,
+    classifier_configs: List[Dict[str, Any]],
+    random_state: int
+) -> Dict[str, Any]:
+    """Score every classifier config for both heads on one vectorizer config and fold."""
+    start = time.perf_counter()
+    X_train, X_test, cache_hit = _fold_matrices(vectorizer_config, fold, train_idx, test_idx)
+    vectorize_seconds = time.perf_counter() - start
+
+    scores = []
+    for classifier_config in classifier_configs:
+        for head in HEADS:
+            y = _WORKER['labels'][head]
+            model = LogisticRegression(
+                max_iter=1000, random_state=random_state, **classifier_config
+            )
+            model.fit(X_train, y[train_idx])
+            y_pred = model.predict(X_test)
+            scores.append({
+                'classifier': classifier_config,
+                'head': head,
+                'accuracy': float(accuracy_score(y[test_idx], y_pred)),
+                'f1_macro': float(f1_score(y[test_idx], y_pred, average='macro'))
+            })
+
+    return {
+        'vectorizer': vectorizer_config,
+        'fold': fold,
+        'cache_hit': cache_hit,
+        'vectorize_seconds': vectorize_seconds,
+        'scores': scores
+    }
+
+
+def run_sweep(
+    texts: List[str],
+    labels: Dict[str, np.ndarray],
+    grid: Dict[str, Dict[str, List[Any]]] = DEFAULT_GRID,
+    n_splits: int = 5,
+    workers: Optional[int] = None,
+    cache_dir: Optional[Path] = None,
+    random_state: int = 42
+) -> Dict[str, Any]:
+    """
+    Evaluate every vectorizer x classifier config with stratified K-fold CV.
+
+    Args:
+        texts: Normalized request texts (see src/features/normalize.py)
+        labels: Encoded labels per head, {'category': ..., 'priority': ...}
+        grid: {'vectorizer': {param: [values]}, 'classifier': {param: [values]}}
+        n_splits: CV folds, stratified on category
+        workers: Worker processes (defaults to the CPU count)
+        cache_dir: Where to cache fitted fold matrices (None disables the cache)
+        random_state: Seed for the folds and the classifiers
+
+    Returns:
+        Per-config mean/std scores for each head, the best config per head
+        (by mean macro F1) and timing/cache statistics
+    """
+    vectorizer_configs = expand_grid(grid['vectorizer'])
+    classifier_configs = expand_grid(grid['classifier'])
+    folds = list(StratifiedKFold(n_splits, shuffle=True, random_state=random_state)
+                 .split(np.zeros(len(texts)), labels['category']))
+
+    # Fold membership depends on the category labels too (stratification)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update('\x00'.join(texts).encode('utf-8'))
+    digest.update(np.asarray(labels['category']).tobytes())
+    data_key = _config_key(n_splits, random_state, digest.hexdigest())
+    if cache_dir is not None:
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(texts, labels, str(cache_dir) if cache_dir else None, data_key)
+    ) as pool:
+        futures = [
+            pool.submit(_run_task, vectorizer_config, fold, train_idx, test_idx,
+                        classifier_configs, random_state)
+            for vectorizer_config in vectorizer_configs
+            for fold, (train_idx, test_idx) in enumerate(folds)
+        ]
+        tasks = [future.result() for future in futures]
+    wall_seconds = time.perf_counter() - start
+
+    # Aggregate fold scores per (vectorizer, classifier, head)
+    grouped: Dict[str, Dict[str, Any]] = {}
+    for task in tasks:
+        for score in task['scores']:
+            key = _config_key(task['vectorizer'], score['classifier'], score['head'])
+            entry = grouped.setdefault(key, {
+                'vectorizer': task['vectorizer'],
+                'classifier': score['classifier'],
+                'head': score['head'],
+                'accuracy': [],
+                'f1_macro': []
+            })
+            entry['accuracy'].append(score['accuracy'])
+            entry['f1_macro'].append(score['f1_macro'])
+
+    results = []
+    for entry in grouped.values():
+        results.append({
+            'vectorizer': entry['vectorizer'],
+            'classifier': entry['classifier'],
+            'head': entry['head'],
+            'accuracy_mean': float(np.mean(entry['accuracy'])),
+            'accuracy_std': float(np.std(entry['accuracy'])),
+            'f1_macro_mean': float(np.mean(entry['f1_macro'])),
+            'f1_macro_std': float(np.std(entry['f1_macro']))
+        })
+    results.sort(key=lambda row: (row['head'], -row['f1_macro_mean']))
+
+    return {
+        'n_samples': len(texts),
+        'n_splits': n_splits,
+        'n_vectorizer_configs': len(vectorizer_configs),
+        'n_classifier_configs': len(classifier_configs),
+        'wall_seconds': wall_seconds,
+        'vectorizer_fits': sum(not task['cache_hit'] for task in tasks),
+        'vectorizer_cache_hits': sum(task['cache_hit'] for task in tasks),
+        'vectorize_seconds': sum(task['vectorize_seconds'] for task in tasks),
+        'best': {head: next(row for row in results if row['head'] == head) for head in HEADS},
+        'results': results
+    }
+
+
+def main(argv=None) -> Dict[str, Any]:
+    from sklearn.preprocessing import LabelEncoder
+
+    from src.data.frame_cache import default_cache_dir, load_cached
+    from src.data.load_data import get_training_data
+    from src.features.normalize import normalize_texts
+
+    parser = argparse.ArgumentParser(description="Cross-validated vectorizer/classifier sweep")
+    parser.add_argument(
+        '--data', type=Path, help='CSV/JSON of requests (defaults to the mock data)'
+    )
+    parser.add_argument('--grid', type=Path, help='JSON grid file (defaults to DEFAULT_GRID)')
+    parser.add_argument('--folds', type=int, default=5, help='Cross-validation folds')
+    parser.add_argument(
+        '--workers', type=int, default=None, help='Worker processes (default: CPU count)'
+    )
+    parser.add_argument('--cache-dir', type=Path, default=default_cache_dir() / 'sweep',
+                        help='Fold matrix cache directory (default: <DATA_CACHE_DIR>/sweep)')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the fold matrix cache')
+    parser.add_argument(
+        '--output', type=Path, default=Path('sweep_results.json'), help='Results JSON'
+    )
+    parser.add_argument('--random-state', type=int, default=42, help='Random seed')
+    args = parser.parse_args(argv)
+
+    columns = ['title', 'description', 'category', 'priority']
+    df = (
+        load_cached(args.data, columns=columns) if args.data else get_training_data(columns=columns)
+    )
+    texts = normalize_texts(df['title'].fillna('') + ' ' + df['description'].fillna(''))
+    labels = {head: LabelEncoder().fit_transform(df[head].astype(str)) for head in HEADS}
+
+    grid = DEFAULT_GRID
+    if args.grid:
+        with open(args.grid) as f:
+            grid = json.load(f)
+
+    report = run_sweep(
+        texts, labels, grid, n_splits=args.folds, workers=args.workers,
+        cache_dir=None if args.no_cache else args.cache_dir, random_state=args.random_state
+    )
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(
+        f"Evaluated {report['n_vectorizer_configs']} vectorizer x {report['n_classifier_configs']} "
+        f"classifier configs over {report['n_splits']} folds in {report['wall_seconds']:.1f}s "
+        f"({report['vectorizer_fits']} vectorizer fits, "
+        f"{report['vectorizer_cache_hits']} cache hits)"
+    )
+    for head, best in report['best'].items():
+        print(f"Best {head}: f1_macro {best['f1_macro_mean']:.3f} ± {best['f1_macro_std']:.3f} "
+              f"vectorizer={best['vectorizer']} classifier={best['classifier']}")
+    print(f"Results written to {args.output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,476 @@
+"""
+Out-of-core incremental training.
+
+Streams request data in chunks (CSV, Parquet or the backend API), featurizes each chunk
+with the stateless hashing vectorizer (src/features/vectorizers.py) and updates two
+SGDClassifier(loss='log_loss') heads with ``partial_fit``. Memory is bounded by the
+chunk size and ``n_features`` instead of the corpus size.
+
+The IDF is fitted on the first chunk and then frozen, so every ``partial_fit`` update sees
+the feature scaling the saved vectorizer serves; refitting it per chunk would rescale the
+inputs under weights learned earlier.
+
+With ``--resume`` the previous models, IDF and high-water mark (the latest ``updated_at``
+trained on) are loaded from the output directories, and only tickets updated since then
+are consumed (the API source only fetches those). Tickets without ``updated_at`` are
+trained on in the first run only.
+
+Accuracy is measured by progressive validation: each chunk is scored by the current
+model before the model learns from it, so no holdout split is needed.
+
+The artifacts have the same layout as train_model.py (``features.json`` records the
+hashing mode), so RequestPredictor, the model bundle and hot reload work unchanged.
+
+Usage:
+    python -m src.models.train_incremental --source csv --path ../data/raw/requests.csv \\
+        --data-dir ../data/processed --output-dir ../models
+
+    # Nightly retrain: continue from the previous model with only new or edited tickets
+    python -m src.models.train_incremental --source csv --path ../data/raw/requests.csv --resume
+
+    # Peak memory and wall time against the batch trainer on a synthetic corpus
+    python -m src.models.train_incremental --compare 200000
+"""
+
+import argparse
+import json
+import os
+import pickle
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import LabelEncoder
+
+from src.features.normalize import normalize_texts
+from src.features.vectorizers import (
+    HASHING_DEFAULTS, HashingFeaturizer, load_vectorizer, save_vectorizer
+)
+
+# Label sets from contracts/schemas/request.schema.json, sorted like LabelEncoder.classes_.
+# partial_fit needs every class up front, before any chunk has been seen.
+CATEGORY_CLASSES = ['account', 'billing', 'general', 'technical']
+PRIORITY_CLASSES = ['P0', 'P1', 'P2', 'P3']
+
+COLUMNS = ['title', 'description', 'category', 'priority', 'updated_at']
+
+
+def _write_replacing(path: Path, write: Callable[[IO], Any], mode: str = 'wb') -> None:
+    """Write next to path and rename over it, so a running server never reads a partial file."""
+    tmp_path = path.with_name(f'.{path.name}.tmp')
+    with open(tmp_path, mode) as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def iter_chunks(
+    source: str,
+    path: Optional[Path] = None,
+    chunk_size: int = 50_000,
+    updated_since: Optional[str] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield request DataFrames of at most ``chunk_size`` rows.
+
+    Args:
+        source: 'csv', 'parquet' or 'api'
+        path: File path for csv/parquet
+        chunk_size: Rows per chunk
+        updated_since: ISO high-water mark; the API source only fetches tickets updated
+            since then (files are read whole and filtered by IncrementalTrainer)
+    """
+    if source == 'csv':
+        yield from pd.read_csv(path, chunksize=chunk_size, usecols=lambda column: column in COLUMNS)
+    elif source == 'parquet':
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        columns = [column for column in COLUMNS if column in parquet_file.schema_arrow.names]
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    elif source == 'api':
+        from src.data.load_data import iter_api_pages
+
+        # Page by page, so only about one chunk of tickets is held at a time
+        records = []
+        for page in iter_api_pages(updated_since=updated_since):
+            records.extend(page)
+            while len(records) >= chunk_size:
+                yield pd.DataFrame(records[:chunk_size])
+                records = records[chunk_size:]
+        if records:
+            yield pd.DataFrame(records)
+    else:
+        raise ValueError(f"Unsupported source: {source}")
+
+
+class IncrementalTrainer:
+    """
+    Updates the category and priority heads one chunk at a time.
+
+    Usage:
+        trainer = IncrementalTrainer.resume(data_dir, models_dir)  # or IncrementalTrainer()
+        for chunk in iter_chunks('csv', path):
+            trainer.partial_fit(chunk)
+        trainer.save(data_dir, models_dir)
+    """
+
+    def __init__(
+        self,
+        featurizer: Optional[HashingFeaturizer] = None,
+        category_model: Optional[SGDClassifier] = None,
+        priority_model: Optional[SGDClassifier] = None,
+        high_water_mark: Optional[str] = None,
+        n_total_samples: int = 0,
+        alpha: float = 1e-5,
+        random_state: int = 42
+    ):
+        """
+        Args:
+            featurizer: Hashing vectorizer (a fresh one with default settings if None)
+            category_model: Category head to continue training
+            priority_model: Priority head to continue training
+            high_water_mark: Skip rows with ``updated_at`` at or before this ISO timestamp
+            n_total_samples: Samples the models were trained on in earlier runs
+            alpha: L2 regularization strength for new heads
+            random_state: Seed for new heads and in-chunk shuffling
+        """
+        self.featurizer = featurizer or HashingFeaturizer(**HASHING_DEFAULTS)
+        self.category_model = category_model or self._new_head(alpha, random_state)
+        self.priority_model = priority_model or self._new_head(alpha, random_state)
+        self.category_encoder = self._encoder(CATEGORY_CLASSES)
+        self.priority_encoder = self._encoder(PRIORITY_CLASSES)
+        self.high_water_mark = pd.Timestamp(high_water_mark) if high_water_mark else None
+        self.n_total_samples = n_total_samples
+        self._rng = np.random.default_rng(random_state)
+
+        # Progressive validation counters for this run
+        self.n_samples = 0
+        self.n_skipped = 0
+        self.n_chunks = 0
+        self._evaluated = 0
+        self._correct = {'category': 0, 'priority': 0}
+        self._confidence = {'category': 0.0, 'priority': 0.0}
+        self._latest: Optional[pd.Timestamp] = self.high_water_mark
+
+    @staticmethod
+    def _new_head(alpha: float, random_state: int) -> SGDClassifier:
+        return SGDClassifier(loss='log_loss', alpha=alpha, random_state=random_state)
+
+    @staticmethod
+    def _encoder(classes) -> LabelEncoder:
+        encoder = LabelEncoder()
+        encoder.classes_ = np.array(classes)
+        return encoder
+
+    @classmethod
+    def resume(cls, data_dir: Path, models_dir: Path, **kwargs) -> 'IncrementalTrainer':
+        """
+        Continue from the artifacts a previous incremental run wrote.
+
+        Raises:
+            ValueError: If the artifacts were not produced in hashing mode
+        """
+        featurizer = load_vectorizer(data_dir)
+        if not isinstance(featurizer, HashingFeaturizer):
+            raise ValueError(
+                "Can only resume from hashing-mode features (see src/features/vectorizers.py)"
+            )
+        with open(models_dir / 'category_model.pkl', 'rb') as f:
+            category_model = pickle.load(f)
+        with open(models_dir / 'priority_model.pkl', 'rb') as f:
+            priority_model = pickle.load(f)
+        with open(models_dir / 'metadata.json') as f:
+            training_info = json.load(f).get('training_info', {})
+        return cls(
+            featurizer, category_model, priority_model,
+            high_water_mark=training_info.get('high_water_mark'),
+            n_total_samples=training_info.get('n_total_samples', 0),
+            **kwargs
+        )
+
+    def _select(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        Drop rows already trained on (by high-water mark) or with unknown labels.
+
+        Rows without ``updated_at`` are only trained on in the first run: after that
+        there is no telling whether they are new.
+        """
+        keep = chunk['category'].isin(CATEGORY_CLASSES) & chunk['priority'].isin(PRIORITY_CLASSES)
+        if 'updated_at' in chunk.columns:
+            updated = pd.to_datetime(chunk['updated_at'], errors='coerce', utc=True)
+            if self.high_water_mark is not None:
+                keep &= updated > self.high_water_mark
+            latest = updated[keep].max()
+            if pd.notna(latest) and (self._latest is None or latest > self._latest):
+                self._latest = latest
+        elif self.high_water_mark is not None:
+            keep &= False
+        self.n_skipped += int((~keep).sum())
+        return chunk[keep]
+
+    def partial_fit(self, chunk: pd.DataFrame) -> int:
+        """
+        Evaluate on, then learn from, one chunk.
+
+        Returns:
+            Number of rows trained on after filtering
+        """
+        chunk = self._select(chunk)
+        if chunk.empty:
+            return 0
+
+        # Shuffle within the chunk: exports are often ordered by time or category
+        chunk = chunk.iloc[self._rng.permutation(len(chunk))]
+        texts = normalize_texts(chunk['title'].fillna('') + ' ' + chunk['description'].fillna(''))
+        y_category = self.category_encoder.transform(chunk['category'])
+        y_priority = self.priority_encoder.transform(chunk['priority'])
+
+        # Fit the IDF once (first chunk of the first run); a resumed run keeps the loaded one
+        if self.featurizer.idf_ is None:
+            self.featurizer.partial_fit(texts)
+        X = self.featurizer.transform(texts)
+
+        evaluate = hasattr(self.category_model, 'coef_')
+        for head, model, y, classes in [
+            ('category', self.category_model, y_category, CATEGORY_CLASSES),
+            ('priority', self.priority_model, y_priority, PRIORITY_CLASSES)
+        ]:
+            if evaluate:
+                proba = model.predict_proba(X)
+                self._correct[head] += int((proba.argmax(axis=1) == y).sum())
+                self._confidence[head] += float(proba.max(axis=1).sum())
+            model.partial_fit(X, y, classes=np.arange(len(classes)))
+
+        if evaluate:
+            self._evaluated += len(chunk)
+        self.n_samples += len(chunk)
+        self.n_chunks += 1
+        return len(chunk)
+
+    def metrics(self, head: str) -> Dict[str, Optional[float]]:
+        """Progressive accuracy and mean confidence for this run (None before a second chunk)."""
+        if not self._evaluated:
+            return {'accuracy': None, 'mean_confidence': None}
+        return {
+            'accuracy': self._correct[head] / self._evaluated,
+            'mean_confidence': self._confidence[head] / self._evaluated
+        }
+
+    def save(
+        self,
+        data_dir: Path,
+        models_dir: Path,
+        model_version: Optional[str] = None,
+        export_bundle: bool = False
+    ) -> Dict[str, Any]:
+        """Write features, encoders, models and (last) metadata.json; returns the metadata."""
+        model_version = model_version or os.getenv('MODEL_VERSION') or '1.0.0'
+        data_dir.mkdir(parents=True, exist_ok=True)
+        models_dir.mkdir(parents=True, exist_ok=True)
+
+        features = save_vectorizer(self.featurizer, data_dir)
+        _write_replacing(
+            data_dir / 'category_encoder.pkl', lambda f: pickle.dump(self.category_encoder, f)
+        )
+        _write_replacing(
+            data_dir / 'priority_encoder.pkl', lambda f: pickle.dump(self.priority_encoder, f)
+        )
+        _write_replacing(
+            models_dir / 'category_model.pkl', lambda f: pickle.dump(self.category_model, f)
+        )
+        _write_replacing(
+            models_dir / 'priority_model.pkl', lambda f: pickle.dump(self.priority_model, f)
+        )
+
+        trained_at = datetime.now().isoformat()
+        from src.models.bundle import BUNDLE_DIRNAME, export_bundle as write_bundle, remove_bundle
+
+        if export_bundle:
+            write_bundle(
+                models_dir / BUNDLE_DIRNAME, self.featurizer, self.category_model,
+                self.priority_model, self.category_encoder, self.priority_encoder,
+                model_version, trained_at
+            )
+        else:
+            # The predictor prefers a bundle; don't leave the previous run's one to be served
+            remove_bundle(models_dir)
+
+        metadata = {
+            'model_version': model_version,
+            'features': features,
+            'category_model': {
+                'type': 'SGDClassifier',
+                **self.metrics('category'),
+                'classes': CATEGORY_CLASSES
+            },
+            'priority_model': {
+                'type': 'SGDClassifier',
+                **self.metrics('priority'),
+                'classes': PRIORITY_CLASSES
+            },
+            'training_info': {
+                'mode': 'incremental',
+                'evaluation': 'progressive',
+                'n_train_samples': self.n_samples,
+                'n_total_samples': self.n_total_samples + self.n_samples,
+                'n_skipped_rows': self.n_skipped,
+                'n_chunks': self.n_chunks,
+                'high_water_mark': self._latest.isoformat() if self._latest is not None else None,
+                'trained_at': trained_at
+            }
+        }
+        # Written last: the serving watcher reloads when metadata.json changes
+        _write_replacing(
+            models_dir / 'metadata.json', lambda f: json.dump(metadata, f, indent=2), mode='w'
+        )
+        return metadata
+
+
+def main(
+    source: str,
+    path: Optional[Path],
+    data_dir: Path,
+    output_dir: Path,
+    chunk_size: int = 50_000,
+    resume: bool = False,
+    n_features: int = HASHING_DEFAULTS['n_features'],
+    export_bundle: bool = False,
+    model_version: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """Incremental training pipeline; returns the written metadata, or None if nothing was new."""
+    if resume and (output_dir / 'metadata.json').exists():
+        trainer = IncrementalTrainer.resume(data_dir, output_dir)
+        print(f"Resuming from {output_dir} (high-water mark {trainer.high_water_mark})")
+    else:
+        trainer = IncrementalTrainer(
+            HashingFeaturizer(**{**HASHING_DEFAULTS, 'n_features': n_features})
+        )
+
+    since = trainer.high_water_mark.isoformat() if trainer.high_water_mark is not None else None
+    for i, chunk in enumerate(iter_chunks(source, path, chunk_size, since), start=1):
+        trained = trainer.partial_fit(chunk)
+        print(f"Chunk {i}: trained on {trained} of {len(chunk)} rows ({trainer.n_samples} total)")
+
+    if trainer.n_samples == 0:
+        print("No new tickets to train on; models left unchanged")
+        return None
+
+    metadata = trainer.save(data_dir, output_dir, model_version, export_bundle)
+    for head in ('category_model', 'priority_model'):
+        accuracy = metadata[head]['accuracy']
+        print(f"{head}: progressive accuracy {'n/a' if accuracy is None else f'{accuracy:.3f}'}")
+    print(f"Models saved to: {output_dir}")
+    return metadata
+
+
+def _measure(mode: str, csv_path: Path, work_dir: Path, chunk_size: int) -> None:
+    """Train one way in this (fresh) process and print wall time and peak RSS as JSON."""
+    import contextlib
+    import io
+    import resource
+    import time
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == 'batch':
+            from src.benchmarks.run_benchmarks import write_features
+            from src.models import train_model
+
+            df = pd.read_csv(csv_path)
+            write_features(df, work_dir / 'processed')
+            del df
+            train_model.main(work_dir / 'processed', work_dir / 'models')
+        else:
+            main(
+                'csv', csv_path, work_dir / 'processed', work_dir / 'models', chunk_size=chunk_size
+            )
+    wall_seconds = time.perf_counter() - start
+
+    with open(work_dir / 'models' / 'metadata.json') as f:
+        metadata = json.load(f)
+    print(json.dumps({
+        'mode': mode,
+        'wall_seconds': wall_seconds,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'category_accuracy': metadata['category_model']['accuracy'],
+        'priority_accuracy': metadata['priority_model']['accuracy']
+    }))
+
+
+def _compare(n_rows: int, chunk_size: int) -> list:
+    """Generate a synthetic CSV and train on it with both trainers in separate processes."""
+    import subprocess
+    import sys
+    import tempfile
+
+    from src.data.synthetic import generate_requests
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / 'requests.csv'
+        for i, chunk in enumerate(generate_requests(n_rows, chunk_size=chunk_size)):
+            chunk.to_csv(csv_path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+
+        for mode in ('batch', 'incremental'):
+            output = subprocess.run(
+                [sys.executable, '-m', 'src.models.train_incremental', '--measure', mode,
+                 '--path', str(csv_path), '--data-dir', str(Path(tmp) / mode),
+                 '--chunk-size', str(chunk_size)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Train request classifiers incrementally over chunked data"
+    )
+    parser.add_argument(
+        '--source', choices=['csv', 'parquet', 'api'], default='csv', help='Where to read tickets'
+    )
+    parser.add_argument('--path', type=Path, help='CSV or Parquet file (for csv/parquet sources)')
+    parser.add_argument('--data-dir', type=Path, default=Path('../data/processed'),
+                        help='Where to write feature artifacts')
+    parser.add_argument(
+        '--output-dir', type=Path, default=Path('../models'), help='Where to write models'
+    )
+    parser.add_argument('--chunk-size', type=int, default=50_000, help='Rows per chunk')
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue from the previous model, consuming only tickets updated since it'
+    )
+    parser.add_argument('--n-features', type=int, default=HASHING_DEFAULTS['n_features'],
+                        help='Hash buckets for a fresh model')
+    parser.add_argument(
+        '--export-bundle', action='store_true', help='Also write a model bundle for serving'
+    )
+    parser.add_argument(
+        '--model-version',
+        default=None,
+        help='Model version to record (defaults to env MODEL_VERSION)'
+    )
+    parser.add_argument(
+        '--compare',
+        type=int,
+        metavar='ROWS',
+        help='Compare peak memory and wall time with train_model.py on ROWS synthetic tickets'
+    )
+    parser.add_argument('--measure', choices=['batch', 'incremental'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        _measure(args.measure, args.path, args.data_dir, args.chunk_size)
+    elif args.compare:
+        print(json.dumps(_compare(args.compare, args.chunk_size), indent=2))
+    else:
+        main(
+            args.source, args.path, args.data_dir, args.output_dir, args.chunk_size,
+            resume=args.resume, n_features=args.n_features,
+            export_bundle=args.export_bundle, model_version=args.model_version
+        )
@@ -5,7 +5,10 @@ This script trains category and priority prediction models using the processed d
 Can be run as a standalone script or imported as a module.
 
 Usage:
-    python train_model.py --data-path ../data/processed --output-dir ../models
+    python -m src.models.train_model --data-path ../data/processed --output-dir ../models
+
+    # Also export a memory-mappable serving bundle (see src/models/bundle.py)
+    python -m src.models.train_model --data-path data/processed --output-dir models --export-bundle
 """
 
 import argparse
@@ -16,8 +19,15 @@ import scipy.sparse
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report, accuracy_score
+from joblib import Parallel, delayed
 import json
+import os
 from datetime import datetime
+from typing import Optional
+
+from src.features.vectorizers import load_feature_config, load_vectorizer
+from src.models.evaluation import evaluation_report
+from src.monitoring.drift import load_text_profile, reference_profile
 
 
 def load_processed_data(data_dir: Path):
@@ -61,26 +71,61 @@ def train_priority_model(X_train, y_train, random_state=42):
 
 
 def evaluate_model(model, X_test, y_test, label_encoder):
-    """Evaluate model and return metrics."""
-    y_pred = model.predict(X_test)
+    """
+    Evaluate model and return metrics.
+
+    Besides accuracy, the metrics include the coverage/accuracy curve over confidence
+    thresholds (overall and per class) and reliability bins; see src/models/evaluation.py.
+    """
     y_proba = model.predict_proba(X_test)
+    y_pred = y_proba.argmax(axis=1)
     
     accuracy = accuracy_score(y_test, y_pred)
     confidence = y_proba.max(axis=1).mean()
+    evaluation = evaluation_report(y_proba, y_test, label_encoder.classes_.tolist())
     
     print(f"Accuracy: {accuracy:.3f}")
     print(f"Mean Confidence: {confidence:.3f}")
+    print(
+        f"Expected Calibration Error: {evaluation['calibration']['expected_calibration_error']:.3f}"
+    )
     print("\nClassification Report:")
     print(classification_report(y_test, y_pred, target_names=label_encoder.classes_))
     
+    curve = evaluation['threshold_curve']
+    print("Threshold  Coverage  Accuracy")
+    for threshold in (0.4, 0.5, 0.6, 0.7, 0.8, 0.9):
+        i = curve['thresholds'].index(threshold)
+        accepted = curve['overall']['accuracy'][i]
+        print(f"{threshold:>9.1f}  {curve['overall']['coverage'][i]:>8.3f}  "
+              f"{'-' if accepted is None else f'{accepted:.3f}':>8}")
+
     return {
         'accuracy': float(accuracy),
-        'mean_confidence': float(confidence)
+        'mean_confidence': float(confidence),
+        'evaluation': evaluation
     }
 
 
-def main(data_dir: Path, output_dir: Path, test_size: float = 0.2, random_state: int = 42):
-    """Main training pipeline."""
+def main(
+    data_dir: Path,
+    output_dir: Path,
+    test_size: float = 0.2,
+    random_state: int = 42,
+    export_bundle: bool = False,
+    model_version: Optional[str] = None,
+    n_jobs: Optional[int] = None
+):
+    """
+    Main training pipeline.
+
+    n_jobs sets how many heads train at once (defaults to 2 when more than one
+    CPU is available).
+    """
+    if n_jobs is None:
+        n_jobs = min(2, os.cpu_count() or 1)
+    model_version = model_version or os.getenv('MODEL_VERSION') or '1.0.0'
+
     print(f"Loading data from {data_dir}...")
     X, y_category, y_priority, category_encoder, priority_encoder = load_processed_data(data_dir)
     
@@ -96,17 +141,25 @@ def main(data_dir: Path, output_dir: Path, test_size: float = 0.2, random_state:
     print(f"Training set: {X_train.shape[0]} samples")
     print(f"Test set: {X_test.shape[0]} samples")
     
-    # Train models
+    # Train models: the heads are independent, so fit them in parallel worker
+    # processes (joblib memory-maps X_train rather than copying it per worker)
+    print(f"\nTraining both heads (n_jobs={n_jobs})...")
+    cat_model, pri_model = Parallel(n_jobs=n_jobs)(
+        delayed(train_fn)(X_train, y_train, random_state)
+        for train_fn, y_train in [
+            (train_category_model, y_cat_train),
+            (train_priority_model, y_pri_train)
+        ]
+    )
+
     print("\n" + "="*50)
     print("CATEGORY MODEL")
     print("="*50)
-    cat_model = train_category_model(X_train, y_cat_train, random_state)
     cat_metrics = evaluate_model(cat_model, X_test, y_cat_test, category_encoder)
     
     print("\n" + "="*50)
     print("PRIORITY MODEL")
     print("="*50)
-    pri_model = train_priority_model(X_train, y_pri_train, random_state)
     pri_metrics = evaluate_model(pri_model, X_test, y_pri_test, priority_encoder)
     
     # Save models
@@ -118,26 +171,51 @@ def main(data_dir: Path, output_dir: Path, test_size: float = 0.2, random_state:
     with open(output_dir / 'priority_model.pkl', 'wb') as f:
         pickle.dump(pri_model, f)
     
+    trained_at = datetime.now().isoformat()
+    # Imported here so plain training doesn't depend on the serving code
+    from src.models.bundle import BUNDLE_DIRNAME, export_bundle as write_bundle, remove_bundle
+
+    if export_bundle:
+        vectorizer = load_vectorizer(data_dir)
+        bundle_dir = write_bundle(
+            output_dir / BUNDLE_DIRNAME, vectorizer, cat_model, pri_model,
+            category_encoder, priority_encoder, model_version, trained_at
+        )
+        print(f"Exported model bundle to {bundle_dir}")
+    elif remove_bundle(output_dir):
+        # The predictor prefers a bundle; don't leave the previous run's one to be served
+        print(f"Removed the previous model bundle from {output_dir}")
+
     # Save metadata
     metadata = {
+        'model_version': model_version,
+        'features': load_feature_config(data_dir),
         'category_model': {
             'type': 'LogisticRegression',
             'accuracy': cat_metrics['accuracy'],
             'mean_confidence': cat_metrics['mean_confidence'],
+            'evaluation': cat_metrics['evaluation'],
             'classes': category_encoder.classes_.tolist()
         },
         'priority_model': {
             'type': 'LogisticRegression',
             'accuracy': pri_metrics['accuracy'],
             'mean_confidence': pri_metrics['mean_confidence'],
+            'evaluation': pri_metrics['evaluation'],
             'classes': priority_encoder.classes_.tolist()
         },
+        # Compared with live traffic by the serving drift monitor (GET /drift)
+        'drift_reference': reference_profile(
+            X_test,
+            [cat_model.predict_proba(X_test), pri_model.predict_proba(X_test)],
+            load_text_profile(data_dir)
+        ),
         'training_info': {
             'n_train_samples': int(X_train.shape[0]),
             'n_test_samples': int(X_test.shape[0]),
             'test_size': test_size,
             'random_state': random_state,
-            'trained_at': datetime.now().isoformat()
+            'trained_at': trained_at
         }
     }
     
@@ -175,5 +253,26 @@ if __name__ == "__main__":
         help='Random seed for reproducibility'
     )
     
+    parser.add_argument(
+        '--export-bundle',
+        action='store_true',
+        help='Also write a memory-mappable model bundle for serving'
+    )
+    parser.add_argument(
+        '--model-version',
+        default=None,
+        help='Model version to record (defaults to env MODEL_VERSION)'
+    )
+    parser.add_argument(
+        '--n-jobs',
+        type=int,
+        default=None,
+        help='Heads to train in parallel (default: 2 if multiple CPUs)'
+    )
+
     args = parser.parse_args()
-    main(args.data_path, args.output_dir, args.test_size, args.random_state)
+    main(
+        args.data_path, args.output_dir, args.test_size, args.random_state,
+        export_bundle=args.export_bundle, model_version=args.model_version,
+        n_jobs=args.n_jobs
+    )
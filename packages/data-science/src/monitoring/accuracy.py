@@ -0,0 +1,106 @@
+"""
+Offline accuracy of served predictions against agents' final decisions.
+
+Joins the API's prediction audit log (src/serving/audit.py) with an export of tickets
+carrying the category and priority agents settled on, and reports accuracy per model
+version. A ticket predicted more than once by the same model version (e.g. after an
+edit) counts once, with its latest prediction.
+
+For each head, ``coverage`` is the share of matched tickets that got a non-null
+prediction (confidence above the caller's threshold) and ``accuracy`` is measured on
+those predictions.
+
+Usage (from packages/data-science):
+    python -m src.monitoring.accuracy --audit-log ../logs/predictions.jsonl \\
+        --outcomes ../data/raw/requests.csv
+    # Columns other than id/category/priority, e.g. an export of ai_metadata:
+    python -m src.monitoring.accuracy --audit-log ../logs/predictions.db --outcomes triage.jsonl \\
+        --category-column agent_category --priority-column agent_priority
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict
+
+import pandas as pd
+
+from src.serving.audit import read_audit_log
+
+HEADS = ('category', 'priority')
+
+
+def load_outcomes(
+    path: Path, id_column: str, category_column: str, priority_column: str
+) -> pd.DataFrame:
+    """Final category/priority per ticket id from a CSV or JSONL export."""
+    columns = [id_column, category_column, priority_column]
+    if path.suffix == '.csv':
+        df = pd.read_csv(path, usecols=columns, dtype={id_column: str})
+    else:
+        df = pd.read_json(path, lines=True, dtype={id_column: str})[columns]
+    return df.rename(columns={
+        id_column: 'request_id', category_column: 'category', priority_column: 'priority'
+    }).drop_duplicates('request_id', keep='last')
+
+
+def accuracy_by_version(predictions: pd.DataFrame, outcomes: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Per model version and head: matched tickets, coverage and accuracy.
+
+    Args:
+        predictions: Audit log rows (see read_audit_log)
+        outcomes: request_id, category, priority of agents' final decisions
+    """
+    predictions = predictions.dropna(subset=['request_id'])
+    latest = (
+        predictions.sort_values('timestamp')
+        .drop_duplicates(['model_version', 'request_id'], keep='last')
+    )
+    joined = latest.merge(outcomes, on='request_id', how='inner')
+
+    report = {}
+    for version, group in joined.groupby('model_version', sort=True):
+        entry: Dict[str, Any] = {'tickets': int(len(group))}
+        for head in HEADS:
+            predicted = group[f'predicted_{head}']
+            answered = predicted.notna()
+            correct = (predicted[answered] == group.loc[answered, head]).sum()
+            entry[head] = {
+                'predicted': int(answered.sum()),
+                'correct': int(correct),
+                'coverage': float(answered.mean()),
+                'accuracy': float(correct / answered.sum()) if answered.any() else None,
+                'mean_confidence': float(group[f'{head}_confidence'].mean())
+            }
+        report[str(version)] = entry
+    return {
+        'audit_records': int(len(predictions)),
+        'matched_tickets': int(len(joined)),
+        'by_model_version': report
+    }
+
+
+def main(argv=None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Accuracy of served predictions per model version")
+    parser.add_argument('--audit-log', type=Path, required=True, help='JSONL or SQLite audit log')
+    parser.add_argument('--outcomes', type=Path, required=True, help='CSV or JSONL ticket export')
+    parser.add_argument('--id-column', default='id', help='Ticket id column in the export')
+    parser.add_argument('--category-column', default='category', help="Agents' final category")
+    parser.add_argument('--priority-column', default='priority', help="Agents' final priority")
+    parser.add_argument('--output', type=Path, default=None, help='Also write the report here')
+    args = parser.parse_args(argv)
+
+    report = accuracy_by_version(
+        read_audit_log(args.audit_log),
+        load_outcomes(args.outcomes, args.id_column, args.category_column, args.priority_column)
+    )
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        args.output.write_text(text + '\n')
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,475 @@
+"""
+Streaming drift sketches of live prediction traffic.
+
+DriftMonitor keeps fixed-size histograms of what the predictor sees and says:
+
+- ``oov_rate``: share of each request's tokens the vectorizer has no feature for
+- ``nnz``: non-zero features per vectorized row (bins from the reference deciles)
+- ``category_confidence`` / ``priority_confidence``: top-class probability, 10 bins
+- ``category_mix`` / ``priority_mix``: predicted class counts
+
+A rising OOV rate and a falling nnz mean the vocabulary is going stale; shifts in the
+confidence and class mix show the model reacting to it. ``report`` compares each
+histogram with the reference profile that train_model.py stores in metadata.json
+(``drift_reference``), using the population stability index (PSI): below 0.1 is
+``ok``, 0.1-0.2 ``warn`` and above 0.2 ``drift``.
+
+Counts live in a ring of ``n_windows`` time windows plus a running total, all in one
+preallocated int64 array: memory is fixed whatever the traffic. An update is a handful
+of vectorized increments. The array is a shared anonymous mapping guarded by a
+process-shared lock, so API workers forked after the predictor is loaded (see
+src/serving/prefork.py) all add to, and report, the same sketches.
+
+The reference OOV histogram needs the texts, which train_model.py never sees:
+build_features.py writes it to ``text_profile.json`` next to the features, and training
+copies it into the reference when present. Training texts profiled against their own
+vocabulary are almost never OOV, so the histogram comes from a held-out sample scored
+against a vocabulary fitted without it (``held_out_text_profile``).
+
+Usage:
+    monitor = DriftMonitor(reference, vectorizer, category_classes, priority_classes)
+    monitor.observe(texts, cat_proba, pri_proba, row_nnz=np.diff(X.indptr))
+    monitor.report()   # served by GET /drift
+
+Measure the per-request cost on the predictor (from packages/data-science):
+    python -m src.monitoring.drift --models-dir models --data-dir data/processed
+"""
+
+import json
+import mmap
+import multiprocessing
+import time
+from bisect import bisect_right
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from sklearn.utils import murmurhash3_32
+
+TEXT_PROFILE_FILE = 'text_profile.json'
+RATE_BINS = 10
+# Training texts held out of the vocabulary to profile the OOV rate
+HOLDOUT_FRACTION = 0.1
+HOLDOUT_MAX_ROWS = 5_000
+# Used when a model has no reference profile (e.g. trained before profiles existed)
+DEFAULT_NNZ_EDGES = [1, 2, 4, 8, 16, 32, 64, 128]
+PSI_WARN = 0.1
+PSI_DRIFT = 0.2
+# Batches up to this size are counted in plain Python
+SMALL_BATCH = 4
+# Memoized token lookups for vectorizers without an in-memory vocabulary
+LOOKUP_CACHE_SIZE = 100_000
+
+
+def token_lookup(vectorizer) -> Optional[Callable[[str], bool]]:
+    """
+    Return ``known(token) -> bool`` for the vectorizer's unigram vocabulary.
+
+    TF-IDF checks its vocabulary, a model bundle its hash table and hashing mode
+    whether the token's column had any training documents. None if the vectorizer
+    offers none of these.
+    """
+    vocabulary = getattr(vectorizer, 'vocabulary_', None)
+    if vocabulary is not None:
+        return {term for term in vocabulary if ' ' not in term}.__contains__
+
+    if hasattr(vectorizer, 'lookup'):
+        def known(token):
+            return vectorizer.lookup(token) >= 0
+    elif getattr(vectorizer, 'doc_freq_', None) is not None:
+        doc_freq, n_features = vectorizer.doc_freq_, vectorizer.n_features
+
+        def known(token):
+            return doc_freq[abs(murmurhash3_32(token, seed=0)) % n_features] > 0
+    else:
+        return None
+
+    cache: Dict[str, bool] = {}
+
+    def cached(token):
+        hit = cache.get(token)
+        if hit is None:
+            if len(cache) >= LOOKUP_CACHE_SIZE:
+                cache.clear()
+            hit = cache[token] = known(token)
+        return hit
+    return cached
+
+
+def oov_rate(text: str, known: Callable[[str], bool]) -> float:
+    """Share of a normalized text's tokens (2+ characters, as vectorized) that are unknown."""
+    tokens = [token for token in text.split() if len(token) > 1]
+    if not tokens:
+        return 0.0
+    return sum(not known(token) for token in tokens) / len(tokens)
+
+
+def oov_rates(texts: Sequence[str], known: Callable[[str], bool]) -> np.ndarray:
+    """``oov_rate`` of each text."""
+    return np.fromiter((oov_rate(text, known) for text in texts), dtype=float, count=len(texts))
+
+
+def rate_bins(values: np.ndarray) -> np.ndarray:
+    """Bin index of values in [0, 1] over RATE_BINS equal-width bins."""
+    return np.minimum((np.asarray(values) * RATE_BINS).astype(np.int64), RATE_BINS - 1)
+
+
+def text_profile(texts: Sequence[str], vectorizer) -> Dict[str, Any]:
+    """Reference OOV histogram of normalized training texts (written by build_features.py)."""
+    known = token_lookup(vectorizer)
+    if known is None:
+        return {}
+    rates = oov_rates(texts, known)
+    return {
+        'oov_rate': {
+            'counts': np.bincount(rate_bins(rates), minlength=RATE_BINS).tolist(),
+            'mean': float(rates.mean()) if len(rates) else 0.0
+        }
+    }
+
+
+def held_out_text_profile(
+    texts: Sequence[str],
+    make_vectorizer: Callable[[], Any],
+    fraction: float = HOLDOUT_FRACTION,
+    max_rows: int = HOLDOUT_MAX_ROWS,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    ``text_profile`` of a random sample of texts, against a vocabulary fitted on the rest.
+
+    Args:
+        texts: Normalized training texts
+        make_vectorizer: Returns an unfitted vectorizer configured like the real one
+        fraction: Share of texts held out (at most ``max_rows``)
+        seed: Seed of the held-out sample
+    """
+    n_held_out = min(int(len(texts) * fraction), max_rows)
+    if n_held_out == 0:
+        return {}
+    held_out = np.zeros(len(texts), dtype=bool)
+    held_out[np.random.default_rng(seed).choice(len(texts), n_held_out, replace=False)] = True
+    vectorizer = make_vectorizer()
+    vectorizer.fit([text for text, skip in zip(texts, held_out) if not skip])
+    return text_profile([text for text, keep in zip(texts, held_out) if keep], vectorizer)
+
+
+def reference_profile(
+    X,
+    probas: Sequence[np.ndarray],
+    text_reference: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Reference histograms from held-out data, stored in metadata.json by train_model.py.
+
+    Args:
+        X: Feature matrix of the held-out rows
+        probas: Category and priority probabilities for those rows
+        text_reference: ``held_out_text_profile`` of the training texts, if available
+    """
+    row_nnz = np.diff(X.indptr)
+    # Decile edges, so each bin holds ~10% of reference rows
+    edges = np.unique(np.quantile(row_nnz, np.linspace(0.1, 0.9, 9)).round().astype(int)).tolist()
+    profile = dict(text_reference or {})
+    profile['nnz'] = {
+        'edges': edges,
+        'counts': np.bincount(np.searchsorted(edges, row_nnz, side='right'),
+                              minlength=len(edges) + 1).tolist(),
+        'mean': float(row_nnz.mean())
+    }
+    for head, proba in zip(('category', 'priority'), probas):
+        profile[f'{head}_confidence'] = {
+            'counts': np.bincount(rate_bins(proba.max(axis=1)), minlength=RATE_BINS).tolist(),
+            'mean': float(proba.max(axis=1).mean())
+        }
+        profile[f'{head}_mix'] = {
+            'counts': np.bincount(proba.argmax(axis=1), minlength=proba.shape[1]).tolist()
+        }
+    return profile
+
+
+def load_text_profile(data_dir: Path) -> Dict[str, Any]:
+    path = Path(data_dir) / TEXT_PROFILE_FILE
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        profile: Dict[str, Any] = json.load(f)
+    return profile
+
+
+def psi(
+    reference: Sequence[float],
+    live: Union[Sequence[float], np.ndarray],
+    epsilon: float = 1e-4
+) -> float:
+    """Population stability index between two histograms over the same bins."""
+    ref = np.asarray(reference, dtype=float)
+    cur = np.asarray(live, dtype=float)
+    ref = np.maximum(ref / max(ref.sum(), 1), epsilon)
+    cur = np.maximum(cur / max(cur.sum(), 1), epsilon)
+    return float(np.sum((cur - ref) * np.log(cur / ref)))
+
+
+class DriftMonitor:
+    """Fixed-size live traffic histograms, shared across forked workers."""
+
+    def __init__(
+        self,
+        reference: Optional[Dict[str, Any]],
+        vectorizer,
+        category_classes: Sequence[str],
+        priority_classes: Sequence[str],
+        window_seconds: float = 300.0,
+        n_windows: int = 12
+    ):
+        """
+        Args:
+            reference: ``drift_reference`` from metadata.json (None reports live data only)
+            vectorizer: The predictor's vectorizer (for the OOV vocabulary)
+            category_classes: Category labels in probability column order
+            priority_classes: Priority labels in probability column order
+            window_seconds: Length of one ring window
+            n_windows: Windows kept; the report covers the last n_windows * window_seconds
+        """
+        self.reference = reference or {}
+        self.classes = {'category': list(category_classes), 'priority': list(priority_classes)}
+        self.window_seconds = window_seconds
+        self.n_windows = n_windows
+        self.nnz_edges = np.asarray(
+            self.reference.get('nnz', {}).get('edges', DEFAULT_NNZ_EDGES), dtype=np.int64
+        )
+        self._known = token_lookup(vectorizer)
+
+        # Layout of one row of counts: each sketch owns a slice
+        sizes = [
+            ('oov_rate', RATE_BINS),
+            ('nnz', len(self.nnz_edges) + 1),
+            ('category_confidence', RATE_BINS),
+            ('priority_confidence', RATE_BINS),
+            ('category_mix', len(self.classes['category'])),
+            ('priority_mix', len(self.classes['priority'])),
+            # rows, texts with tokens, vectorized rows
+            ('totals', 3)
+        ]
+        self.slices: Dict[str, slice] = {}
+        start = 0
+        for name, size in sizes:
+            self.slices[name] = slice(start, start + size)
+            start += size
+        self.width = start
+
+        # Ring windows, then the running total, then each window's epoch
+        n_values = (n_windows + 1) * self.width + n_windows
+        self._buffer = mmap.mmap(-1, n_values * 8)
+        values = np.frombuffer(self._buffer, dtype=np.int64)
+        self._counts = values[:(n_windows + 1) * self.width].reshape(n_windows + 1, self.width)
+        self._epochs = values[(n_windows + 1) * self.width:]
+        # Same memory as a flat int64 view: scalar increments without numpy overhead
+        self._view = memoryview(self._buffer).cast('q')
+        self._epochs_base = (n_windows + 1) * self.width
+        self._offset = {name: part.start for name, part in self.slices.items()}
+        self._totals_offset = self._offset['totals']
+        self._nnz_edges = self.nnz_edges.tolist()
+        self._lock = multiprocessing.Lock()
+        self.started_at = time.time()
+
+    def observe(
+        self,
+        texts: Sequence[str],
+        cat_proba: np.ndarray,
+        pri_proba: np.ndarray,
+        row_nnz: Optional[np.ndarray] = None
+    ) -> None:
+        """
+        Add one scored batch.
+
+        Args:
+            texts: Normalized texts
+            cat_proba: Category probabilities, one row per text
+            pri_proba: Priority probabilities, one row per text
+            row_nnz: Non-zero features per row, -1 for rows served from the prediction
+                cache (they skip vectorization and are left out of ``nnz``)
+        """
+        if len(texts) <= SMALL_BATCH:
+            # Typical /predict call: plain Python beats a dozen tiny numpy calls
+            offsets = []
+            for row, text in enumerate(texts):
+                offsets.extend(self._row_offsets(
+                    text, cat_proba[row].tolist(), pri_proba[row].tolist(),
+                    None if row_nnz is None else int(row_nnz[row])
+                ))
+            self._add(offsets=offsets)
+            return
+
+        offsets = [
+            self.slices['category_confidence'].start + rate_bins(cat_proba.max(axis=1)),
+            self.slices['priority_confidence'].start + rate_bins(pri_proba.max(axis=1)),
+            self.slices['category_mix'].start + cat_proba.argmax(axis=1),
+            self.slices['priority_mix'].start + pri_proba.argmax(axis=1)
+        ]
+        totals = self.slices['totals'].start
+        increments = [(totals, len(texts))]
+        if self._known is not None:
+            with_tokens = [text for text in texts if text]
+            offsets.append(
+                self.slices['oov_rate'].start + rate_bins(oov_rates(with_tokens, self._known))
+            )
+            increments.append((totals + 1, len(with_tokens)))
+        if row_nnz is not None:
+            row_nnz = row_nnz[row_nnz >= 0]
+            offsets.append(
+                self.slices['nnz'].start + np.searchsorted(self.nnz_edges, row_nnz, side='right')
+            )
+            increments.append((totals + 2, len(row_nnz)))
+        delta = np.bincount(np.concatenate(offsets), minlength=self.width)
+        for index, amount in increments:
+            delta[index] += amount
+        self._add(delta=delta)
+
+    def _row_offsets(self, text: str, cat_row: list, pri_row: list, nnz: Optional[int]) -> list:
+        """Counter offsets one request increments (Python path of ``observe``)."""
+        cat_conf, pri_conf = max(cat_row), max(pri_row)
+        totals = self._totals_offset
+        offsets = [
+            self._offset['category_confidence'] + min(int(cat_conf * RATE_BINS), RATE_BINS - 1),
+            self._offset['priority_confidence'] + min(int(pri_conf * RATE_BINS), RATE_BINS - 1),
+            self._offset['category_mix'] + cat_row.index(cat_conf),
+            self._offset['priority_mix'] + pri_row.index(pri_conf),
+            totals
+        ]
+        if self._known is not None and text:
+            rate = oov_rate(text, self._known)
+            offsets += [
+                self._offset['oov_rate'] + min(int(rate * RATE_BINS), RATE_BINS - 1),
+                totals + 1
+            ]
+        if nnz is not None and nnz >= 0:
+            offsets += [self._offset['nnz'] + bisect_right(self._nnz_edges, nnz), totals + 2]
+        return offsets
+
+    def _add(self, offsets: Optional[list] = None, delta: Optional[np.ndarray] = None) -> None:
+        """Add increments at ``offsets`` or a ``delta`` row to the current window and the total."""
+        epoch = int(time.time() // self.window_seconds)
+        slot = epoch % self.n_windows
+        window_base, total_base = slot * self.width, self.n_windows * self.width
+        view = self._view
+        with self._lock:
+            if view[self._epochs_base + slot] != epoch:
+                self._counts[slot] = 0
+                self._epochs[slot] = epoch
+            if delta is not None:
+                self._counts[slot] += delta
+                self._counts[-1] += delta
+                return
+            for offset in offsets or ():
+                view[window_base + offset] += 1
+                view[total_base + offset] += 1
+
+    def _window_counts(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Counts summed over the windows inside the reporting period, and the running total."""
+        epoch = int(time.time() // self.window_seconds)
+        with self._lock:
+            current = self._epochs > epoch - self.n_windows
+            return self._counts[:-1][current].sum(axis=0), self._counts[-1].copy()
+
+    def report(self) -> Dict[str, Any]:
+        """Live histograms against the reference, with PSI and a status per sketch."""
+        window, total = self._window_counts()
+        totals = window[self.slices['totals']]
+        sketches = {}
+        for name in ('oov_rate', 'nnz', 'category_confidence', 'priority_confidence',
+                     'category_mix', 'priority_mix'):
+            live = window[self.slices[name]]
+            entry: Dict[str, Any] = {'live': live.tolist()}
+            if name.endswith('_mix'):
+                entry['labels'] = self.classes[name.split('_')[0]]
+            elif name == 'nnz':
+                entry['edges'] = self.nnz_edges.tolist()
+            reference = self.reference.get(name)
+            if reference is not None:
+                entry['reference'] = reference['counts']
+                if live.sum():
+                    entry['psi'] = psi(reference['counts'], live)
+                    entry['status'] = (
+                        'drift' if entry['psi'] > PSI_DRIFT else
+                        'warn' if entry['psi'] > PSI_WARN else 'ok'
+                    )
+            sketches[name] = entry
+
+        def mean_of(name: str, bin_values: np.ndarray) -> Optional[float]:
+            counts = window[self.slices[name]]
+            return float(counts @ bin_values / counts.sum()) if counts.sum() else None
+
+        # Bin midpoints: means are approximate, but comparable with the reference's
+        midpoints = (np.arange(RATE_BINS) + 0.5) / RATE_BINS
+        for name in ('oov_rate', 'category_confidence', 'priority_confidence'):
+            sketches[name]['live_mean'] = mean_of(name, midpoints)
+            if name in self.reference:
+                sketches[name]['reference_mean'] = self.reference[name].get('mean')
+
+        return {
+            'period_seconds': self.window_seconds * self.n_windows,
+            'rows': int(totals[0]),
+            'vectorized_rows': int(totals[2]),
+            'rows_since_start': int(total[self.slices['totals']][0]),
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(self.started_at)),
+            'has_reference': bool(self.reference),
+            'sketches': sketches
+        }
+
+
+def _measure_overhead(models_dir: str, data_dir: str, n_requests: int = 5000) -> Dict[str, float]:
+    """Per-call observe() cost against a single-request predict, with the cache off."""
+    from src.models.predict import RequestPredictor
+
+    # Instrumented, since drift is only observed when it is; metrics cost the same in both runs
+    predictor = RequestPredictor(models_dir, data_dir, cache_size=0, instrument=True)
+    reference = None
+    metadata_path = Path(models_dir) / 'metadata.json'
+    if metadata_path.exists():
+        with open(metadata_path) as f:
+            reference = json.load(f).get('drift_reference')
+    monitor = DriftMonitor(
+        reference, predictor.vectorizer,
+        predictor.category_encoder.classes_.tolist(), predictor.priority_encoder.classes_.tolist()
+    )
+    requests = [
+        {
+            'title': f'Cannot log in {i}',
+            'description': f'Password reset link {i % 97} expired again'
+        }
+        for i in range(n_requests)
+    ]
+
+    def run() -> float:
+        start = time.perf_counter()
+        for request in requests:
+            predictor.predict(request['title'], request['description'])
+        return (time.perf_counter() - start) / n_requests * 1e6
+
+    predictor.drift = None
+    run()  # warm-up
+    # Best of three alternating runs, so both modes see the same machine noise
+    results: Dict[str, float] = {
+        'without_monitor_us': float('inf'),
+        'with_monitor_us': float('inf')
+    }
+    for _ in range(3):
+        for label, attached in (('without_monitor', None), ('with_monitor', monitor)):
+            predictor.drift = attached
+            results[f'{label}_us'] = min(results[f'{label}_us'], run())
+    results['overhead_us'] = results['with_monitor_us'] - results['without_monitor_us']
+    results['rows_observed'] = monitor.report()['rows_since_start']
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure drift monitor overhead on the predictor")
+    parser.add_argument('--models-dir', default='../models', help='Trained models')
+    parser.add_argument('--data-dir', default='../data/processed', help='Preprocessing artifacts')
+    parser.add_argument('--requests', type=int, default=5000, help='Requests per run')
+    args = parser.parse_args()
+
+    print(json.dumps(_measure_overhead(args.models_dir, args.data_dir, args.requests), indent=2))
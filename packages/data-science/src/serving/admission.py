@@ -0,0 +1,298 @@
+"""
+Admission control and deadline-aware load shedding for the prediction routes.
+
+The backend gives up on /predict after 5 s, so work that can't finish by then is wasted,
+and during a spike it would also delay the requests behind it. AdmissionMiddleware lets
+at most ``max_concurrency`` prediction requests run at once. Further requests wait in a
+FIFO queue, each with its own deadline: the ``X-Request-Timeout`` header (seconds) or
+``default_deadline``.
+
+A request is answered at once with 503 and ``Retry-After`` when:
+
+- the queue is full
+- the estimated wait plus its own service time would pass its deadline. Service time is
+  a moving average of recent requests, and the wait is the work queued ahead of it
+  spread over the concurrency slots
+
+Queued requests are also dropped, without running, when:
+
+- their deadline arrives before a slot frees up (503)
+- their client disconnects: the middleware keeps reading the connection while the
+  request waits, so a departed caller is noticed straight away
+
+Routes outside ``paths`` (e.g. /health) are never queued. ``saturated`` tells /health
+that new work would be shed, so the backend's health probe answers quickly and can stop
+sending predictions. Counts are per worker when serving from pre-forked workers.
+
+Usage:
+    admission = AdmissionController(max_concurrency=32, max_queue=256, default_deadline=5.0)
+    app.add_middleware(AdmissionMiddleware, controller=admission)
+    admission.stats()   # reported by GET /health
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Sequence, Tuple
+
+from src.monitoring.metrics import ADMISSION
+
+DEADLINE_HEADER = b'x-request-timeout'
+# Weight of the newest request in the service time average
+SERVICE_TIME_ALPHA = 0.1
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed; ``retry_after`` is in seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency slots plus a deadline-tracking FIFO queue, on the event loop's thread."""
+
+    def __init__(
+        self, max_concurrency: int = 32, max_queue: int = 256, default_deadline: float = 5.0
+    ):
+        """
+        Args:
+            max_concurrency: Prediction requests allowed to run at once
+            max_queue: Requests allowed to wait for a slot
+            default_deadline: Seconds a request may take when it sets no X-Request-Timeout
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.default_deadline = default_deadline
+
+        self.in_flight = 0
+        self._queue: Deque[Tuple[asyncio.Future, float]] = deque()
+        self._service_time = 0.0
+        self.completed = 0
+        self.admitted = 0
+        self.shed = 0
+        self.expired = 0
+        self.disconnected = 0
+
+    def _estimated_wait(self, position: int) -> float:
+        """Time until a request at ``position`` in the queue (0 = head) gets a slot."""
+        return (position + 1) * self._service_time / self.max_concurrency
+
+    def _retry_after(self) -> int:
+        """Whole seconds until the current queue should have drained."""
+        return max(1, math.ceil(self._estimated_wait(len(self._queue))))
+
+    def saturated(self) -> bool:
+        """True when a request arriving now would be shed."""
+        if self.in_flight < self.max_concurrency and not self._queue:
+            return False
+        return (
+            len(self._queue) >= self.max_queue
+            or self._estimated_wait(len(self._queue)) + self._service_time > self.default_deadline
+        )
+
+    def _shed(self, reason: str, outcome: str = 'shed') -> Overloaded:
+        if outcome == 'expired':
+            self.expired += 1
+        else:
+            self.shed += 1
+        ADMISSION.labels(outcome).inc()
+        return Overloaded(reason, self._retry_after())
+
+    def try_acquire(self) -> bool:
+        """Take a free slot if there is one and nobody is queued for it."""
+        if self.in_flight < self.max_concurrency and not self._queue:
+            self.in_flight += 1
+            self._admit()
+            return True
+        return False
+
+    async def acquire(self, deadline: float, disconnected: Optional[asyncio.Event] = None) -> None:
+        """
+        Take a slot, waiting in the queue if needed.
+
+        Args:
+            deadline: ``time.monotonic()`` by which the response is due
+            disconnected: Set when the client goes away while queued
+
+        Raises:
+            Overloaded: The request can't start in time (or the queue is full)
+            ConnectionAbortedError: The client disconnected while queued
+        """
+        if self.try_acquire():
+            return
+
+        if len(self._queue) >= self.max_queue:
+            raise self._shed('Prediction queue full')
+        # Latest moment the request can start and still finish by its deadline
+        start_by = deadline - self._service_time
+        if time.monotonic() + self._estimated_wait(len(self._queue)) > start_by:
+            raise self._shed('Prediction queue cannot meet the request deadline')
+
+        slot = asyncio.get_running_loop().create_future()
+        entry = (slot, start_by)
+        self._queue.append(entry)
+        waiters = [slot]
+        if disconnected is not None:
+            waiters.append(asyncio.ensure_future(disconnected.wait()))
+        try:
+            await asyncio.wait(waiters, timeout=max(0.0, start_by - time.monotonic()),
+                               return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            # Don't leak a slot handed over just as the request was cancelled
+            if slot.done() and not slot.cancelled():
+                self.release(None)
+            else:
+                slot.cancel()
+                self._remove(entry)
+            raise
+        finally:
+            for waiter in waiters[1:]:
+                waiter.cancel()
+
+        gone = disconnected is not None and disconnected.is_set()
+        if slot.done() and not slot.cancelled():
+            # release() handed this request its slot (in_flight already counts it)
+            if not gone:
+                self._admit()
+                return
+            self.release(None)
+        else:
+            slot.cancel()
+            self._remove(entry)
+            if not gone:
+                raise self._shed('Request deadline passed while queued', 'expired')
+        self.disconnected += 1
+        ADMISSION.labels('disconnected').inc()
+        raise ConnectionAbortedError('Client disconnected while queued')
+
+    def _remove(self, entry) -> None:
+        try:
+            self._queue.remove(entry)
+        except ValueError:
+            # release() already skipped it
+            pass
+
+    def _admit(self) -> None:
+        self.admitted += 1
+        ADMISSION.labels('admitted').inc()
+
+    def release(self, service_seconds: Optional[float]) -> None:
+        """Free a slot, handing it to the oldest queued request that can still make it."""
+        if service_seconds is not None:
+            if self.completed:
+                self._service_time += SERVICE_TIME_ALPHA * (service_seconds - self._service_time)
+            else:
+                self._service_time = service_seconds
+            self.completed += 1
+        now = time.monotonic()
+        while self._queue:
+            slot, start_by = self._queue.popleft()
+            if slot.done():
+                continue
+            if now > start_by:
+                # Its own timeout will fire and count it; don't spend the slot on it
+                continue
+            slot.set_result(None)
+            return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+            'in_flight': self.in_flight,
+            'queued': len(self._queue),
+            'saturated': self.saturated(),
+            'service_time_ms': 1000.0 * self._service_time,
+            'admitted': self.admitted,
+            'completed': self.completed,
+            'shed': self.shed,
+            'expired': self.expired,
+            'disconnected': self.disconnected
+        }
+
+
+class AdmissionMiddleware:
+    """Runs requests to ``paths`` through an AdmissionController; 503 + Retry-After when shed."""
+
+    def __init__(
+        self,
+        app,
+        controller: AdmissionController,
+        paths: Sequence[str] = ('/predict', '/predict/batch')
+    ):
+        self.app = app
+        self.controller = controller
+        self.paths = frozenset(paths)
+
+    def _deadline(self, scope) -> float:
+        timeout = self.controller.default_deadline
+        for name, value in scope.get('headers', ()):
+            if name == DEADLINE_HEADER:
+                try:
+                    timeout = float(value)
+                except ValueError:
+                    pass
+                break
+        return time.monotonic() + timeout
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        buffered = deque()
+        if not self.controller.try_acquire():
+            deadline = self._deadline(scope)
+            # Read the connection while queued: a disconnect drops the request, and body
+            # messages read meanwhile are replayed to the app once admitted
+            disconnected = asyncio.Event()
+
+            async def listen() -> None:
+                while True:
+                    message = await receive()
+                    buffered.append(message)
+                    if message['type'] == 'http.disconnect':
+                        disconnected.set()
+                        return
+
+            listener = asyncio.ensure_future(listen())
+            try:
+                await self.controller.acquire(deadline, disconnected)
+            except Overloaded as e:
+                await self._reject(scope, send, e)
+                return
+            except ConnectionAbortedError:
+                return
+            finally:
+                listener.cancel()
+
+        async def replay():
+            if buffered:
+                return buffered.popleft()
+            return await receive()
+
+        start = time.monotonic()
+        try:
+            await self.app(scope, replay, send)
+        finally:
+            self.controller.release(time.monotonic() - start)
+
+    async def _reject(self, scope, send, error: Overloaded) -> None:
+        # Label the 503 with the route for MetricsMiddleware; guarded paths are route templates
+        scope['admission_path'] = scope['path']
+        body = ('{"detail":"%s"}' % error.reason).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': 503,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'retry-after', str(error.retry_after).encode())
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body})
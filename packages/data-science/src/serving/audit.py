@@ -0,0 +1,243 @@
+"""
+Write-behind audit log of served predictions.
+
+Every prediction the API returns is recorded with its ticket id (when the caller sends
+one), a hash of the input text, the model version and the predicted values. This gives
+the backend's accuracy tracking something to join against (see
+src/monitoring/accuracy.py).
+
+Recording only appends a small dict to an in-memory buffer. A background thread drains
+the buffer every ``flush_interval`` seconds, or as soon as ``batch_size`` records are
+waiting, and writes each batch with one group commit: one ``write`` to a JSONL file, or
+one SQLite transaction. A request never waits on disk. If the writer falls behind and the
+buffer reaches ``capacity``, new records are dropped and counted
+(``ds_audit_records_total{outcome="dropped"}``) instead of growing memory.
+
+The backend is picked from the path suffix: ``.db``/``.sqlite`` for SQLite, anything
+else for JSONL. Pre-forked workers each run their own writer thread. JSONL batches are
+appended with O_APPEND and SQLite runs in WAL mode, so several workers can share one
+file.
+
+Usage:
+    audit = AuditLog('../logs/predictions.jsonl')
+    audit.record(request, result)   # request/result dicts as used by /predict
+    audit.close()                   # flush on shutdown
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Union
+
+from src.monitoring.metrics import AUDIT_RECORDS
+
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+FIELDS = (
+    'timestamp', 'request_id', 'input_hash', 'model_version',
+    'predicted_category', 'category_confidence', 'predicted_priority', 'priority_confidence',
+    'confidence_threshold'
+)
+
+
+def input_hash(title: str, description: str) -> str:
+    """Short stable hash of the raw ticket text a prediction was made on."""
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(title.encode('utf-8'))
+    digest.update(b'\x00')
+    digest.update(description.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class JsonlWriter:
+    """Appends each batch to a JSONL file with a single O_APPEND write."""
+
+    def __init__(self, path: Path, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        data = ''.join(json.dumps(record) + '\n' for record in records).encode('utf-8')
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+            if self.fsync:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteWriter:
+    """Inserts each batch into a ``predictions`` table in one transaction."""
+
+    def __init__(self, path: Path, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened lazily so the connection belongs to the writer thread
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f"PRAGMA synchronous={'FULL' if self.fsync else 'NORMAL'}")
+        columns = ', '.join(
+            f"{name} {'REAL' if name.endswith(('confidence', 'threshold')) else 'TEXT'}"
+            for name in FIELDS
+        )
+        conn.execute(f'CREATE TABLE IF NOT EXISTS predictions ({columns})')
+        conn.execute(
+            'CREATE INDEX IF NOT EXISTS predictions_request_id ON predictions (request_id)'
+        )
+        conn.commit()
+        return conn
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        if self._conn is None:
+            self._conn = self._connect()
+        placeholders = ', '.join('?' for _ in FIELDS)
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO predictions ({', '.join(FIELDS)}) VALUES ({placeholders})",
+                [tuple(record.get(name) for name in FIELDS) for record in records]
+            )
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class AuditLog:
+    """Bounded in-memory buffer of prediction records drained by a background writer thread."""
+
+    def __init__(
+        self,
+        path: str,
+        capacity: int = 100_000,
+        batch_size: int = 1000,
+        flush_interval: float = 1.0,
+        fsync: bool = False
+    ):
+        """
+        Args:
+            path: JSONL file, or SQLite database for a .db/.sqlite suffix
+            capacity: Records buffered before new ones are dropped
+            batch_size: Records per group commit (a full batch wakes the writer early)
+            flush_interval: Longest time a record waits in the buffer, in seconds
+            fsync: Force each batch to disk before the next one
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        writer_class = SqliteWriter if self.path.suffix in SQLITE_SUFFIXES else JsonlWriter
+        self.writer = writer_class(self.path, fsync=fsync)
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            # Threads don't survive fork: pre-forked workers start their own writer
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self) -> None:
+        self._start_lock = threading.Lock()
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def record(self, request: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Buffer one served prediction (``request`` as sent to /predict, ``result`` as served)."""
+        if len(self._buffer) >= self.capacity:
+            self.dropped += 1
+            AUDIT_RECORDS.labels('dropped').inc()
+            return
+        self._buffer.append({
+            'timestamp': result['timestamp'],
+            'request_id': request.get('request_id'),
+            'input_hash': input_hash(request['title'], request['description']),
+            'model_version': result['model_version'],
+            'predicted_category': result['predicted_category'],
+            'category_confidence': result['category_confidence'],
+            'predicted_priority': result['predicted_priority'],
+            'priority_confidence': result['priority_confidence'],
+            'confidence_threshold': request.get('confidence_threshold')
+        })
+        if self._thread is None:
+            self._start()
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            stopping = self._stopping
+            self._drain()
+            if stopping:
+                self.writer.close()
+                return
+
+    def _drain(self) -> None:
+        """Write everything buffered so far, batch_size records per commit."""
+        while self._buffer:
+            batch: List[Dict[str, Any]] = []
+            # popleft is atomic, so handlers can keep appending meanwhile
+            while self._buffer and len(batch) < self.batch_size:
+                batch.append(self._buffer.popleft())
+            try:
+                self.writer.write(batch)
+            except Exception as e:
+                self.failed += len(batch)
+                AUDIT_RECORDS.labels('failed').inc(len(batch))
+                print(f"⚠️  Audit log write to {self.path} failed: {e}", file=sys.stderr)
+                continue
+            self.written += len(batch)
+            AUDIT_RECORDS.labels('written').inc(len(batch))
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Write out the buffer and stop the writer thread."""
+        if self._thread is None:
+            if self._buffer:
+                self._drain()
+            self.writer.close()
+            return
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'path': str(self.path),
+            'buffered': len(self._buffer),
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed
+        }
+
+
+def read_audit_log(path: Union[str, Path]):
+    """Load an audit log (JSONL or SQLite) as a DataFrame with one row per prediction."""
+    import pandas as pd
+
+    path = Path(path)
+    if path.suffix in SQLITE_SUFFIXES:
+        with sqlite3.connect(path) as conn:
+            return pd.read_sql_query('SELECT * FROM predictions', conn)
+    return pd.read_json(path, lines=True, dtype={'request_id': str, 'input_hash': str})
@@ -0,0 +1,222 @@
+"""
+Dynamic micro-batching for the prediction API.
+
+Concurrent /predict calls are queued and scored together: the worker waits up to
+``max_wait_ms`` after the first item arrives (or until ``max_batch_size`` items are
+queued), scores the whole batch with one ``predict_batch`` call in a worker thread,
+and resolves each caller's future with its own result. Each caller names the function
+its request must be scored with (e.g. the predictor its handler read before a hot
+reload); requests are only batched with others naming the same one.
+
+Usage:
+    batcher = MicroBatcher(max_batch_size=32, max_wait_ms=2)
+    result = await batcher.submit({"title": "...", "description": "..."}, predictor.predict_batch)
+
+Benchmark (batching on vs off, in-process against api/app.py):
+    python -m src.serving.batcher --requests 2000 --concurrency 64
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BatchFn = Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]
+
+
+class MicroBatcher:
+    """Collects concurrent prediction requests into batches for one scoring call."""
+
+    def __init__(self, max_batch_size: int = 32, max_wait_ms: float = 2.0):
+        """
+        Args:
+            max_batch_size: Flush as soon as this many requests are queued
+            max_wait_ms: Longest time the first request in a batch waits for company
+        """
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.batches = 0
+        self.items = 0
+        self.max_seen_batch = 0
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        """Start the worker on the running loop (restarting it if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if (
+            self._loop is loop and self._queue is not None
+            and self._worker is not None and not self._worker.done()
+        ):
+            return self._queue
+        queue: asyncio.Queue = asyncio.Queue()
+        self._loop = loop
+        self._queue = queue
+        self._worker = loop.create_task(self._run(loop, queue))
+        return queue
+
+    async def submit(self, item: Dict[str, Any], batch_fn: BatchFn) -> Dict[str, Any]:
+        """
+        Queue one request and wait for its prediction.
+
+        Args:
+            item: Request dict
+            batch_fn: Function scoring a list of request dicts, returning results in order
+        """
+        queue = self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((item, future, batch_fn))
+        result: Dict[str, Any] = await future
+        return result
+
+    async def stop(self) -> None:
+        """Cancel the worker; queued requests are failed."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        while self._queue is not None and not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped"))
+        self._worker = None
+
+    async def _collect(
+        self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue
+    ) -> List[Tuple[Dict[str, Any], asyncio.Future, BatchFn]]:
+        """Wait for one request, then gather more until the batch is full or the window closes."""
+        batch = [await queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            # Take whatever is already queued without yielding to the loop
+            while len(batch) < self.max_batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            if len(batch) >= self.max_batch_size:
+                break
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue) -> None:
+        """Worker loop: collect a batch, score each scoring function's share, resolve futures."""
+        while True:
+            groups: Dict[BatchFn, List[Tuple[Dict[str, Any], asyncio.Future]]] = {}
+            for item, future, batch_fn in await self._collect(loop, queue):
+                # Drop callers that already went away (e.g. client disconnect cancelled them)
+                if not future.done():
+                    groups.setdefault(batch_fn, []).append((item, future))
+            for batch_fn, batch in groups.items():
+                await self._score(loop, batch_fn, batch)
+
+    async def _score(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        batch_fn: BatchFn,
+        batch: List[Tuple[Dict[str, Any], asyncio.Future]]
+    ) -> None:
+        """Score one batch off the event loop and resolve its futures."""
+        items = [item for item, _ in batch]
+        try:
+            results = await loop.run_in_executor(None, batch_fn, items)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.items += len(batch)
+        self.max_seen_batch = max(self.max_seen_batch, len(batch))
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return batch counters."""
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000.0,
+            'batches': self.batches,
+            'items': self.items,
+            'mean_batch_size': self.items / self.batches if self.batches else 0.0,
+            'max_seen_batch': self.max_seen_batch
+        }
+
+
+async def _drive(app, n_requests: int, concurrency: int) -> Dict[str, float]:
+    """Fire n_requests /predict calls at the ASGI app with bounded concurrency."""
+    import httpx
+    import numpy as np
+
+    transport = httpx.ASGITransport(app=app)
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://ds-api") as client:
+        async def one(i: int) -> None:
+            body = {"title": f"Password reset needed #{i}", "description": "I can't log in"}
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post("/predict", json=body)
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(n_requests)))
+        elapsed = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1000.0
+    return {
+        'requests': n_requests,
+        'concurrency': concurrency,
+        'throughput_rps': n_requests / elapsed,
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p99_ms': float(np.percentile(ms, 99))
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import sys
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(
+        description="Compare /predict latency with batching on and off"
+    )
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per run')
+    parser.add_argument('--concurrency', type=int, default=64, help='Concurrent in-flight requests')
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).parents[2] / 'api'))
+    import app as api_app
+
+    predictor = api_app.model_manager.current
+    if predictor is None:
+        sys.exit("Models not loaded; train models first")
+    # Unique titles, so the prediction cache doesn't hide scoring cost
+    predictor.cache = None
+
+    report: Dict[str, Any] = {}
+    for mode, batcher in [('off', None), ('on', MicroBatcher())]:
+        api_app.batcher = batcher
+        report[f'batching_{mode}'] = asyncio.run(
+            _drive(api_app.app, args.requests, args.concurrency)
+        )
+        if batcher is not None:
+            report[f'batching_{mode}']['batcher'] = batcher.stats()
+
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,51 @@
+"""
+ASGI middleware recording request counts and latency for GET /metrics.
+
+Written as plain ASGI rather than with ``@app.middleware("http")`` so the
+per-request overhead stays at a couple of timer reads and counter increments.
+"""
+
+from time import perf_counter
+
+from src.monitoring.metrics import HTTP_REQUESTS, HTTP_SECONDS, STAGE_SECONDS
+
+
+class MetricsMiddleware:
+    """
+    Counts requests by route and status and observes end-to-end latency.
+
+    Handlers that store their own run time in ``request.state.handler_seconds``
+    also get the remainder (routing, pydantic validation and response
+    serialization) recorded as the ``http_overhead`` prediction stage.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+        status = {'code': 500}
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = perf_counter() - start
+            # Label by route template, not raw path, to keep label cardinality bounded
+            # (requests shed before routing are labelled by AdmissionMiddleware)
+            route = scope.get('route')
+            path = getattr(route, 'path', None) or scope.get('admission_path', 'unmatched')
+            HTTP_REQUESTS.labels(path, status['code']).inc()
+            HTTP_SECONDS.labels(path).observe(elapsed)
+
+            handler_seconds = scope.get('state', {}).get('handler_seconds')
+            if handler_seconds is not None:
+                STAGE_SECONDS.labels('http_overhead').observe(max(elapsed - handler_seconds, 0.0))
@@ -0,0 +1,426 @@
+"""
+Pre-fork multi-worker serving for the prediction API.
+
+``uvicorn --workers N`` starts N fresh interpreters, each importing api/app.py and
+loading its own copy of the models. This module instead imports the app once in a
+parent process, which loads and warms the predictor, and then forks the workers.
+The workers share the parent's memory pages copy-on-write:
+
+- ``gc.freeze()`` runs just before forking, so the cyclic garbage collector never
+  walks (and writes to) the inherited objects in a worker
+- with a model bundle (src/models/bundle.py) the vocabulary, IDF and weights live in
+  a read-only ``mmap`` of ``arrays.bin``, outside the Python heap, so neither
+  refcounting nor the GC can dirty them. Pickled models still share their numpy
+  buffers, but vocabulary dict lookups touch (and copy) the pages holding the
+  term objects
+
+Prefer the bundle (``train_model --export-bundle``) for multi-worker serving.
+
+The workers accept connections on one listening socket bound by the parent. The
+parent supervises them: crashed workers are replaced, SIGTERM/SIGINT shut
+everything down gracefully, and a model reload happens in the parent (on SIGHUP,
+or when the watcher sees a retrained model) followed by a rolling restart, so the
+new model is shared as well. In this mode ``/admin/reload`` only affects the worker
+that handled the call. ``/metrics`` and the prediction cache are also per worker.
+
+Usage (from packages/data-science):
+    MODEL_PATH=models PROCESSED_DATA_PATH=data/processed \\
+        python -m src.serving.prefork --workers 4 --port 8001
+
+Per-worker memory (RSS, PSS, private) and aggregate throughput for 1..N workers,
+pre-forked vs. each worker loading its own models:
+    MODEL_PATH=models PROCESSED_DATA_PATH=data/processed \\
+        python -m src.serving.prefork --bench --workers 4
+"""
+
+import gc
+import importlib
+import os
+import signal
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, cast
+
+DEFAULT_APP_DIR = Path(__file__).parents[2] / 'api'
+
+
+def import_app(app_ref: str = 'app:app', app_dir: Path = DEFAULT_APP_DIR):
+    """Import ``module:attribute`` from app_dir; returns (module, ASGI app)."""
+    sys.path.insert(0, str(app_dir))
+    module_name, _, attribute = app_ref.partition(':')
+    module = importlib.import_module(module_name)
+    return module, getattr(module, attribute or 'app')
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Listening socket shared by every worker."""
+    sock = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def process_memory(pid: int) -> Optional[Dict[str, int]]:
+    """
+    RSS, PSS and shared/private page totals (bytes) from /proc/<pid>/smaps_rollup.
+
+    PSS divides each shared page among the processes mapping it, so summing PSS over
+    the workers gives their real combined footprint. Returns None off Linux.
+    """
+    fields = {
+        'Rss': 'rss', 'Pss': 'pss', 'Shared_Clean': 'shared_clean', 'Shared_Dirty': 'shared_dirty',
+        'Private_Clean': 'private_clean', 'Private_Dirty': 'private_dirty'
+    }
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+    memory = {}
+    for line in lines:
+        name, _, value = line.partition(':')
+        if name in fields:
+            memory[fields[name]] = int(value.split()[0]) * 1024
+    return memory
+
+
+class PreforkServer:
+    """Loads the app once, forks workers onto a shared socket and supervises them."""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        host: str = '0.0.0.0',
+        port: int = 8001,
+        app_ref: str = 'app:app',
+        app_dir: Path = DEFAULT_APP_DIR,
+        preload: bool = True,
+        watch_interval: Optional[float] = None,
+        log_level: str = 'warning'
+    ):
+        """
+        Args:
+            workers: Worker processes
+            host: Interface to bind
+            port: Port to bind
+            app_ref: ``module:attribute`` of the ASGI app, imported from app_dir
+            app_dir: Directory containing the app module
+            preload: Import the app (and load the models) in the parent before forking.
+                False makes every worker import it after the fork, like
+                ``uvicorn --workers`` (kept for comparison)
+            watch_interval: Seconds between parent-side checks for a retrained model
+                (defaults to env MODEL_WATCH_INTERVAL; 0 disables)
+            log_level: uvicorn log level in the workers
+        """
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.app_ref = app_ref
+        self.app_dir = Path(app_dir)
+        self.preload = preload
+        if watch_interval is None:
+            watch_interval = float(os.getenv('MODEL_WATCH_INTERVAL', 10))
+        self.watch_interval = watch_interval
+        self.log_level = log_level
+
+        self.module: Any = None
+        self.app: Any = None
+        self.sock: Optional[socket.socket] = None
+        self.children: Dict[int, float] = {}
+        # Workers told to exit (rolling restart); they aren't replaced when reaped
+        self._retiring: set = set()
+        self._stopping = False
+        self._reload_requested = False
+
+    def _load(self) -> None:
+        # Threads don't survive fork(): the parent runs the watcher itself instead
+        os.environ['MODEL_WATCH_INTERVAL'] = '0'
+        self.module, self.app = import_app(self.app_ref, self.app_dir)
+        self._freeze()
+
+    def _freeze(self) -> None:
+        """Move every live object out of the collector's reach before forking."""
+        gc.collect()
+        gc.freeze()
+
+    def _spawn(self) -> int:
+        pid = os.fork()
+        if pid:
+            self.children[pid] = time.time()
+            return pid
+
+        # Worker: restore default signal handling (uvicorn installs its own)
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGCHLD):
+            signal.signal(signum, signal.SIG_DFL)
+        exit_code = 0
+        try:
+            import uvicorn
+
+            if self.app is None:
+                os.environ['MODEL_WATCH_INTERVAL'] = '0'
+                _, self.app = import_app(self.app_ref, self.app_dir)
+            config = uvicorn.Config(self.app, log_level=self.log_level, access_log=False)
+            # Workers are only spawned after serve() has bound the socket
+            uvicorn.Server(config).run(sockets=[cast(socket.socket, self.sock)])
+        except BaseException:
+            import traceback
+
+            traceback.print_exc()
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def _stop_child(self, pid: int, signum: int = signal.SIGTERM) -> None:
+        self._retiring.add(pid)
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            self.children.pop(pid, None)
+            self._retiring.discard(pid)
+
+    def _reap(self) -> List[int]:
+        """Collect exited workers without blocking; returns the ones that died unexpectedly."""
+        exited = []
+        while self.children:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            self.children.pop(pid, None)
+            if pid in self._retiring:
+                self._retiring.discard(pid)
+            else:
+                exited.append(pid)
+        return exited
+
+    def _rolling_restart(self) -> None:
+        """Replace workers one at a time so some are always accepting connections."""
+        for pid in list(self.children):
+            self._spawn()
+            self._stop_child(pid)
+
+    def _reload(self) -> None:
+        manager = getattr(self.module, 'model_manager', None)
+        if manager is None:
+            self._rolling_restart()
+            return
+        try:
+            result = manager.reload()
+        except Exception as e:
+            print(f"⚠️  Warning: Model reload failed, keeping current model: {e}")
+            return
+        print(f"✓ Reloaded model {result['previous_version']} -> {result['model_version']}")
+        self._freeze()
+        self._rolling_restart()
+
+    def _handle_signal(self, signum, frame) -> None:
+        if signum == signal.SIGHUP:
+            self._reload_requested = True
+        else:
+            self._stopping = True
+
+    def serve(self) -> None:
+        """Load, fork and supervise until SIGTERM/SIGINT."""
+        if self.preload:
+            self._load()
+        self.sock = bind_socket(self.host, self.port)
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(signum, self._handle_signal)
+
+        for _ in range(self.workers):
+            self._spawn()
+        print(f"Serving on {self.host}:{self.port} with {self.workers} workers "
+              f"(parent pid {os.getpid()}, preload={self.preload})", flush=True)
+
+        next_check = time.monotonic() + self.watch_interval
+        while not self._stopping:
+            time.sleep(0.2)
+            for pid in self._reap():
+                if not self._stopping:
+                    print(f"⚠️  Warning: Worker {pid} exited, starting a replacement")
+                    self._spawn()
+
+            manager = getattr(self.module, 'model_manager', None)
+            if self._reload_requested:
+                self._reload_requested = False
+                self._reload()
+            elif self.preload and self.watch_interval > 0 and time.monotonic() >= next_check:
+                next_check = time.monotonic() + self.watch_interval
+                # check_for_update reloads in the parent; then hand the model to fresh workers
+                if manager is not None and manager.check_for_update():
+                    self._freeze()
+                    self._rolling_restart()
+
+        for pid in list(self.children):
+            self._stop_child(pid)
+        deadline = time.monotonic() + 30
+        while self.children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self.children):
+            self._stop_child(pid, signal.SIGKILL)
+        self._reap()
+        self.sock.close()
+
+
+def worker_pids(parent_pid: int) -> List[int]:
+    """Child pids of a process (Linux)."""
+    try:
+        with open(f'/proc/{parent_pid}/task/{parent_pid}/children') as f:
+            return [int(pid) for pid in f.read().split()]
+    except OSError:
+        return []
+
+
+def _bench_one(
+    workers: int, preload: bool, n_requests: int, concurrency: int, port: int
+) -> Dict[str, Any]:
+    """Start a server in a subprocess, drive /predict over TCP, then read worker memory."""
+    import asyncio
+    import subprocess
+
+    import httpx
+    import numpy as np
+
+    command = [
+        sys.executable, '-m', 'src.serving.prefork', '--workers', str(workers),
+        '--host', '127.0.0.1', '--port', str(port), '--watch-interval', '0'
+    ]
+    if not preload:
+        command.append('--no-preload')
+    env = {**os.environ, 'PREDICTION_CACHE_SIZE': '0'}
+    server = subprocess.Popen(command, cwd=Path(__file__).parents[2], env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        # Wait until every worker has answered (without preload each one loads models first)
+        deadline = time.monotonic() + 120
+        while time.monotonic() < deadline:
+            try:
+                if httpx.get(f'{base_url}/health', timeout=1).status_code == 200 \
+                        and len(worker_pids(server.pid)) == workers:
+                    break
+            except httpx.HTTPError:
+                pass
+            if server.poll() is not None:
+                raise RuntimeError(f"Server exited with code {server.returncode}")
+            time.sleep(0.2)
+        else:
+            raise RuntimeError("Server did not become healthy")
+
+        async def drive() -> Dict[str, float]:
+            latencies: List[float] = []
+            semaphore = asyncio.Semaphore(concurrency)
+            limits = httpx.Limits(max_connections=concurrency)
+            async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+                async def one(i: int) -> None:
+                    body = {"title": f"Password reset needed #{i}", "description": "I can't log in"}
+                    async with semaphore:
+                        start = time.perf_counter()
+                        response = await client.post('/predict', json=body)
+                        latencies.append(time.perf_counter() - start)
+                        response.raise_for_status()
+
+                # Warm every worker's connections and code paths before timing
+                await asyncio.gather(*(one(-i) for i in range(1, 4 * workers + 1)))
+                latencies.clear()
+                start = time.perf_counter()
+                await asyncio.gather(*(one(i) for i in range(n_requests)))
+                elapsed = time.perf_counter() - start
+            ms = np.array(latencies) * 1000.0
+            return {
+                'throughput_rps': n_requests / elapsed,
+                'p50_ms': float(np.percentile(ms, 50)),
+                'p99_ms': float(np.percentile(ms, 99))
+            }
+
+        result: Dict[str, Any] = asyncio.run(drive())
+
+        # Memory after serving traffic, when copy-on-write has already happened
+        memories = [m for m in (process_memory(pid) for pid in worker_pids(server.pid)) if m]
+        if memories:
+            mib = 2 ** 20
+            result['worker_rss_mib'] = [m['rss'] / mib for m in memories]
+            result['worker_private_mib'] = [
+                (m['private_clean'] + m['private_dirty']) / mib for m in memories
+            ]
+            result['total_pss_mib'] = sum(m['pss'] for m in memories) / mib
+            parent = process_memory(server.pid)
+            if parent:
+                result['parent_pss_mib'] = parent['pss'] / mib
+        return result
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def run_benchmark(max_workers: int, n_requests: int, concurrency: int, port: int) -> Dict[str, Any]:
+    """Throughput and memory for 1..max_workers workers, with and without preloading."""
+    report: Dict[str, Any] = {
+        'cpu_count': os.cpu_count(),
+        'requests': n_requests,
+        'concurrency': concurrency
+    }
+    for mode, preload in (('prefork', True), ('per_worker_load', False)):
+        report[mode] = {}
+        for workers in range(1, max_workers + 1):
+            print(f"{mode}: {workers} worker(s)...", file=sys.stderr)
+            report[mode][workers] = _bench_one(workers, preload, n_requests, concurrency, port)
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Serve the prediction API from pre-forked workers")
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=int(os.getenv('WEB_CONCURRENCY', 2)),
+        help='Worker processes (default: env WEB_CONCURRENCY or 2); max workers with --bench'
+    )
+    parser.add_argument('--host', default=os.getenv('API_HOST', '0.0.0.0'), help='Bind address')
+    parser.add_argument(
+        '--port', type=int, default=int(os.getenv('API_PORT', 8001)), help='Bind port'
+    )
+    parser.add_argument('--app', default='app:app', help='ASGI app as module:attribute')
+    parser.add_argument(
+        '--app-dir', type=Path, default=DEFAULT_APP_DIR, help='Directory of the app module'
+    )
+    parser.add_argument('--no-preload', action='store_true',
+                        help='Load models in each worker instead of once in the parent')
+    parser.add_argument(
+        '--watch-interval',
+        type=float,
+        default=None,
+        help='Seconds between checks for a retrained model (default: env MODEL_WATCH_INTERVAL)'
+    )
+    parser.add_argument('--log-level', default='warning', help='uvicorn log level')
+    parser.add_argument(
+        '--bench', action='store_true', help='Benchmark 1..--workers workers and exit'
+    )
+    parser.add_argument('--requests', type=int, default=3000, help='Requests per benchmark run')
+    parser.add_argument(
+        '--concurrency', type=int, default=64, help='Concurrent requests in the benchmark'
+    )
+    args = parser.parse_args()
+
+    if args.bench:
+        report = run_benchmark(args.workers, args.requests, args.concurrency, args.port)
+        print(json.dumps(report, indent=2))
+    else:
+        PreforkServer(
+            workers=args.workers, host=args.host, port=args.port, app_ref=args.app,
+            app_dir=args.app_dir, preload=not args.no_preload,
+            watch_interval=args.watch_interval, log_level=args.log_level
+        ).serve()
@@ -0,0 +1,189 @@
+"""
+Zero-downtime model reloading for the prediction API.
+
+ModelManager owns the live RequestPredictor. A reload builds and warms a new
+predictor in the calling (background) thread, then swaps the reference in one
+assignment. Request handlers read ``manager.current`` once and keep using that
+object, so requests already in flight finish on the old model while new requests
+see the new one.
+
+A reload is triggered either explicitly (``manager.reload()``, e.g. from an admin
+endpoint) or by the watcher thread, which polls the model directory for a new
+``metadata.json``. train_model.py writes that file last, so a change means training
+has finished writing every artifact. Only a bundle shipped without metadata.json is
+watched through its manifest, the last file export_bundle writes.
+
+Usage:
+    manager = ModelManager(models_dir='../models', data_dir='../data/processed')
+    manager.load()
+    manager.start_watching(interval=10)
+    predictor = manager.current
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from src.models.bundle import BUNDLE_DIRNAME, MANIFEST_FILE
+from src.models.predict import RequestPredictor
+
+WARMUP_REQUESTS = [
+    {"title": "Password reset needed", "description": "I forgot my password and can't log in"},
+    {"title": "Invoice charged twice", "description": "My card was billed two times this month"},
+    {"title": "Server is down", "description": "Production server not responding"}
+]
+
+
+class ModelManager:
+    """Holds the live predictor and swaps in retrained models without a restart."""
+
+    def __init__(
+        self,
+        models_dir: str = '../models',
+        data_dir: str = '../data/processed',
+        factory: Callable[..., RequestPredictor] = RequestPredictor
+    ):
+        """
+        Args:
+            models_dir: Directory with trained models (and optionally model_bundle/)
+            data_dir: Directory with preprocessing artifacts
+            factory: Callable building a predictor from (models_dir, data_dir)
+        """
+        self.models_dir = models_dir
+        self.data_dir = data_dir
+        self.factory = factory
+
+        self.current: Optional[RequestPredictor] = None
+        self.loaded_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.reload_count = 0
+
+        self._reload_lock = threading.Lock()
+        self._signature: Optional[int] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _artifact_signature(self, models_dir: str) -> Optional[int]:
+        """
+        Modification time of metadata.json, which train_model.py writes last.
+
+        The bundle manifest is written before metadata.json, so it only counts when there
+        is no metadata.json (a bundle shipped on its own).
+        """
+        models_path = Path(models_dir)
+        for path in (models_path / 'metadata.json', models_path / BUNDLE_DIRNAME / MANIFEST_FILE):
+            try:
+                return path.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+        return None
+
+    def load(self) -> bool:
+        """Initial load; returns False (and records the error) if models are missing."""
+        try:
+            self.reload()
+            return True
+        except Exception as e:
+            print(f"⚠️  Warning: Could not load models: {e}")
+            return False
+
+    def reload(
+        self, models_dir: Optional[str] = None, data_dir: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Build, warm and atomically swap in a predictor.
+
+        Args:
+            models_dir: New model directory (defaults to the current one)
+            data_dir: New preprocessing artifact directory (defaults to the current one)
+
+        Returns:
+            Previous and new model versions
+
+        Raises:
+            Exception: Whatever loading or warm-up raised; the live predictor is kept
+        """
+        with self._reload_lock:
+            models_dir = models_dir or self.models_dir
+            data_dir = data_dir or self.data_dir
+            signature = self._artifact_signature(models_dir)
+
+            try:
+                predictor = self.factory(models_dir=models_dir, data_dir=data_dir)
+                # Warm code paths before the predictor takes traffic. Uninstrumented and
+                # without the prediction cache, so warm-up calls show up in neither the
+                # metrics and drift sketches nor the cache's entries and hit/miss counts
+                instrument, predictor.instrument = predictor.instrument, False
+                cache, predictor.cache = predictor.cache, None
+                try:
+                    predictor.predict_batch(WARMUP_REQUESTS)
+                    for request in WARMUP_REQUESTS:
+                        predictor.predict(request['title'], request['description'])
+                finally:
+                    predictor.instrument = instrument
+                    predictor.cache = cache
+            except Exception as e:
+                self.last_error = str(e)
+                raise
+
+            previous = self.current
+            self.current = predictor
+            self.models_dir = models_dir
+            self.data_dir = data_dir
+            self._signature = signature
+            self.loaded_at = time.time()
+            self.last_error = None
+            self.reload_count += 1
+
+        return {
+            "previous_version": previous.model_version if previous else None,
+            "model_version": predictor.model_version,
+            "models_dir": str(models_dir)
+        }
+
+    def check_for_update(self) -> bool:
+        """Reload if the model directory's artifacts changed since the last load."""
+        signature = self._artifact_signature(self.models_dir)
+        if signature is None or signature == self._signature:
+            return False
+        try:
+            result = self.reload()
+            print(f"✓ Reloaded model {result['previous_version']} -> {result['model_version']}")
+            return True
+        except Exception as e:
+            # Remember the failed artifacts so a broken model isn't retried every poll
+            self._signature = signature
+            print(f"⚠️  Warning: Model reload failed, keeping current model: {e}")
+            return False
+
+    def start_watching(self, interval: float = 10.0) -> None:
+        """Poll the model directory every ``interval`` seconds in a daemon thread."""
+        if self._watcher is not None:
+            return
+
+        def watch() -> None:
+            while not self._stop.wait(interval):
+                self.check_for_update()
+
+        self._stop.clear()
+        self._watcher = threading.Thread(target=watch, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        """Stop the watcher thread."""
+        if self._watcher is None:
+            return
+        self._stop.set()
+        self._watcher.join()
+        self._watcher = None
+
+    def status(self) -> Dict[str, Any]:
+        """Return reload bookkeeping for the model-info endpoint."""
+        return {
+            "models_dir": str(self.models_dir),
+            "loaded_at": self.loaded_at,
+            "reload_count": self.reload_count,
+            "watching": self._watcher is not None,
+            "last_error": self.last_error
+        }
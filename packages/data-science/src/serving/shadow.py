@@ -0,0 +1,324 @@
+"""
+Shadow evaluation of a candidate model on live traffic.
+
+A retrained model can be loaded next to the live one and fed a sample of real
+requests before it is promoted. The request path only draws a random number and, for
+the sampled requests, appends them to a bounded buffer; the response never waits on
+the shadow model. A background thread drains the buffer in micro-batches and scores
+each batch with both models (``RequestPredictor.predict_proba_raw``: no cache, metrics
+or drift sketches), so the two are timed on the same requests under the same
+conditions. If the thread falls behind and the buffer reaches ``capacity``, new
+samples are dropped and counted rather than queued.
+
+Per head, ``stats`` aggregates:
+
+- ``agreement``: share of requests where both models pick the same top label
+- ``served_agreement``: share where the response would be unchanged, i.e. the same
+  label or the same null at the request's confidence threshold
+- ``mean_confidence_delta``: shadow minus live top-class confidence (and its mean
+  absolute value)
+- ``top_disagreements``: the most frequent (live, shadow) label pairs
+
+plus the per-request scoring time of each model and their ratio. Agreement and timing
+are also exported on /metrics (``ds_shadow_*``). Like /metrics, the stats are per
+worker when serving from pre-forked workers.
+
+Usage:
+    shadow = ShadowEvaluator(RequestPredictor('../models/candidate', cache_size=0,
+                                              instrument=False), sample_rate=0.1)
+    shadow.submit(live_predictor, [request])   # request dict as sent to /predict
+    shadow.stats()
+
+Measure the effect on /predict latency (shadow on vs off, in-process against api/app.py):
+    python -m src.serving.shadow --shadow-models-dir models --requests 2000
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.monitoring.metrics import SHADOW_AGREEMENT, SHADOW_REQUESTS, SHADOW_SECONDS
+
+HEADS = ('category', 'priority')
+DEFAULT_THRESHOLD = 0.6
+TOP_DISAGREEMENTS = 10
+
+
+class ShadowEvaluator:
+    """Scores a sample of live requests with a shadow model in a background thread."""
+
+    def __init__(
+        self,
+        predictor,
+        sample_rate: float = 0.1,
+        capacity: int = 10_000,
+        batch_size: int = 32,
+        flush_interval: float = 0.5
+    ):
+        """
+        Args:
+            predictor: Shadow RequestPredictor (load it with cache_size=0, instrument=False)
+            sample_rate: Share of requests sent to the shadow model
+            capacity: Sampled requests buffered before new ones are dropped
+            batch_size: Requests scored per micro-batch; small batches keep each
+                stretch the thread holds the interpreter short
+            flush_interval: Longest time a sampled request waits in the buffer, in seconds
+        """
+        self.predictor = predictor
+        self.sample_rate = sample_rate
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            # Threads don't survive fork: pre-forked workers start their own
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self) -> None:
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._buffer: Deque[Tuple[Any, Dict[str, Any]]] = deque()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.sampled = 0
+        self.scored = 0
+        self.dropped = 0
+        self.failed = 0
+        self._live_seconds = 0.0
+        self._shadow_seconds = 0.0
+        self._heads: Dict[str, Dict[str, Any]] = {
+            head: {
+                'agree': 0,
+                'served_agree': 0,
+                'confidence_delta': 0.0,
+                'abs_confidence_delta': 0.0,
+                'disagreements': Counter()
+            }
+            for head in HEADS
+        }
+
+    def submit(self, live, requests: List[Dict[str, Any]]) -> None:
+        """
+        Sample requests just served by ``live`` for shadow scoring; never blocks.
+
+        Args:
+            live: The RequestPredictor that served them (the handler's predictor)
+            requests: Request dicts as sent to /predict
+        """
+        for request in requests:
+            if random.random() >= self.sample_rate:
+                continue
+            self.sampled += 1
+            if len(self._buffer) >= self.capacity:
+                self.dropped += 1
+                SHADOW_REQUESTS.labels('dropped').inc()
+                continue
+            self._buffer.append((live, request))
+        if self._thread is None and self._buffer:
+            self._start()
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='shadow-scorer', daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            stopping = self._stopping
+            self._drain()
+            if stopping:
+                return
+
+    def _drain(self) -> None:
+        """Score everything buffered so far, batch_size requests at a time."""
+        while self._buffer and not self._stopping:
+            batch: List[Tuple[Any, Dict[str, Any]]] = []
+            while self._buffer and len(batch) < self.batch_size:
+                batch.append(self._buffer.popleft())
+            # A hot reload can change the live model between samples
+            by_live: Dict[int, List] = {}
+            for live, request in batch:
+                by_live.setdefault(id(live), []).append((live, request))
+            for group in by_live.values():
+                try:
+                    self._compare(group[0][0], [request for _, request in group])
+                except Exception as e:
+                    self.failed += len(group)
+                    SHADOW_REQUESTS.labels('failed').inc(len(group))
+                    print(f"⚠️  Shadow scoring failed: {e}", file=sys.stderr)
+            # Let request handlers have the interpreter between batches
+            time.sleep(0)
+
+    def _compare(self, live, requests: List[Dict[str, Any]]) -> None:
+        """Score one batch with both models and add the comparison to the totals."""
+        start = time.perf_counter()
+        live_proba = live.predict_proba_raw(requests)
+        live_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        shadow_proba = self.predictor.predict_proba_raw(requests)
+        shadow_seconds = time.perf_counter() - start
+
+        thresholds = np.array([
+            request.get('confidence_threshold') if request.get('confidence_threshold') is not None
+            else DEFAULT_THRESHOLD
+            for request in requests
+        ], dtype=float)
+        encoders = {
+            'category': (live.category_encoder, self.predictor.category_encoder),
+            'priority': (live.priority_encoder, self.predictor.priority_encoder)
+        }
+        rows = np.arange(len(requests))
+
+        updates = {}
+        for head, live_p, shadow_p in zip(HEADS, live_proba, shadow_proba):
+            live_encoder, shadow_encoder = encoders[head]
+            live_idx = live_p.argmax(axis=1)
+            shadow_idx = shadow_p.argmax(axis=1)
+            live_conf = live_p[rows, live_idx]
+            shadow_conf = shadow_p[rows, shadow_idx]
+            # Compare labels, not indices: a retrained model may have different classes
+            live_labels = live_encoder.classes_[live_idx]
+            shadow_labels = shadow_encoder.classes_[shadow_idx]
+            agree = live_labels == shadow_labels
+            live_served = live_conf >= thresholds
+            shadow_served = shadow_conf >= thresholds
+            served_agree = (live_served == shadow_served) & (agree | ~live_served)
+            delta = shadow_conf - live_conf
+            updates[head] = (
+                int(agree.sum()),
+                int(served_agree.sum()),
+                float(delta.sum()),
+                float(np.abs(delta).sum()),
+                Counter(zip(live_labels[~agree].tolist(), shadow_labels[~agree].tolist()))
+            )
+
+        n = len(requests)
+        with self._stats_lock:
+            self.scored += n
+            self._live_seconds += live_seconds
+            self._shadow_seconds += shadow_seconds
+            for head, (agree, served_agree, delta, abs_delta, disagreements) in updates.items():
+                totals = self._heads[head]
+                totals['agree'] += agree
+                totals['served_agree'] += served_agree
+                totals['confidence_delta'] += delta
+                totals['abs_confidence_delta'] += abs_delta
+                totals['disagreements'].update(disagreements)
+
+        SHADOW_REQUESTS.labels('scored').inc(n)
+        SHADOW_SECONDS.labels('live').observe(live_seconds / n)
+        SHADOW_SECONDS.labels('shadow').observe(shadow_seconds / n)
+        for head, (agree, *_) in updates.items():
+            SHADOW_AGREEMENT.labels(head, 'agree').inc(agree)
+            SHADOW_AGREEMENT.labels(head, 'disagree').inc(n - agree)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the thread; samples still buffered are discarded."""
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout)
+        self._buffer.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Agreement, confidence deltas and relative latency over everything scored so far."""
+        with self._stats_lock:
+            scored = self.scored
+            report = {
+                'shadow_model_version': self.predictor.model_version,
+                'sample_rate': self.sample_rate,
+                'sampled': self.sampled,
+                'scored': scored,
+                'buffered': len(self._buffer),
+                'dropped': self.dropped,
+                'failed': self.failed
+            }
+            for head, totals in self._heads.items():
+                report[head] = {
+                    'agreement': totals['agree'] / scored if scored else None,
+                    'served_agreement': totals['served_agree'] / scored if scored else None,
+                    'mean_confidence_delta': (
+                        totals['confidence_delta'] / scored if scored else None
+                    ),
+                    'mean_abs_confidence_delta': (
+                        totals['abs_confidence_delta'] / scored if scored else None
+                    ),
+                    'top_disagreements': [
+                        {'live': live, 'shadow': shadow, 'count': count}
+                        for (live, shadow), count in totals['disagreements'].most_common(
+                            TOP_DISAGREEMENTS
+                        )
+                    ]
+                }
+            report['latency'] = {
+                'live_ms_per_request': 1000.0 * self._live_seconds / scored if scored else None,
+                'shadow_ms_per_request': 1000.0 * self._shadow_seconds / scored if scored else None,
+                'shadow_to_live_ratio': (
+                    self._shadow_seconds / self._live_seconds if self._live_seconds else None
+                )
+            }
+        return report
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+    import json
+    from pathlib import Path
+
+    from src.models.predict import RequestPredictor
+    from src.serving.batcher import _drive
+
+    parser = argparse.ArgumentParser(
+        description="Compare /predict latency with shadow scoring on and off"
+    )
+    parser.add_argument('--shadow-models-dir', required=True, help='Candidate model directory')
+    parser.add_argument('--shadow-data-dir', default=None,
+                        help='Candidate preprocessing artifacts (default: the live data dir)')
+    parser.add_argument('--sample-rate', type=float, default=0.1, help='Share of requests shadowed')
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per run')
+    parser.add_argument('--concurrency', type=int, default=64, help='Concurrent in-flight requests')
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).parents[2] / 'api'))
+    import app as api_app
+
+    live = api_app.model_manager.current
+    if live is None:
+        sys.exit("Models not loaded; train models first")
+    # Unique titles, so the prediction cache doesn't hide scoring cost
+    live.cache = None
+    candidate = RequestPredictor(
+        args.shadow_models_dir, args.shadow_data_dir or api_app.model_manager.data_dir,
+        cache_size=0, instrument=False
+    )
+
+    report: Dict[str, Any] = {}
+    for mode, shadow in [('off', None), ('on', ShadowEvaluator(candidate, args.sample_rate))]:
+        api_app.shadow = shadow
+        # Same warm-up for both runs, then the measured run
+        asyncio.run(_drive(api_app.app, 200, args.concurrency))
+        report[f'shadow_{mode}'] = asyncio.run(_drive(api_app.app, args.requests, args.concurrency))
+        if shadow is not None:
+            # Let the thread finish the backlog before reading the totals
+            while shadow.scored + shadow.dropped + shadow.failed < shadow.sampled:
+                time.sleep(0.05)
+            report[f'shadow_{mode}']['shadow'] = shadow.stats()
+            shadow.close()
+
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,52 @@
+"""
+Shared fixtures: small models trained on a seeded synthetic corpus.
+
+``trained`` runs once per feature mode (TF-IDF and hashing) and yields the model and
+processed-data directories, with a model bundle exported next to the pickles, so tests
+can load either artifact format.
+"""
+
+import contextlib
+import io
+from pathlib import Path
+
+import pytest
+
+from src.benchmarks.run_benchmarks import write_features
+from src.data.synthetic import generate_corpus
+from src.models import train_model
+
+API_DIR = Path(__file__).parents[2] / 'api'
+CORPUS_ROWS = 600
+
+
+@pytest.fixture(scope='session')
+def corpus():
+    return generate_corpus(CORPUS_ROWS, seed=7)
+
+
+@pytest.fixture(scope='session', params=['tfidf', 'hashing'])
+def trained(request, corpus, tmp_path_factory):
+    """(models_dir, data_dir) for a model trained in this feature mode."""
+    root = tmp_path_factory.mktemp(request.param)
+    data_dir, models_dir = root / 'processed', root / 'models'
+    with contextlib.redirect_stdout(io.StringIO()):
+        write_features(corpus, data_dir, feature_mode=request.param)
+        train_model.main(data_dir, models_dir, export_bundle=True, n_jobs=1)
+    return models_dir, data_dir
+
+
+@pytest.fixture(scope='session')
+def api_app():
+    """api/app.py imported with no models, audit log, watcher or similarity index."""
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv('MODEL_PATH', '/nonexistent/models')
+        patch.setenv('PROCESSED_DATA_PATH', '/nonexistent/processed')
+        patch.setenv('AUDIT_LOG_PATH', '')
+        patch.setenv('MODEL_WATCH_INTERVAL', '0')
+        patch.setenv('SIMILARITY_INDEX_PATH', '/nonexistent/similarity')
+        patch.delenv('SHADOW_MODEL_PATH', raising=False)
+        patch.syspath_prepend(str(API_DIR))
+        with contextlib.redirect_stdout(io.StringIO()):
+            import app
+    return app
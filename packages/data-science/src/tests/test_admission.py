@@ -0,0 +1,100 @@
+"""Admission control and load shedding (src/serving/admission.py)."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from src.serving.admission import AdmissionController, AdmissionMiddleware, Overloaded
+
+
+async def ok_app(scope, receive, send):
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b'ok'})
+
+
+def post(app, path, headers=None):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://ds-api') as client:
+            return await client.post(path, json={}, headers=headers)
+    return asyncio.run(run())
+
+
+def test_full_queue_is_shed_with_retry_after():
+    controller = AdmissionController(max_concurrency=1, max_queue=0, default_deadline=5.0)
+    assert controller.try_acquire()
+    app = AdmissionMiddleware(ok_app, controller)
+
+    response = post(app, '/predict')
+    assert response.status_code == 503
+    assert response.json() == {'detail': 'Prediction queue full'}
+    assert int(response.headers['retry-after']) >= 1
+    assert controller.saturated()
+    assert controller.stats()['shed'] == 1
+
+    # Other routes are never queued
+    assert post(app, '/health').status_code == 200
+
+
+def test_requests_that_cannot_meet_their_deadline_are_shed():
+    controller = AdmissionController(max_concurrency=1, max_queue=10)
+    assert controller.try_acquire()
+    controller.release(2.0)  # 2 s per request
+    assert controller.try_acquire()
+    app = AdmissionMiddleware(ok_app, controller)
+
+    response = post(app, '/predict', headers={'X-Request-Timeout': '3'})
+    assert response.status_code == 503
+    assert 'deadline' in response.json()['detail']
+    assert controller.stats()['queued'] == 0
+
+
+def test_queued_request_runs_when_a_slot_frees():
+    controller = AdmissionController(max_concurrency=1, max_queue=10, default_deadline=5.0)
+
+    async def run():
+        assert controller.try_acquire()
+        waiter = asyncio.ensure_future(controller.acquire(time.monotonic() + 5.0))
+        await asyncio.sleep(0)
+        assert controller.stats()['queued'] == 1
+        controller.release(0.01)
+        await waiter
+        return controller.stats()
+
+    stats = asyncio.run(run())
+    assert (stats['in_flight'], stats['queued'], stats['admitted']) == (1, 0, 2)
+
+
+def test_queued_request_expires_at_its_deadline():
+    controller = AdmissionController(max_concurrency=1, max_queue=10)
+
+    async def run():
+        assert controller.try_acquire()
+        with pytest.raises(Overloaded, match='deadline passed'):
+            await controller.acquire(time.monotonic() + 0.05)
+
+    asyncio.run(run())
+    stats = controller.stats()
+    assert (stats['expired'], stats['queued'], stats['in_flight']) == (1, 0, 1)
+
+
+def test_disconnected_client_is_dropped_from_the_queue():
+    controller = AdmissionController(max_concurrency=1, max_queue=10)
+
+    async def run():
+        assert controller.try_acquire()
+        disconnected = asyncio.Event()
+        waiter = asyncio.ensure_future(controller.acquire(time.monotonic() + 5.0, disconnected))
+        await asyncio.sleep(0)
+        disconnected.set()
+        with pytest.raises(ConnectionAbortedError):
+            await waiter
+
+    asyncio.run(run())
+    stats = controller.stats()
+    assert (stats['disconnected'], stats['queued'], stats['in_flight']) == (1, 0, 1)
+    # The held slot goes back to the pool, not to the departed request
+    controller.release(0.01)
+    assert controller.stats()['in_flight'] == 0
@@ -0,0 +1,110 @@
+"""Routes of api/app.py, served in-process with models in each feature mode."""
+
+import contextlib
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.features.vectorizers import load_feature_config
+
+
+@pytest.fixture
+def client(api_app, trained):
+    models_dir, data_dir = trained
+    with contextlib.redirect_stdout(io.StringIO()):
+        api_app.model_manager.reload(models_dir=str(models_dir), data_dir=str(data_dir))
+    with TestClient(api_app.app) as client:
+        yield client
+
+
+REQUEST = {'title': 'Password reset', 'description': 'I cannot log in to my account'}
+
+
+def test_predict_batch_matches_single_calls(client):
+    requests = [
+        REQUEST,
+        {'title': 'Invoice charged twice', 'description': 'Refund the duplicate payment'},
+        {'title': 'App crashes', 'description': 'Error 500 when I open the dashboard'}
+    ]
+    response = client.post('/predict/batch', json={'requests': requests})
+    assert response.status_code == 200
+    predictions = response.json()['predictions']
+    assert len(predictions) == len(requests)
+    for request, prediction in zip(requests, predictions):
+        single = client.post('/predict', json=request).json()
+        assert prediction['predicted_category'] == single['predicted_category']
+        assert prediction['category_confidence'] == single['category_confidence']
+
+    assert client.post('/predict/batch', json={'requests': []}).status_code == 422
+
+
+def test_predict_is_the_same_with_batching_off(api_app, client, monkeypatch):
+    request = {**REQUEST, 'confidence_threshold': None, 'top_k': 2}
+    batched = client.post('/predict', json=request).json()
+    monkeypatch.setattr(api_app, 'batcher', None)
+    unbatched = client.post('/predict', json=request).json()
+    assert unbatched['predicted_category'] == batched['predicted_category']
+    assert unbatched['category_top_k'] == batched['category_top_k']
+
+
+def test_models_not_loaded(api_app):
+    with TestClient(api_app.app) as client:
+        previous, api_app.model_manager.current = api_app.model_manager.current, None
+        try:
+            assert client.get('/health').status_code == 503
+            assert client.post('/predict', json=REQUEST).status_code == 503
+        finally:
+            api_app.model_manager.current = previous
+
+
+def test_metrics_count_requests(client):
+    client.post('/predict', json=REQUEST)
+    text = client.get('/metrics').text
+    assert 'ds_http_requests_total{path="/predict",status="200"}' in text
+    assert 'ds_admission_total{outcome="admitted"}' in text
+
+
+def test_predict(client, trained):
+    response = client.post('/predict', json={**REQUEST, 'top_k': 2})
+    assert response.status_code == 200
+    body = response.json()
+    assert 0.0 <= body['category_confidence'] <= 1.0
+    assert len(body['category_top_k']) == 2
+    assert 'category_terms' not in body
+
+    # A threshold above any confidence nulls the labels
+    body = client.post('/predict', json={**REQUEST, 'confidence_threshold': 1.0}).json()
+    assert body['predicted_category'] is None and body['predicted_priority'] is None
+
+    assert client.post('/predict', json={'title': '', 'description': 'x'}).status_code == 422
+
+
+def test_health_and_root(client):
+    health = client.get('/health').json()
+    assert health['status'] == 'healthy'
+    assert health['admission']['saturated'] is False
+    assert client.get('/').json()['status'] == 'running'
+
+
+def test_model_info_reports_feature_count(client, trained):
+    _, data_dir = trained
+    response = client.get('/model-info')
+    assert response.status_code == 200
+    body = response.json()
+    assert body['feature_count'] == load_feature_config(data_dir)['n_features']
+    assert body['category_classes']
+
+
+def test_drift_counts_live_traffic_only(client):
+    # The reload's warm-up requests are not traffic
+    assert client.get('/drift').json()['rows_since_start'] == 0
+
+    assert client.post('/predict', json=REQUEST).status_code == 200
+    assert client.post('/predict', json={**REQUEST, 'top_terms': 3}).status_code == 200
+    assert client.get('/drift').json()['rows_since_start'] == 2
+
+
+def test_reload_warm_up_leaves_cache_empty(client, api_app):
+    stats = api_app.model_manager.current.cache.stats()
+    assert (stats['size'], stats['hits'], stats['misses']) == (0, 0, 0)
@@ -0,0 +1,90 @@
+"""Prediction audit log (src/serving/audit.py) and accuracy join (src/monitoring/accuracy.py)."""
+
+import time
+
+import pandas as pd
+import pytest
+
+from src.monitoring.accuracy import accuracy_by_version
+from src.serving.audit import AuditLog, input_hash, read_audit_log
+
+
+def served(n, version='1.0.0', category='billing', priority='P2'):
+    """n (request, result) pairs as /predict would record them."""
+    return [
+        (
+            {'request_id': f'REQ-{i:03d}', 'title': f'Ticket {i}', 'description': 'Refund me'},
+            {
+                'timestamp': f'2024-03-01T00:00:{i:02d}', 'model_version': version,
+                'predicted_category': category, 'category_confidence': 0.9,
+                'predicted_priority': priority, 'priority_confidence': 0.7
+            }
+        )
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize('name', ['predictions.jsonl', 'predictions.db'])
+def test_close_flushes_everything_buffered(tmp_path, name):
+    audit = AuditLog(str(tmp_path / name), flush_interval=60)
+    for request, result in served(25):
+        audit.record(request, result)
+    audit.close()
+
+    log = read_audit_log(tmp_path / name)
+    assert audit.stats()['written'] == 25 and len(log) == 25
+    assert log['request_id'].tolist() == [f'REQ-{i:03d}' for i in range(25)]
+    assert log['input_hash'][0] == input_hash('Ticket 0', 'Refund me')
+
+
+def test_a_full_batch_is_written_without_waiting_for_the_interval(tmp_path):
+    audit = AuditLog(str(tmp_path / 'predictions.jsonl'), batch_size=10, flush_interval=60)
+    for request, result in served(10):
+        audit.record(request, result)
+    deadline = time.monotonic() + 5
+    while audit.written < 10 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert audit.written == 10
+    audit.close()
+
+
+def test_a_full_buffer_drops_records_instead_of_growing(tmp_path):
+    audit = AuditLog(str(tmp_path / 'predictions.jsonl'), capacity=5, flush_interval=60)
+    # The writer sleeps until the interval or a full batch, so nothing drains meanwhile
+    for request, result in served(8):
+        audit.record(request, result)
+    assert audit.stats()['buffered'] == 5 and audit.dropped == 3
+    audit.close()
+    assert len(read_audit_log(tmp_path / 'predictions.jsonl')) == 5
+
+
+def test_accuracy_counts_each_ticket_once_per_model_version():
+    predictions = pd.DataFrame([
+        # REQ-1 was edited and predicted again by 1.0.0: only the latest counts
+        ('2024-03-01T00:00:00', 'REQ-1', '1.0.0', 'account', 0.9, 'P1', 0.8),
+        ('2024-03-02T00:00:00', 'REQ-1', '1.0.0', 'billing', 0.9, 'P2', 0.8),
+        ('2024-03-01T00:00:00', 'REQ-2', '1.0.0', None, 0.4, 'P3', 0.8),
+        ('2024-03-03T00:00:00', 'REQ-1', '2.0.0', 'billing', 0.9, 'P1', 0.8),
+        # No ticket id, or not in the export: not matched
+        ('2024-03-01T00:00:00', None, '1.0.0', 'billing', 0.9, 'P2', 0.8),
+        ('2024-03-01T00:00:00', 'REQ-9', '2.0.0', 'billing', 0.9, 'P2', 0.8),
+    ], columns=[
+        'timestamp', 'request_id', 'model_version', 'predicted_category',
+        'category_confidence', 'predicted_priority', 'priority_confidence'
+    ])
+    outcomes = pd.DataFrame({
+        'request_id': ['REQ-1', 'REQ-2'],
+        'category': ['billing', 'technical'],
+        'priority': ['P2', 'P3']
+    })
+
+    report = accuracy_by_version(predictions, outcomes)
+    assert report['matched_tickets'] == 3
+    v1 = report['by_model_version']['1.0.0']
+    assert v1['tickets'] == 2
+    assert v1['category'] == pytest.approx({
+        'predicted': 1, 'correct': 1, 'coverage': 0.5, 'accuracy': 1.0, 'mean_confidence': 0.65
+    })
+    assert (v1['priority']['correct'], v1['priority']['accuracy']) == (2, 1.0)
+    v2 = report['by_model_version']['2.0.0']
+    assert v2['tickets'] == 1 and v2['priority']['accuracy'] == 0.0
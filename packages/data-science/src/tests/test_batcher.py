@@ -0,0 +1,73 @@
+"""Micro-batching of concurrent predictions (src/serving/batcher.py)."""
+
+import asyncio
+
+from src.serving.batcher import MicroBatcher
+
+
+def tagging(tag, calls):
+    """A batch function that records its batches and labels results with its tag."""
+    def batch_fn(items):
+        calls.append((tag, [item['n'] for item in items]))
+        return [{'n': item['n'], 'by': tag} for item in items]
+    return batch_fn
+
+
+def test_requests_pinned_to_a_predictor_are_not_mixed():
+    calls = []
+    old, new = tagging('old', calls), tagging('new', calls)
+    batcher = MicroBatcher(max_batch_size=8, max_wait_ms=20)
+
+    async def run():
+        return await asyncio.gather(*(
+            batcher.submit({'n': n}, old if n % 2 else new) for n in range(6)
+        ))
+
+    results = asyncio.run(run())
+    assert [result['by'] for result in results] == ['new', 'old'] * 3
+    assert sorted(calls) == [('new', [0, 2, 4]), ('old', [1, 3, 5])]
+
+
+def test_batches_are_capped_and_results_returned_in_order():
+    calls = []
+    only = tagging('only', calls)
+    batcher = MicroBatcher(max_batch_size=4, max_wait_ms=20)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit({'n': n}, only) for n in range(10)))
+
+    results = asyncio.run(run())
+    assert [result['n'] for result in results] == list(range(10))
+    assert [len(batch) for _, batch in calls] == [4, 4, 2]
+    stats = batcher.stats()
+    assert (stats['batches'], stats['items'], stats['max_seen_batch']) == (3, 10, 4)
+
+
+def test_a_failing_batch_fails_its_callers_only():
+    def failing(items):
+        raise RuntimeError('model exploded')
+
+    batcher = MicroBatcher(max_batch_size=8, max_wait_ms=20)
+
+    async def run():
+        return await asyncio.gather(
+            batcher.submit({'n': 0}, failing), batcher.submit({'n': 1}, tagging('ok', [])),
+            return_exceptions=True
+        )
+
+    failed, ok = asyncio.run(run())
+    assert isinstance(failed, RuntimeError)
+    assert ok == {'n': 1, 'by': 'ok'}
+
+
+def test_stop_fails_queued_requests():
+    batcher = MicroBatcher(max_batch_size=8, max_wait_ms=1000)
+
+    async def run():
+        pending = asyncio.ensure_future(batcher.submit({'n': 0}, tagging('only', [])))
+        await asyncio.sleep(0)
+        await batcher.stop()
+        return await asyncio.gather(pending, return_exceptions=True)
+
+    (result,) = asyncio.run(run())
+    assert isinstance(result, RuntimeError)
@@ -0,0 +1,51 @@
+"""Scripted feature pipeline and its normalized-text cache (src/features/build_features.py)."""
+
+from src.features import build_features
+from src.features.build_features import NormalizedTextCache, combined_text
+from src.features.normalize import normalize_texts
+
+
+def test_unchanged_rows_are_served_from_the_cache(corpus, tmp_path):
+    df = corpus.head(50)
+    cache = NormalizedTextCache.load(tmp_path)
+    texts, stats = cache.normalize(df['id'], combined_text(df), workers=1)
+    assert stats == {'cached': 0, 'normalized': 50}
+    assert texts == normalize_texts(combined_text(df))
+    cache.save()
+
+    cache = NormalizedTextCache.load(tmp_path)
+    again, stats = cache.normalize(df['id'], combined_text(df), workers=1)
+    assert stats == {'cached': 50, 'normalized': 0}
+    assert again == texts
+
+
+def test_edited_and_unkeyed_rows_are_normalized_again(corpus, tmp_path):
+    df = corpus.head(20).copy()
+    cache = NormalizedTextCache.load(tmp_path)
+    cache.normalize(df['id'], combined_text(df), workers=1)
+
+    df.loc[df.index[3], 'description'] = 'Refund never arrived for the duplicate invoice'
+    df.loc[df.index[5], 'id'] = None
+    texts, stats = cache.normalize(df['id'], combined_text(df), workers=1)
+    assert stats == {'cached': 18, 'normalized': 2}
+    assert texts[3] == normalize_texts(combined_text(df.iloc[[3]]))[0]
+    # The edit replaced the stale entry instead of adding a second one
+    assert cache.entries.index.is_unique and len(cache.entries) == 20
+
+
+def test_normalizer_change_starts_a_fresh_cache(corpus, tmp_path, monkeypatch):
+    df = corpus.head(10)
+    cache = NormalizedTextCache.load(tmp_path)
+    cache.normalize(df['id'], combined_text(df), workers=1)
+    cache.save()
+    old_path = cache.path
+
+    monkeypatch.setattr(build_features, 'NORMALIZER_VERSION', -1)
+    cache = NormalizedTextCache.load(tmp_path)
+    assert cache.path != old_path
+    _, stats = cache.normalize(df['id'], combined_text(df), workers=1)
+    assert stats['cached'] == 0
+
+    cache.save()
+    # The old settings' cache can never be hit again, so saving removes it
+    assert [path.name for path in tmp_path.glob('normalized-*')] == [cache.path.name]
@@ -0,0 +1,93 @@
+"""Model bundle export and selection (src/models/bundle.py)."""
+
+import contextlib
+import io
+import json
+import shutil
+
+import numpy as np
+import pytest
+
+from src.models import train_model
+from src.models.bundle import ARRAYS_FILE, BUNDLE_DIRNAME, ModelBundle, bundle_is_current
+from src.models.predict import RequestPredictor
+
+
+def load_predictor(models_dir, data_dir, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return RequestPredictor(str(models_dir), str(data_dir), cache_size=0, **kwargs)
+
+
+@pytest.fixture
+def models_copy(trained, tmp_path):
+    models_dir, data_dir = trained
+    shutil.copytree(models_dir, tmp_path / 'models')
+    return tmp_path / 'models', data_dir
+
+
+def test_bundle_served_when_current(trained):
+    models_dir, data_dir = trained
+    assert bundle_is_current(models_dir)
+    predictor = load_predictor(models_dir, data_dir)
+    assert predictor.category_model is None
+    with open(models_dir / 'metadata.json') as f:
+        assert predictor.trained_at == json.load(f)['training_info']['trained_at']
+
+
+def test_bundle_predicts_like_the_pickles(trained, corpus):
+    models_dir, data_dir = trained
+    from_bundle = load_predictor(models_dir, data_dir, use_bundle=True)
+    from_pickles = load_predictor(models_dir, data_dir, use_bundle=False)
+    requests = corpus.head(50)[['title', 'description']].to_dict('records')
+
+    for bundle_proba, pickle_proba in zip(
+        from_bundle.predict_proba_raw(requests), from_pickles.predict_proba_raw(requests)
+    ):
+        np.testing.assert_allclose(bundle_proba, pickle_proba, atol=1e-9)
+
+    def labels(predictor):
+        return [
+            (result['predicted_category'], result['predicted_priority'])
+            for result in predictor.predict_batch(requests)
+        ]
+    assert labels(from_bundle) == labels(from_pickles)
+
+
+def test_stale_bundle_is_not_served(models_copy):
+    models_dir, data_dir = models_copy
+    metadata_path = models_dir / 'metadata.json'
+    with open(metadata_path) as f:
+        metadata = json.load(f)
+    metadata['training_info']['trained_at'] = '2000-01-01T00:00:00'
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f)
+
+    assert not bundle_is_current(models_dir)
+    assert load_predictor(models_dir, data_dir).category_model is not None
+    with pytest.raises(ValueError, match='not exported'):
+        load_predictor(models_dir, data_dir, use_bundle=True)
+
+
+def test_retrain_without_export_removes_bundle(models_copy):
+    models_dir, data_dir = models_copy
+    with contextlib.redirect_stdout(io.StringIO()):
+        train_model.main(data_dir, models_dir, n_jobs=1)
+    assert not (models_dir / BUNDLE_DIRNAME).exists()
+    assert load_predictor(models_dir, data_dir).category_model is not None
+
+
+def test_reexport_leaves_a_mapped_bundle_intact(models_copy):
+    models_dir, data_dir = models_copy
+    bundle_dir = models_dir / BUNDLE_DIRNAME
+    served = ModelBundle(bundle_dir)
+    weights = np.array(served.scorer.weights)
+    inode = (bundle_dir / ARRAYS_FILE).stat().st_ino
+
+    # Another split gives other weights in an arrays.bin of the same size
+    with contextlib.redirect_stdout(io.StringIO()):
+        train_model.main(data_dir, models_dir, test_size=0.5, export_bundle=True, n_jobs=1)
+
+    assert (bundle_dir / ARRAYS_FILE).stat().st_ino != inode
+    np.testing.assert_array_equal(served.scorer.weights, weights)
+    assert not np.array_equal(ModelBundle(bundle_dir).scorer.weights, weights)
+    assert not list(bundle_dir.glob('.*.tmp'))
@@ -0,0 +1,59 @@
+"""Threshold curves and threshold selection (src/models/evaluation.py)."""
+
+import numpy as np
+import pytest
+
+from src.models.evaluation import select_thresholds, threshold_sweep
+
+CLASSES = ['a', 'b', 'c']
+
+
+def brute_force(y_proba, y_true, threshold, column=None):
+    """(coverage, accuracy) at one threshold, counting predictions one by one."""
+    y_pred = y_proba.argmax(axis=1)
+    confidence = y_proba.max(axis=1)
+    rows = np.ones(len(y_pred), dtype=bool) if column is None else y_pred == column
+    accepted = rows & (confidence >= threshold)
+    coverage = accepted.sum() / max(rows.sum(), 1)
+    accuracy = (y_pred == y_true)[accepted].mean() if accepted.any() else None
+    return coverage, accuracy
+
+
+def test_sweep_matches_brute_force():
+    rng = np.random.default_rng(3)
+    y_proba = rng.dirichlet(np.ones(3), size=200)
+    y_true = rng.integers(0, 3, size=200)
+    curve = threshold_sweep(y_proba, y_true, CLASSES)
+
+    for i, threshold in enumerate(curve['thresholds']):
+        coverage, accuracy = brute_force(y_proba, y_true, threshold)
+        assert curve['overall']['coverage'][i] == pytest.approx(coverage, abs=1e-6)
+        assert curve['overall']['accuracy'][i] == pytest.approx(accuracy, abs=1e-6)
+        for column, label in enumerate(CLASSES):
+            coverage, accuracy = brute_force(y_proba, y_true, threshold, column)
+            assert curve['per_class'][label]['coverage'][i] == pytest.approx(coverage, abs=1e-6)
+            assert curve['per_class'][label]['accuracy'][i] == pytest.approx(accuracy, abs=1e-6)
+    assert sum(curve['per_class'][label]['support'] for label in CLASSES) == 200
+
+
+def test_sweep_without_grid_uses_each_confidence():
+    y_proba = np.array([[0.9, 0.1, 0.0], [0.3, 0.6, 0.1], [0.5, 0.2, 0.3]])
+    curve = threshold_sweep(y_proba, np.array([0, 0, 0]), CLASSES, grid=None)
+    assert curve['thresholds'] == [0.9, 0.6, 0.5]
+    assert curve['overall']['coverage'] == pytest.approx([1 / 3, 2 / 3, 1.0])
+    assert curve['overall']['accuracy'] == pytest.approx([1.0, 0.5, 2 / 3])
+    # 'c' is never predicted
+    assert curve['per_class']['c']['accuracy'] == [None, None, None]
+
+
+def test_select_thresholds():
+    curve = {
+        'thresholds': [0.0, 0.5, 0.9],
+        'per_class': {
+            'a': {'accuracy': [0.7, 0.85, 0.95]},
+            'b': {'accuracy': [0.95, 0.97, 1.0]},
+            'c': {'accuracy': [0.5, 0.6, None]}
+        }
+    }
+    assert select_thresholds(curve, target_accuracy=0.8) == {'a': 0.5, 'b': 0.0, 'c': None}
+    assert select_thresholds(curve, 0.9, default=1.0) == {'a': 0.9, 'b': 0.0, 'c': 1.0}
@@ -0,0 +1,27 @@
+"""Columnar training-data cache (src/data/frame_cache.py)."""
+
+import pytest
+
+from src.data import frame_cache
+
+
+@pytest.fixture
+def no_parquet(monkeypatch):
+    monkeypatch.setattr(frame_cache, 'PARQUET_ENGINES', ('no_such_parquet_engine',))
+    frame_cache.parquet_engine_available.cache_clear()
+    yield
+    frame_cache.parquet_engine_available.cache_clear()
+
+
+def test_pickle_fallback_is_reported(corpus, tmp_path, no_parquet, capsys):
+    source = tmp_path / 'requests.csv'
+    corpus.head(20).to_csv(source, index=False)
+
+    df = frame_cache.load_cached(source, columns=['title'], cache_dir=tmp_path / 'cache')
+    assert list(df.columns) == ['title']
+    assert [path.suffix for path in (tmp_path / 'cache').iterdir()] == ['.pkl']
+    assert 'no Parquet engine' in capsys.readouterr().err
+
+    # Cached: later checks stay quiet
+    frame_cache.load_cached(source, cache_dir=tmp_path / 'cache')
+    assert capsys.readouterr().err == ''
@@ -0,0 +1,106 @@
+"""Paged and incremental backend API loading (src/data/load_data.py)."""
+
+import pandas as pd
+import pytest
+
+from src.data import load_data
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+class FakeBackend:
+    """Serves /api/requests pages from a list of records, recording the pages asked for."""
+
+    def __init__(self, records, page_size=3):
+        self.pages = [records[i:i + page_size] for i in range(0, len(records), page_size)]
+        self.requested = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def get(self, endpoint, params, timeout):
+        self.requested.append(params['page'])
+        return FakeResponse({
+            'data': self.pages[params['page'] - 1],
+            'pagination': {'page': params['page'], 'total_pages': len(self.pages)}
+        })
+
+
+def ticket(number, updated_at):
+    return {'id': f'REQ-{number:03d}', 'title': f'Ticket {number}', 'updated_at': updated_at}
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    def serve(records):
+        fake = FakeBackend(records)
+        monkeypatch.setattr(load_data, '_api_session', lambda *args: fake)
+        return fake
+    return serve
+
+
+def newest_first(n):
+    """n tickets, one day apart, the most recently updated first."""
+    return [ticket(i, f'2024-03-{n - i:02d}T00:00:00Z') for i in range(n)]
+
+
+def test_pages_are_yielded_in_order(backend):
+    records = newest_first(10)
+    backend(records)
+    assert load_data.fetch_api_records(max_workers=3) == records
+
+
+def test_high_water_mark_filters_client_side(backend):
+    fake = backend(newest_first(10))
+    records = load_data.fetch_api_records(
+        updated_since='2024-03-07T00:00:00Z', newest_first=False
+    )
+    assert [record['updated_at'][:10] for record in records] == [
+        '2024-03-10', '2024-03-09', '2024-03-08', '2024-03-07'
+    ]
+    assert sorted(fake.requested) == [1, 2, 3, 4]
+
+
+def test_newest_first_stops_at_the_first_page_below_the_mark(backend):
+    fake = backend(newest_first(18))
+    records = load_data.fetch_api_records(
+        updated_since='2024-03-13T00:00:00Z', newest_first=True, max_workers=1
+    )
+    assert [record['id'] for record in records] == [f'REQ-{i:03d}' for i in range(6)]
+    # Page 3 is entirely older than the mark: at most one page was read ahead of it
+    assert max(fake.requested) <= 4
+
+
+def test_newest_first_keeps_paging_when_the_order_is_wrong(backend):
+    records = newest_first(9)
+    records[3], records[8] = records[8], records[3]
+    fake = backend(records)
+    load_data.fetch_api_records(updated_since='2024-03-08T00:00:00Z', newest_first=True)
+    assert sorted(fake.requested) == [1, 2, 3]
+
+
+def test_sync_merges_by_id_from_the_high_water_mark(backend, tmp_path):
+    store_path = tmp_path / 'api_requests.csv'
+    pd.DataFrame([ticket(1, '2024-03-01T00:00:00Z'), ticket(2, '2024-03-02T00:00:00Z')]).to_csv(
+        store_path, index=False
+    )
+    edited = {**ticket(1, '2024-03-05T00:00:00Z'), 'title': 'Edited'}
+    backend([edited, ticket(3, '2024-03-04T00:00:00Z'), ticket(0, '2024-02-01T00:00:00Z')])
+
+    merged = load_data.sync_from_api(store_path, newest_first=False)
+    assert sorted(merged['id']) == ['REQ-001', 'REQ-002', 'REQ-003']
+    assert merged.set_index('id').loc['REQ-001', 'title'] == 'Edited'
+    assert pd.read_csv(store_path).shape[0] == 3
+    assert not list(tmp_path.glob('.*.tmp'))
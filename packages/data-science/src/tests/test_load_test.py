@@ -0,0 +1,41 @@
+"""Load test driver (src/benchmarks/load_test.py)."""
+
+import asyncio
+
+import pytest
+
+from src.benchmarks.load_test import run_load
+
+SERVICE_SECONDS = 0.05
+
+
+class SlowClient:
+    """Answers every call with 200 after a fixed service time."""
+
+    class Response:
+        status_code = 200
+
+    async def post(self, path, json):
+        await asyncio.sleep(SERVICE_SECONDS)
+        return self.Response()
+
+
+def load(**kwargs):
+    return asyncio.run(run_load(
+        SlowClient(), ['title'], ['description'], health_interval=0, **kwargs
+    ))
+
+
+def test_closed_loop_latency_is_the_service_time():
+    report = load(concurrency=2, n_requests=10)
+    assert report['requests'] == 10
+    assert report['latency']['p99_ms'] == pytest.approx(1000 * SERVICE_SECONDS, rel=0.5)
+    assert report['max_schedule_lag_ms'] is None
+
+
+def test_rate_mode_counts_the_wait_for_a_free_user():
+    # 200 arrivals/s against one user that needs 50 ms per call: the queue keeps growing
+    report = load(concurrency=1, n_requests=20, rate=200.0)
+    # Service time alone would put every call near 50 ms
+    assert report['latency']['max_ms'] > 4 * 1000 * SERVICE_SECONDS
+    assert report['latency']['max_ms'] >= report['max_schedule_lag_ms']
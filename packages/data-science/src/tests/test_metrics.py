@@ -0,0 +1,64 @@
+"""In-process metrics and their Prometheus rendering (src/monitoring/metrics.py)."""
+
+import contextlib
+import io
+
+import pytest
+
+from src.models.predict import RequestPredictor
+from src.monitoring.metrics import BATCH_SIZE, PREDICTIONS, STAGE_SECONDS, Registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    latency = registry.histogram('latency_seconds', 'Latency', ['route'], buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.labels('/predict').observe(value)
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ['# HELP latency_seconds Latency', '# TYPE latency_seconds histogram']
+    assert lines[2:] == [
+        'latency_seconds_bucket{route="/predict",le="0.1"} 2',
+        'latency_seconds_bucket{route="/predict",le="1.0"} 3',
+        'latency_seconds_bucket{route="/predict",le="+Inf"} 4',
+        'latency_seconds_sum{route="/predict"} 3.65',
+        'latency_seconds_count{route="/predict"} 4'
+    ]
+
+
+def test_counter_children_per_label_values():
+    registry = Registry()
+    requests = registry.counter('requests_total', 'Requests', ['path', 'status'])
+    requests.labels('/predict', 200).inc()
+    requests.labels('/predict', '200').inc(2)
+    requests.labels('/health', '200').inc()
+
+    assert registry.render().splitlines()[2:] == [
+        'requests_total{path="/health",status="200"} 1',
+        'requests_total{path="/predict",status="200"} 3'
+    ]
+    with pytest.raises(ValueError, match='expects labels'):
+        requests.labels('/predict')
+    with pytest.raises(ValueError, match='already registered'):
+        registry.counter('requests_total', 'Requests again')
+
+
+def test_predictor_records_stages_only_when_instrumented(trained):
+    models_dir, data_dir = trained
+
+    def counts():
+        return (
+            STAGE_SECONDS.labels('vectorize').snapshot()[2],
+            BATCH_SIZE.labels().snapshot()[2],
+            PREDICTIONS.labels('category').value
+        )
+
+    requests = [{'title': f'Password reset {i}', 'description': 'Cannot log in'} for i in range(3)]
+    for instrument, expected in ((True, (1, 1, 3)), (False, (0, 0, 0))):
+        with contextlib.redirect_stdout(io.StringIO()):
+            predictor = RequestPredictor(
+                str(models_dir), str(data_dir), cache_size=8, instrument=instrument
+            )
+        before = counts()
+        predictor.predict_batch(requests)
+        assert tuple(after - start for after, start in zip(counts(), before)) == expected
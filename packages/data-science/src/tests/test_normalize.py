@@ -0,0 +1,28 @@
+"""Shared text normalizer (src/features/normalize.py) against the notebook's tokenization."""
+
+import re
+from pathlib import Path
+
+import pandas as pd
+from nltk.tokenize.destructive import NLTKWordTokenizer
+
+from src.features.normalize import STOPWORDS, TextNormalizer, combine_fields
+
+MOCK_REQUESTS = Path(__file__).parents[4] / 'contracts' / 'mock-data' / 'requests.csv'
+
+
+def notebook_tokens(text):
+    """The notebook's steps without lemmatization; word_tokenize minus punkt's sentence split."""
+    tokens = NLTKWordTokenizer().tokenize(re.sub(r'[^a-z\s]', '', text.lower()))
+    return ' '.join(token for token in tokens if token not in STOPWORDS)
+
+
+def test_matches_word_tokenize():
+    df = pd.read_csv(MOCK_REQUESTS)
+    texts = [combine_fields(t, d) for t, d in zip(df['title'], df['description'])]
+    texts += ["Gotta fix this, I wanna export", "Gimme access, lemme in, we're gonna wanna"]
+    normalizer = TextNormalizer(lemmatize=False)
+
+    assert [normalizer.normalize(text) for text in texts] == [notebook_tokens(t) for t in texts]
+    assert normalizer.normalize('Cannot access billing dashboard') == 'access billing dashboard'
+    assert normalizer.normalize('Gotta go') == 'got ta go'
@@ -0,0 +1,123 @@
+"""RequestPredictor loading and scoring (src/models/predict.py)."""
+
+import contextlib
+import io
+import json
+import shutil
+
+import pytest
+
+from src.features.normalize import NORMALIZER_VERSION, lemmatization_available
+from src.features.vectorizers import load_feature_config
+from src.models.predict import RequestPredictor
+
+
+def load_predictor(models_dir, data_dir, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return RequestPredictor(str(models_dir), str(data_dir), cache_size=0, **kwargs)
+
+
+def test_features_record_lemmatization(trained):
+    _, data_dir = trained
+    assert load_feature_config(data_dir)['lemmatize'] == lemmatization_available()
+
+
+def test_refuses_models_normalized_differently(trained, tmp_path):
+    models_dir, data_dir = trained
+    shutil.copytree(models_dir, tmp_path / 'models')
+    metadata_path = tmp_path / 'models' / 'metadata.json'
+    with open(metadata_path) as f:
+        metadata = json.load(f)
+    metadata['features']['lemmatize'] = not lemmatization_available()
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f)
+
+    with pytest.raises(ValueError, match='lemmatization'):
+        load_predictor(tmp_path / 'models', data_dir)
+
+
+def test_refuses_models_from_another_normalizer_version(trained, tmp_path):
+    models_dir, data_dir = trained
+    shutil.copytree(models_dir, tmp_path / 'models')
+    metadata_path = tmp_path / 'models' / 'metadata.json'
+    with open(metadata_path) as f:
+        metadata = json.load(f)
+    assert metadata['features']['normalizer_version'] == NORMALIZER_VERSION
+    del metadata['features']['normalizer_version']
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f)
+
+    with pytest.raises(ValueError, match='normalizer version 1'):
+        load_predictor(tmp_path / 'models', data_dir)
+
+
+def test_predict_batch_matches_predict(trained, corpus):
+    predictor = load_predictor(*trained)
+    requests = corpus[['title', 'description']].head(40).to_dict('records')
+    requests[3]['confidence_threshold'] = 1.0
+    requests.append({'title': '', 'description': ''})
+
+    for request, result in zip(requests, predictor.predict_batch(requests)):
+        single = predictor.predict(
+            request['title'], request['description'],
+            confidence_threshold=request.get('confidence_threshold', 0.6)
+        )
+        assert result['predicted_category'] == single['predicted_category']
+        assert result['predicted_priority'] == single['predicted_priority']
+        assert result['category_confidence'] == pytest.approx(single['category_confidence'])
+        assert result['priority_confidence'] == pytest.approx(single['priority_confidence'])
+    assert predictor.predict_batch([]) == []
+
+
+def test_top_k_lists_the_most_likely_classes(trained):
+    predictor = load_predictor(*trained)
+    result = predictor.predict(
+        'Invoice charged twice', 'Refund the duplicate payment',
+        confidence_threshold=0.0, top_k=3
+    )
+    top_k = result['category_top_k']
+    assert len(top_k) == 3
+    assert top_k[0] == {
+        'label': result['predicted_category'], 'confidence': result['category_confidence']
+    }
+    assert [entry['confidence'] for entry in top_k] == sorted(
+        (entry['confidence'] for entry in top_k), reverse=True
+    )
+    assert 'category_terms' not in result
+    assert 'category_top_k' not in predictor.predict('Invoice charged twice', 'Refund')
+
+
+def test_term_attributions_match_the_model_weights(trained):
+    predictor = load_predictor(*trained, use_bundle=False)
+    title, description = 'Invoice charged twice', 'Refund the duplicate payment for my card'
+    result = predictor.predict(title, description, confidence_threshold=0.0, top_terms=3)
+    terms = result['category_terms']
+    assert 0 < len(terms) <= 3
+    assert all(entry['weight'] > 0 for entry in terms)
+    assert [entry['weight'] for entry in terms] == sorted(
+        (entry['weight'] for entry in terms), reverse=True
+    )
+
+    # x_j * (w_j[class] - mean_j), recomputed from the sklearn head
+    text = predictor.preprocess_text(title, description)
+    X = predictor.vectorizer.transform([text])
+    model = predictor.category_model
+    class_index = list(predictor.category_encoder.classes_).index(result['predicted_category'])
+    centered = model.coef_[class_index] - model.coef_.mean(axis=0)
+    expected = {j: X[0, j] * centered[j] for j in X.indices}
+    best = max(expected, key=expected.get)
+    assert terms[0]['weight'] == pytest.approx(expected[best])
+    for entry in terms:
+        assert set(entry['term'].split()) <= set(text.split())
+
+
+def test_bundle_attributes_the_same_terms(trained):
+    from_bundle = load_predictor(*trained, use_bundle=True)
+    from_pickles = load_predictor(*trained, use_bundle=False)
+    args = ('Cannot log in', 'Password reset link expired again')
+    bundle_terms = from_bundle.predict(*args, top_terms=5)['priority_terms']
+    pickle_terms = from_pickles.predict(*args, top_terms=5)['priority_terms']
+    assert [entry['term'] for entry in bundle_terms] == [entry['term'] for entry in pickle_terms]
+    assert [entry['weight'] for entry in bundle_terms] == pytest.approx(
+        [entry['weight'] for entry in pickle_terms]
+    )
@@ -0,0 +1,72 @@
+"""In-process prediction cache (src/models/cache.py)."""
+
+import contextlib
+import io
+
+import numpy as np
+
+from src.models import cache as cache_module
+from src.models.cache import PredictionCache, make_cache_key
+from src.models.predict import RequestPredictor
+
+
+def entry(value):
+    return np.array([value]), np.array([1.0 - value])
+
+
+def test_keys_depend_on_text_and_model_version():
+    key = make_cache_key('reset password', '1.0.0')
+    assert key == make_cache_key('reset password', '1.0.0')
+    assert key != make_cache_key('reset password', '1.0.1')
+    assert key != make_cache_key('reset passwords', '1.0.0')
+
+
+def test_least_recently_used_is_evicted():
+    cache = PredictionCache(max_size=2, ttl_seconds=0)
+    cache.put(b'a', entry(0.1))
+    cache.put(b'b', entry(0.2))
+    assert cache.get(b'a') is not None
+    cache.put(b'c', entry(0.3))
+
+    assert cache.get(b'b') is None
+    assert cache.get(b'a')[0][0] == 0.1
+    stats = cache.stats()
+    assert (stats['size'], stats['evictions'], stats['hits'], stats['misses']) == (2, 1, 2, 1)
+
+
+def test_entries_expire(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+    cache = PredictionCache(max_size=10, ttl_seconds=60)
+    cache.put(b'a', entry(0.5))
+
+    now[0] += 59
+    assert cache.get(b'a') is not None
+    now[0] += 1
+    assert cache.get(b'a') is None
+    assert cache.stats()['expirations'] == 1
+    assert cache.stats()['size'] == 0
+
+
+def test_zero_size_disables_caching():
+    cache = PredictionCache(max_size=0)
+    cache.put(b'a', entry(0.5))
+    assert cache.get(b'a') is None
+    assert cache.stats()['size'] == 0
+
+
+def test_threshold_is_applied_after_lookup(trained):
+    models_dir, data_dir = trained
+    with contextlib.redirect_stdout(io.StringIO()):
+        predictor = RequestPredictor(
+            str(models_dir), str(data_dir), cache_size=16, instrument=False
+        )
+    title, description = 'Password reset', 'I cannot log in to my account'
+
+    first = predictor.predict(title, description, confidence_threshold=0.0)
+    # Same text after normalization: served from the cache with its own threshold
+    second = predictor.predict(title.upper() + '  ', description, confidence_threshold=1.0)
+    assert predictor.cache.stats()['hits'] == 1
+    assert second['category_confidence'] == first['category_confidence']
+    assert first['predicted_category'] is not None
+    assert second['predicted_category'] is None and second['predicted_priority'] is None
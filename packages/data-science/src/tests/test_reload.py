@@ -0,0 +1,62 @@
+"""Watching the model directory for retrained models (src/serving/reload.py)."""
+
+import os
+
+from src.models.bundle import BUNDLE_DIRNAME, MANIFEST_FILE
+from src.serving.reload import ModelManager
+
+
+class StubPredictor:
+    def __init__(self, version):
+        self.model_version = version
+        self.instrument = True
+        self.cache = None
+
+    def predict_batch(self, requests):
+        return [{} for _ in requests]
+
+    def predict(self, title, description):
+        return {}
+
+
+def bump_mtime(path, seconds):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + int(seconds * 1e9)))
+
+
+def test_reloads_on_metadata_only(tmp_path):
+    bundle_dir = tmp_path / BUNDLE_DIRNAME
+    bundle_dir.mkdir()
+    (tmp_path / 'metadata.json').write_text('{}')
+    (bundle_dir / MANIFEST_FILE).write_text('{}')
+    loads = []
+
+    def factory(models_dir, data_dir):
+        loads.append(models_dir)
+        return StubPredictor(str(len(loads)))
+
+    manager = ModelManager(str(tmp_path), str(tmp_path), factory=factory)
+    assert manager.load()
+    assert not manager.check_for_update()
+
+    # A retrain rewrites the bundle before metadata.json; only the latter means it's done
+    bump_mtime(bundle_dir / MANIFEST_FILE, 1)
+    assert not manager.check_for_update()
+    bump_mtime(tmp_path / 'metadata.json', 2)
+    assert manager.check_for_update()
+    assert manager.current.model_version == '2'
+    assert not manager.check_for_update()
+
+
+def test_bundle_without_metadata_is_watched_through_its_manifest(tmp_path):
+    bundle_dir = tmp_path / BUNDLE_DIRNAME
+    bundle_dir.mkdir()
+    (bundle_dir / MANIFEST_FILE).write_text('{}')
+    manager = ModelManager(
+        str(tmp_path), str(tmp_path), factory=lambda models_dir, data_dir: StubPredictor('1')
+    )
+    assert manager.load()
+
+    bump_mtime(bundle_dir / MANIFEST_FILE, 1)
+    assert manager.check_for_update()
+    assert manager.reload_count == 2
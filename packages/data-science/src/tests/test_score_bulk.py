@@ -0,0 +1,50 @@
+"""Resumable bulk scoring (src/models/score_bulk.py)."""
+
+import contextlib
+import io
+import json
+import shutil
+
+import pytest
+
+from src.models import score_bulk
+
+
+@pytest.fixture
+def export(corpus, tmp_path):
+    path = tmp_path / 'export.csv'
+    corpus.head(50).to_csv(path, index=False)
+    return path
+
+
+def score(export, output_dir, models_dir, data_dir, **kwargs):
+    with contextlib.redirect_stderr(io.StringIO()):
+        return score_bulk.score_file(export, output_dir, models_dir, data_dir,
+                                     chunk_size=20, workers=1, **kwargs)
+
+
+def test_resume_refuses_a_retrained_model(trained, export, tmp_path):
+    models_dir, data_dir = trained
+    shutil.copytree(models_dir, tmp_path / 'models')
+    output_dir = tmp_path / 'scored'
+    assert score(export, output_dir, tmp_path / 'models', data_dir)['rows_scored'] == 50
+    assert score(export, output_dir, tmp_path / 'models', data_dir)['chunks_skipped'] == 3
+
+    # Retrained under the same version string
+    shutil.rmtree(tmp_path / 'models' / 'model_bundle')
+    metadata_path = tmp_path / 'models' / 'metadata.json'
+    with open(metadata_path) as f:
+        metadata = json.load(f)
+    metadata['training_info']['trained_at'] = '2100-01-01T00:00:00'
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f)
+    with pytest.raises(ValueError, match='model_trained_at'):
+        score(export, output_dir, tmp_path / 'models', data_dir)
+
+
+def test_parquet_engine_checked_before_the_manifest(trained, export, tmp_path, monkeypatch):
+    models_dir, data_dir = trained
+    monkeypatch.setattr(score_bulk, 'parquet_engine_available', lambda: False)
+    with pytest.raises(ValueError, match='pyarrow'):
+        score(export, tmp_path / 'scored', models_dir, data_dir, output_format='parquet')
+    assert not (tmp_path / 'scored' / score_bulk.MANIFEST_FILE).exists()
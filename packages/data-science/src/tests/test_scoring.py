@@ -0,0 +1,57 @@
+"""Fused linear scoring (src/models/scoring.py) against sklearn's predict_proba."""
+
+import numpy as np
+import pytest
+import scipy.sparse
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.svm import LinearSVC
+
+from src.models.scoring import LinearScorer, head_kind
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(0)
+    X = scipy.sparse.random(300, 40, density=0.2, format='csr', random_state=1)
+    weights = rng.normal(size=(40, 4))
+    labels = np.asarray((X @ weights).argmax(axis=1)).ravel()
+    return X, labels
+
+
+@pytest.mark.parametrize('make_model, kind', [
+    (lambda: LogisticRegression(max_iter=500), 'softmax'),
+    (lambda: SGDClassifier(loss='log_loss', random_state=0), 'ovr'),
+])
+def test_matches_sklearn(data, make_model, kind):
+    X, y = data
+    category = make_model().fit(X, y)
+    priority = make_model().fit(X, y % 3)
+    assert head_kind(category) == kind
+
+    scorer = LinearScorer.from_models([category, priority])
+    cat_proba, pri_proba = scorer.predict_proba(X)
+    np.testing.assert_allclose(cat_proba, category.predict_proba(X), atol=1e-10)
+    np.testing.assert_allclose(pri_proba, priority.predict_proba(X), atol=1e-10)
+
+    # Single rows take the gather path
+    for row in (0, 17):
+        single = scorer.predict_proba(X[row])
+        np.testing.assert_allclose(single[0], category.predict_proba(X[row]), atol=1e-10)
+        np.testing.assert_allclose(single[1], priority.predict_proba(X[row]), atol=1e-10)
+
+
+def test_binary_head_matches_sklearn(data):
+    X, y = data
+    category = LogisticRegression(max_iter=500).fit(X, y)
+    binary = LogisticRegression(max_iter=500).fit(X, y % 2)
+
+    _, pri_proba = LinearScorer.from_models([category, binary]).predict_proba(X)
+    np.testing.assert_allclose(pri_proba, binary.predict_proba(X), atol=1e-10)
+
+
+def test_unfusable_models_fall_back(data):
+    X, y = data
+    category = LogisticRegression(max_iter=500).fit(X, y)
+    assert LinearScorer.from_models([category, LinearSVC().fit(X, y)]) is None
+    narrower = LogisticRegression(max_iter=500).fit(X[:, :20], y)
+    assert LinearScorer.from_models([category, narrower]) is None
@@ -0,0 +1,90 @@
+"""Shadow evaluation of a candidate model (src/serving/shadow.py)."""
+
+import contextlib
+import io
+import time
+
+import numpy as np
+import pytest
+from sklearn.preprocessing import LabelEncoder
+
+from src.models.predict import RequestPredictor
+from src.serving.shadow import ShadowEvaluator
+
+LIVE_CATEGORY = [[0.9, 0.1], [0.3, 0.7], [0.55, 0.45], [0.5, 0.5]]
+SHADOW_CATEGORY = [[0.8, 0.2], [0.6, 0.4], [0.4, 0.6], [0.45, 0.55]]
+PRIORITY = [[0.7, 0.3]] * 4
+
+
+class StubPredictor:
+    """Fixed probabilities over the classes a and b for both heads."""
+
+    model_version = 'stub'
+
+    def __init__(self, category, priority=PRIORITY, classes=('a', 'b')):
+        self.category_encoder = LabelEncoder()
+        self.category_encoder.classes_ = np.array(classes)
+        self.priority_encoder = self.category_encoder
+        self.proba = (np.array(category), np.array(priority))
+
+    def predict_proba_raw(self, requests):
+        return self.proba
+
+
+def test_agreement_compares_labels_and_served_outcomes():
+    shadow = ShadowEvaluator(StubPredictor(SHADOW_CATEGORY))
+    shadow._compare(StubPredictor(LIVE_CATEGORY), [{'title': 't', 'description': 'd'}] * 4)
+
+    stats = shadow.stats()
+    assert stats['scored'] == 4
+    category = stats['category']
+    # Only row 0 has the same top label. Row 3 is below the 0.6 threshold for both
+    # models, so its response (null) would be unchanged too
+    assert category['agreement'] == 0.25
+    assert category['served_agreement'] == 0.5
+    assert category['mean_confidence_delta'] == pytest.approx((-0.1 - 0.1 + 0.05 + 0.05) / 4)
+    assert category['top_disagreements'] == [
+        {'live': 'a', 'shadow': 'b', 'count': 2}, {'live': 'b', 'shadow': 'a', 'count': 1}
+    ]
+    assert stats['priority']['agreement'] == 1.0
+
+
+def test_request_thresholds_decide_what_is_served():
+    shadow = ShadowEvaluator(StubPredictor(SHADOW_CATEGORY))
+    requests = [{'title': 't', 'description': 'd', 'confidence_threshold': 0.0}] * 4
+    shadow._compare(StubPredictor(LIVE_CATEGORY), requests)
+    # Everything is served, so only identical labels leave the response unchanged
+    assert shadow.stats()['category']['served_agreement'] == 0.25
+
+
+def test_labels_are_matched_across_class_orders():
+    # The same decisions, from a candidate whose encoder orders the classes differently
+    live_category = LIVE_CATEGORY[:3]
+    reordered = StubPredictor(
+        [row[::-1] for row in live_category], [row[::-1] for row in PRIORITY[:3]],
+        classes=('b', 'a')
+    )
+    shadow = ShadowEvaluator(reordered)
+    shadow._compare(
+        StubPredictor(live_category, PRIORITY[:3]), [{'title': 't', 'description': 'd'}] * 3
+    )
+    assert shadow.stats()['category']['agreement'] == 1.0
+    assert shadow.stats()['priority']['agreement'] == 1.0
+
+
+def test_the_live_model_agrees_with_itself(trained, corpus):
+    with contextlib.redirect_stdout(io.StringIO()):
+        live = RequestPredictor(*map(str, trained), cache_size=0)
+    shadow = ShadowEvaluator(live, sample_rate=1.0, batch_size=8, flush_interval=0.01)
+    requests = corpus[['title', 'description']].head(20).to_dict('records')
+    shadow.submit(live, requests)
+    deadline = time.monotonic() + 10
+    while shadow.scored + shadow.failed < len(requests) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    shadow.close()
+
+    stats = shadow.stats()
+    assert (stats['sampled'], stats['scored'], stats['failed']) == (20, 20, 0)
+    for head in ('category', 'priority'):
+        assert stats[head]['agreement'] == 1.0 and stats[head]['served_agreement'] == 1.0
+        assert stats[head]['mean_abs_confidence_delta'] == 0.0
@@ -0,0 +1,71 @@
+"""Near-duplicate ticket index (src/models/similarity.py)."""
+
+import copy
+
+import pytest
+
+from src.features.vectorizers import fingerprint, load_vectorizer
+from src.models.bundle import BUNDLE_DIRNAME, ModelBundle
+from src.models.similarity import INSERT_LOG_FILE, SimilarityIndex
+
+TICKETS = [
+    ('REQ-1', 'Password reset', 'I cannot log in to my account after the reset'),
+    ('REQ-2', 'Printer jammed', 'The office printer on floor two is jammed again'),
+    ('REQ-3', 'VPN down', 'Remote VPN connection drops every few minutes'),
+]
+
+
+def build_index(vectorizer, **kwargs):
+    index = SimilarityIndex(vectorizer, **kwargs)
+    ids, titles, descriptions = zip(*TICKETS)
+    index.add(ids, titles, descriptions)
+    return index
+
+
+def test_fingerprint_matches_bundle(trained):
+    models_dir, data_dir = trained
+    bundle = ModelBundle(models_dir / BUNDLE_DIRNAME)
+    assert fingerprint(bundle.vectorizer) == fingerprint(load_vectorizer(data_dir))
+
+
+def test_load_refuses_another_vectorizer(trained, tmp_path):
+    _, data_dir = trained
+    vectorizer = load_vectorizer(data_dir)
+    build_index(vectorizer).save(tmp_path)
+    assert len(SimilarityIndex.load(tmp_path, vectorizer)) == len(TICKETS)
+
+    # Same number of columns, different terms (or weights) behind them
+    other = copy.deepcopy(vectorizer)
+    if hasattr(other, 'vocabulary_'):
+        first, second = sorted(other.vocabulary_)[:2]
+        vocabulary = other.vocabulary_
+        vocabulary[first], vocabulary[second] = vocabulary[second], vocabulary[first]
+    else:
+        other.idf_ = other.idf_[::-1].copy()
+    with pytest.raises(ValueError, match='different'):
+        SimilarityIndex.load(tmp_path, other)
+
+
+def test_sync_follows_a_rebuilt_insert_log(trained, tmp_path, capsys):
+    _, data_dir = trained
+    vectorizer = load_vectorizer(data_dir)
+    SimilarityIndex(vectorizer).save(tmp_path)
+    worker = SimilarityIndex.load(tmp_path, vectorizer)
+    writer = SimilarityIndex.load(tmp_path, vectorizer)
+    ids, titles, descriptions = zip(*TICKETS)
+    writer.add(ids, titles, descriptions)
+    assert worker.sync() == len(TICKETS)
+
+    # A CLI rebuild deletes the log; new inserts start a fresh, longer one
+    (tmp_path / INSERT_LOG_FILE).unlink()
+    with open(tmp_path / INSERT_LOG_FILE, 'w') as f:
+        f.write('{"request_id": "REQ-4", "title": "Laptop screen flickers", ')
+        f.write('"description": "The display of my laptop flickers when unplugged"}\n')
+        f.write('not json\n')
+        f.write('{"request_id": "REQ-5", "title": "Email quota", '
+                '"description": "Mailbox is full and cannot receive email messages at all"}\n')
+    assert worker.sync() == 2
+    assert len(worker) == len(TICKETS) + 2
+    # Warnings stay off stdout, which the CLIs use for JSON output
+    out, err = capsys.readouterr()
+    assert 'malformed' not in out and 'not json' in err
@@ -0,0 +1,50 @@
+"""Cross-validated hyperparameter sweep and its fold matrix cache (src/models/sweep.py)."""
+
+import pytest
+from sklearn.preprocessing import LabelEncoder
+
+from src.features.normalize import normalize_texts
+from src.models.sweep import run_sweep
+
+GRID = {
+    'vectorizer': {'max_features': [200, 500], 'ngram_range': [[1, 1]]},
+    'classifier': {'C': [1.0]}
+}
+
+
+@pytest.fixture(scope='module')
+def sweep_data(corpus):
+    texts = normalize_texts(corpus['title'] + ' ' + corpus['description'])
+    labels = {
+        head: LabelEncoder().fit_transform(corpus[head]) for head in ('category', 'priority')
+    }
+    return texts, labels
+
+
+def test_rerun_with_another_classifier_grid_skips_vectorization(sweep_data, tmp_path):
+    texts, labels = sweep_data
+    first = run_sweep(texts, labels, GRID, n_splits=3, workers=1, cache_dir=tmp_path)
+    assert (first['vectorizer_fits'], first['vectorizer_cache_hits']) == (6, 0)
+
+    grid = {**GRID, 'classifier': {'C': [1.0, 10.0]}}
+    second = run_sweep(texts, labels, grid, n_splits=3, workers=1, cache_dir=tmp_path)
+    assert (second['vectorizer_fits'], second['vectorizer_cache_hits']) == (0, 6)
+
+    # Cached matrices score exactly like freshly fitted ones
+    def scores(report):
+        return {
+            (row['head'], str(row['vectorizer'])): row['f1_macro_mean']
+            for row in report['results'] if row['classifier'] == {'C': 1.0}
+        }
+    assert scores(second) == scores(first)
+
+
+def test_cache_is_keyed_on_the_data(sweep_data, tmp_path):
+    texts, labels = sweep_data
+    run_sweep(texts, labels, GRID, n_splits=3, workers=1, cache_dir=tmp_path)
+
+    edited = texts[:-1] + [texts[-1] + ' edited']
+    report = run_sweep(edited, labels, GRID, n_splits=3, workers=1, cache_dir=tmp_path)
+    assert report['vectorizer_cache_hits'] == 0
+    report = run_sweep(texts, labels, GRID, n_splits=4, workers=1, cache_dir=tmp_path)
+    assert report['vectorizer_cache_hits'] == 0
@@ -0,0 +1,64 @@
+"""Out-of-core incremental training (src/models/train_incremental.py)."""
+
+import pandas as pd
+
+from src.data import load_data
+from src.models import train_incremental
+from src.models.train_incremental import IncrementalTrainer
+
+
+def tickets(updated_at):
+    return pd.DataFrame({
+        'title': ['Cannot log in'] * len(updated_at),
+        'description': ['Password reset link expired'] * len(updated_at),
+        'category': ['account'] * len(updated_at),
+        'priority': ['P2'] * len(updated_at),
+        'updated_at': updated_at
+    })
+
+
+def test_resume_skips_rows_without_updated_at():
+    chunk = tickets(['2024-01-01T00:00:00Z', '2024-03-01T00:00:00Z', None])
+    assert len(IncrementalTrainer()._select(chunk)) == 3
+
+    resumed = IncrementalTrainer(high_water_mark='2024-02-01T00:00:00Z')
+    selected = resumed._select(chunk)
+    assert selected['updated_at'].tolist() == ['2024-03-01T00:00:00Z']
+    assert resumed.n_skipped == 2
+
+
+def test_api_source_pages_from_the_high_water_mark(monkeypatch):
+    calls = []
+
+    def fake_pages(updated_since=None):
+        calls.append(updated_since)
+        for page in range(3):
+            yield tickets([f'2024-03-0{page + 1}T00:00:00Z'] * 4).to_dict('records')
+
+    monkeypatch.setattr(load_data, 'iter_api_pages', fake_pages)
+    chunks = list(
+        train_incremental.iter_chunks('api', chunk_size=5, updated_since='2024-02-01T00:00:00Z')
+    )
+    assert calls == ['2024-02-01T00:00:00Z']
+    assert [len(chunk) for chunk in chunks] == [5, 5, 2]
+
+
+def test_idf_is_frozen_after_the_first_chunk(corpus):
+    trainer = IncrementalTrainer()
+    trainer.partial_fit(corpus.iloc[:300])
+    idf = trainer.featurizer.idf_.copy()
+    trainer.partial_fit(corpus.iloc[300:])
+    assert (trainer.featurizer.idf_ == idf).all()
+    assert trainer.featurizer.n_docs_ == 300
+
+
+def test_save_replaces_artifacts_instead_of_rewriting_them(corpus, tmp_path):
+    data_dir, models_dir = tmp_path / 'processed', tmp_path / 'models'
+    trainer = IncrementalTrainer()
+    trainer.partial_fit(corpus)
+    trainer.save(data_dir, models_dir, export_bundle=True)
+    inodes = {path: path.stat().st_ino for path in models_dir.glob('*') if path.is_file()}
+
+    trainer.save(data_dir, models_dir, export_bundle=True)
+    assert all(path.stat().st_ino != inode for path, inode in inodes.items())
+    assert not list(tmp_path.rglob('*.tmp'))